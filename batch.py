@@ -0,0 +1,172 @@
+"""
+Summary.
+
+Scrape many tickets concurrently with the existing scraper classes.
+"""
+# -*- coding: utf-8 -*-
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+import inspect
+import pandas as pd
+from records import to_frame
+from schema import apply_schema
+from timing import add_hook, clear_hooks, emit, enabled, remove_hook
+from transport import get_session, grow_pool
+
+
+def _scrape(cls, ticket, method, kwargs):
+    """
+    Summary.
+
+    Scrape one ticket (runs in a worker thread).
+    cls: Class. Scraper class.
+    ticket: String. Ticket code.
+    method: String. Class function to call.
+    kwargs: Dictionary. Extra class arguments.
+    """
+    return getattr(cls(ticket=ticket, **kwargs), method)()
+
+
+def _download(cls, ticket, kwargs):
+    """
+    Summary.
+
+    Download the page of one ticket (runs in a worker thread).
+    cls: Class. Scraper class with download and load functions.
+    ticket: String. Ticket code.
+    kwargs: Dictionary. Extra class arguments.
+    """
+    return cls(ticket=ticket, **kwargs).download()
+
+
+def _parse(cls, ticket, method, kwargs, html, status_code, timed=False):
+    """
+    Summary.
+
+    Parse a downloaded page and call the method (runs in a parser
+    process, so the class, arguments and result are pickled).
+    Returns (result, error, timing events): the hooks of the main process
+    are not called here, so the events are sent back to be emitted there.
+    cls: Class. Scraper class with download and load functions.
+    ticket: String. Ticket code.
+    method: String. Class function to call.
+    kwargs: Dictionary. Extra class arguments (no session).
+    html: String. Page HTML.
+    status_code: Integer. HTTP status of the download.
+    timed: Boolean. Whether to collect the timing events.
+    """
+    events = []
+    hook = add_hook(events.append) if timed else None
+    try:
+        result = getattr(cls(ticket=ticket, **kwargs).load(html, status_code),
+                         method)()
+    except Exception as error:  # pylint: disable=broad-except
+        return None, error, events
+    finally:
+        remove_hook(hook)
+    return result, None, events
+
+
+async def fetch_many(cls, tickers, concurrency=16, method="table",
+                     parse_workers=None, **kwargs):
+    """
+    Summary.
+
+    Scrape many tickets concurrently, returning (dataframe, errors).
+    The dataframe concatenates the results in the tickers order and errors
+    maps each failed ticket to its exception, so one missing asset does not
+    abort the batch. With method="record" the records are appended
+    straight into the dataframe columns, one row per ticket.
+    With parse_workers (classes with download and load functions) the
+    pages are downloaded in threads and parsed in a pool of processes, so
+    the CPU bound parsing is not limited by the GIL while the downloads
+    keep going; the parser processes timing events are emitted here.
+    cls: Class. Scraper class (e.g. status_invest.StocksBR).
+    tickers: List. Ticket codes.
+    concurrency: Integer. Maximum simultaneous requests.
+    method: String. Class function to call ("table", "record", "info"...).
+    parse_workers: Integer. Parser processes (None parses in the threads).
+    kwargs: Extra class arguments (e.g. type_asset="STOCKS").
+    """
+    # Parser processes do not download, they get no session.
+    parse_kwargs = {key: value for key, value in kwargs.items()
+                    if key != "session"}
+    if ("session" not in kwargs  # One pooled connection per worker.
+            and "session" in inspect.signature(cls).parameters):
+        kwargs["session"] = grow_pool(get_session(), concurrency)
+    pipeline = bool(parse_workers) and hasattr(cls, "load")
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    with ExitStack() as stack:
+        executor = stack.enter_context(
+            ThreadPoolExecutor(max_workers=concurrency))
+        if pipeline:
+            # The parser processes start without the inherited hooks, their
+            # events reach the hooks only once, forwarded by _parse.
+            parsers = stack.enter_context(
+                ProcessPoolExecutor(max_workers=parse_workers,
+                                    initializer=clear_hooks))
+
+        async def worker(ticket):
+            if not pipeline:
+                async with semaphore:
+                    # The blocking download and parse run in a thread,
+                    # keeping the event loop free to start the other
+                    # requests.
+                    return await loop.run_in_executor(
+                        executor, _scrape, cls, ticket, method, kwargs)
+            # The slot is held until the page is parsed, so at most
+            # concurrency pages wait in memory for the parser processes.
+            async with semaphore:
+                html, status_code = await loop.run_in_executor(
+                    executor, _download, cls, ticket, kwargs)
+                result, error, events = await loop.run_in_executor(
+                    parsers, _parse, cls, ticket, method, parse_kwargs, html,
+                    status_code, enabled())
+            for event in events:  # Parser process stages (html_parse...).
+                emit(event.pop("stage"), event.pop("seconds"), **event)
+            if error is not None:
+                raise error
+            return result
+
+        tickers = list(dict.fromkeys(tickers))  # Removing duplicates.
+        results = await asyncio.gather(*[worker(ticket)
+                                         for ticket in tickers],
+                                       return_exceptions=True)
+    frames = []
+    errors = {}
+    for ticket, result in zip(tickers, results):
+        if isinstance(result, Exception):
+            errors[ticket] = result
+        else:
+            frames.append(result)
+
+    if method == "record":  # Dictionaries straight into columns.
+        df = to_frame(frames)
+    else:
+        df = (pd.concat(frames, ignore_index=True) if frames
+              else pd.DataFrame())
+    if method in ("table", "record"):  # Categories are lost in the concat.
+        df = apply_schema(df)
+    return df, errors
+
+
+def fetch_many_sync(cls, tickers, concurrency=16, method="table",
+                    parse_workers=None, **kwargs):
+    """
+    Summary.
+
+    Blocking version of fetch_many, for scripts without an event loop.
+    cls: Class. Scraper class (e.g. status_invest.StocksBR).
+    tickers: List. Ticket codes.
+    concurrency: Integer. Maximum simultaneous requests.
+    method: String. Class function to call ("table", "record", "info"...).
+    parse_workers: Integer. Parser processes (None parses in the threads).
+    kwargs: Extra class arguments (e.g. type_asset="STOCKS").
+    """
+    return asyncio.run(fetch_many(cls, tickers, concurrency=concurrency,
+                                  method=method, parse_workers=parse_workers,
+                                  **kwargs))
@@ -0,0 +1,203 @@
+"""
+Summary.
+
+Offline benchmarks of the scrapers: fetch (replayed fixtures), parse and
+normalise timed per class and per method.
+
+python benchmark.py record  # Saves the fixtures (needs the network).
+python benchmark.py run --repeat 5 --out results.json
+"""
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from fixtures import FIXTURES_FOLDER, FIXTURES_VERSION, recording, replaying
+import dividend_investor
+import exchange_rate
+import fundamentus
+import investidor_10
+import kpis_rf
+import status_invest
+
+# Class: (tickets, extra class arguments, methods).
+CLASSES = {
+    status_invest.StocksBR: (["BBAS3"], {}, ["info", "price", "kpi",
+                                             "table"]),
+    status_invest.ReitsBR: (["HGLG11"], {}, ["info", "price", "kpi",
+                                             "table"]),
+    status_invest.ETFsBR: (["BOVA11"], {}, ["info", "price", "table"]),
+    status_invest.StocksReits: (["O"], {"type_asset": "REITS"},
+                                ["info", "price", "kpi", "table"]),
+    status_invest.ETFs: (["VOO"], {}, ["info", "price", "table"]),
+    investidor_10.StocksBR: (["BBAS3"], {}, ["info", "price", "kpi",
+                                             "table"]),
+    investidor_10.ReitsBR: (["HGLG11"], {}, ["info", "price", "kpi",
+                                             "table"]),
+    investidor_10.ETFsBR: (["BOVA11"], {}, ["info", "price", "table"]),
+    investidor_10.StocksReits: (["O"], {"type_asset": "REITS"},
+                                ["info", "price", "kpi", "table"]),
+    investidor_10.ETFs: (["VOO"], {}, ["info", "price", "table"]),
+    fundamentus.StocksBR: (["BBAS3"], {"type_table": "KPI"},
+                           ["price", "kpi", "table"]),
+    fundamentus.ReitsBR: (["HGLG11"], {"type_table": "KPI"},
+                          ["info", "price", "kpi", "table"]),
+    dividend_investor.StocksReitsETFs: (["O"], {}, ["payments"]),
+}
+# Functions of the rates APIs: (name, function, arguments).
+FUNCTIONS = [
+    ("kpis_rf.cdi_annually_today", kpis_rf.cdi_annually_today, ()),
+    ("exchange_rate.ptax_today", exchange_rate.ptax_today, ("USD-BRL",)),
+]
+
+
+# # Common functions.
+def cases():
+    """
+    Summary.
+
+    Benchmark cases: (name, function) pairs, each call running a fresh
+    scraper (download, parse and normalise).
+    """
+    tmp = []
+    for cls, (tickets, kwargs, methods) in CLASSES.items():
+        for ticket in tickets:
+            for method in methods:
+                name = f"{cls.__module__}.{cls.__name__}.{method}[{ticket}]"
+
+                def case(cls=cls, ticket=ticket, method=method,
+                         kwargs=kwargs):
+                    fundamentus.clear_market_cache()  # Parsing every time.
+                    return getattr(cls(ticket=ticket, **kwargs), method)()
+
+                tmp.append((name, case))
+    for name, function, args in FUNCTIONS:
+        tmp.append((name, lambda function=function, args=args:
+                    function(*args)))
+    return tmp
+
+
+def record(folder=FIXTURES_FOLDER, version=FIXTURES_VERSION):
+    """
+    Summary.
+
+    Run every case once against the websites, saving the fixtures.
+    folder: String. Fixtures root folder.
+    version: String. Fixtures version.
+    """
+    failed = {}
+    with recording(folder, version):
+        for name, case in cases():
+            try:
+                case()
+            except Exception as error:  # pylint: disable=broad-except
+                failed[name] = error
+    for name, error in failed.items():
+        print(f"{name}: {type(error).__name__}: {error}")
+    return failed
+
+
+def _revision():
+    """
+    Summary.
+
+    Current git commit, to track the results across commits.
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(repeat=5, match=None, folder=FIXTURES_FOLDER,
+        version=FIXTURES_VERSION):
+    """
+    Summary.
+
+    Time every case on the replayed fixtures, returning the results.
+    repeat: Integer. Timed calls per case (after one warm-up call).
+    match: String. Only the cases whose name contains it.
+    folder: String. Fixtures root folder.
+    version: String. Fixtures version.
+    """
+    results = {"revision": _revision(), "fixtures": version,
+               "python": platform.python_version(),
+               "date": time.strftime("%Y-%m-%d %H:%M:%S"), "cases": {}}
+    with replaying(folder, version):
+        for name, case in cases():
+            if match and match not in name:
+                continue
+            try:
+                case()  # Warm-up (imports, compiled patterns).
+            except Exception as error:  # pylint: disable=broad-except
+                results["cases"][name] = {"error": repr(error)}
+                continue
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                case()
+                timings.append(time.perf_counter() - start)
+            results["cases"][name] = {
+                "min": min(timings), "median": statistics.median(timings),
+                "max": max(timings), "repeat": repeat}
+    return results
+
+
+def report(results):
+    """
+    Summary.
+
+    Print the results table (milliseconds).
+    results: Dictionary. Output of run.
+    """
+    print(f"Revision: {results['revision']}  Fixtures: "
+          f"{results['fixtures']}  Python: {results['python']}")
+    width = max([len(name) for name in results["cases"]] + [4])
+    print(f"{'CASE':<{width}}  {'MIN':>9}  {'MEDIAN':>9}  {'MAX':>9}")
+    for name, timing in results["cases"].items():
+        if "error" in timing:
+            print(f"{name:<{width}}  {timing['error']}")
+            continue
+        print(f"{name:<{width}}  {timing['min'] * 1000:>9.2f}  "
+              f"{timing['median'] * 1000:>9.2f}  "
+              f"{timing['max'] * 1000:>9.2f}")
+
+
+def main(argv=None):
+    """
+    Summary.
+
+    Parse the command line and run the command.
+    argv: List. Command line arguments (sys.argv by default).
+    """
+    parser = argparse.ArgumentParser(prog="benchmark.py",
+                                     description="Offline benchmarks.")
+    parser.add_argument("command", choices=["record", "run"])
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Timed calls per case (default 5).")
+    parser.add_argument("--match", help="Only the cases containing it.")
+    parser.add_argument("--folder", default=FIXTURES_FOLDER,
+                        help="Fixtures root folder.")
+    parser.add_argument("--version", default=FIXTURES_VERSION,
+                        help="Fixtures version.")
+    parser.add_argument("--out", help="JSON file to save the results.")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        return 1 if record(args.folder, args.version) else 0
+    results = run(args.repeat, args.match, args.folder, args.version)
+    report(results)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+Summary.
+
+Command line entry point: scrape a list of tickets with the existing
+classes concurrently and save a single Parquet/CSV file.
+
+python cli.py fetch --source status_invest --class StocksBR
+    --tickers-file universe.txt --workers 16 --out snapshot.parquet
+"""
+# -*- coding: utf-8 -*-
+
+import argparse
+import importlib
+import sys
+import time
+from batch import fetch_many_sync
+
+# Modules with scraper classes (python module: website).
+SOURCES = {
+    "status_invest": "Status Invest",
+    "investidor_10": "Investidor 10",
+    "fundamentus": "Fundamentus",
+    "yahoo_finance": "Yahoo Finance",
+    "dividend_investor": "Dividend Investor",
+}
+
+
+# # Common functions.
+def read_tickers(path):
+    """
+    Summary.
+
+    Read the tickets, one per line (blank lines and # comments skipped).
+    path: String. Text file path ("-" for the standard input).
+    """
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding="utf-8") as file:
+            lines = file.read().splitlines()
+    tickers = []
+    for line in lines:
+        line = line.split("#")[0].strip()
+        if line:
+            tickers.append(line.upper())
+    return tickers
+
+
+def _class_arguments(pairs):
+    """
+    Summary.
+
+    Extra class arguments from KEY=VALUE pairs.
+    pairs: List. Pairs (e.g. ["type_asset=STOCKS"]).
+    """
+    kwargs = {}
+    for pair in pairs or []:
+        key, sep, value = pair.partition("=")
+        if not sep:
+            raise SystemExit(f"Expected KEY=VALUE: {pair}")
+        kwargs[key.strip()] = value.strip()
+    return kwargs
+
+
+def save(df, path):
+    """
+    Summary.
+
+    Save the dataframe as Parquet or CSV, depending on the extension.
+    df: Dataframe.
+    path: String. Output file (.parquet or .csv).
+    """
+    if path.lower().endswith(".parquet"):
+        df.to_parquet(path, index=False)
+    elif path.lower().endswith(".csv"):
+        df.to_csv(path, index=False)
+    else:
+        raise ValueError(f"Unsupported output format: {path}")
+
+
+def fetch(args):
+    """
+    Summary.
+
+    Run the fetch command, returning the exit code (1 when any ticket
+    failed).
+    args: Namespace. Parsed command line arguments.
+    """
+    module = importlib.import_module(args.source)
+    cls = getattr(module, args.cls, None)
+    if not isinstance(cls, type):
+        raise SystemExit(f"Class {args.cls} not found in {args.source}")
+    tickers = read_tickers(args.tickers_file)
+    kwargs = _class_arguments(args.arg)
+    if args.out and not args.out.lower().endswith((".parquet", ".csv")):
+        raise SystemExit(f"Unsupported output format: {args.out}")
+
+    start = time.perf_counter()
+    df, errors = fetch_many_sync(cls, tickers, concurrency=args.workers,
+                                 method=args.method,
+                                 parse_workers=args.parse_workers, **kwargs)
+    elapsed = time.perf_counter() - start
+    if args.out:
+        save(df, args.out)
+
+    # Summary.
+    done = len(dict.fromkeys(tickers)) - len(errors)
+    print(f"Source: {SOURCES[args.source]} ({args.cls}.{args.method})")
+    print(f"Succeeded: {done}")
+    print(f"Failed: {len(errors)}")
+    for ticket, error in errors.items():
+        print(f"  {ticket}: {type(error).__name__}: {error}")
+    rate = len(tickers) / elapsed if elapsed else 0
+    print(f"Elapsed: {elapsed:.2f}s ({rate:.2f} tickets/s)")
+    if args.out:
+        print(f"Rows: {len(df)} saved to {args.out}")
+    return 1 if errors else 0
+
+
+def build_parser():
+    """
+    Summary.
+
+    Command line arguments parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="cli.py", description="Web scraping of financial metrics.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser(
+        "fetch", help="Scrape a list of tickets concurrently.")
+    command.add_argument("--source", required=True, choices=sorted(SOURCES),
+                         help="Website module.")
+    command.add_argument("--class", dest="cls", required=True,
+                         help="Scraper class (e.g. StocksBR).")
+    command.add_argument("--tickers-file", required=True,
+                         help="Tickets file, one per line (- for stdin).")
+    command.add_argument("--workers", type=int, default=16,
+                         help="Simultaneous requests (default 16).")
+    command.add_argument("--parse-workers", type=int,
+                         help="Parser processes (status_invest and "
+                         "investidor_10 classes).")
+    command.add_argument("--method", default="table",
+                         help="Class function to call (default table).")
+    command.add_argument("--arg", action="append", metavar="KEY=VALUE",
+                         help="Extra class argument (e.g. "
+                         "type_asset=STOCKS), repeatable.")
+    command.add_argument("--out", help="Output file (.parquet or .csv).")
+    command.set_defaults(run=fetch)
+    return parser
+
+
+def main(argv=None):
+    """
+    Summary.
+
+    Parse the command line and run the command.
+    argv: List. Command line arguments (sys.argv by default).
+    """
+    args = build_parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,29 +7,10 @@ Retrieve the companies infos from Dividend Investor website.
 # pylint: disable=too-few-public-methods
 
 from bs4 import BeautifulSoup
-import requests
 import pandas as pd
-
-# Header to use to get the web page content in text format.
-# The User-Agent request header contains a characteristic string that allows
-# the network protocol peers to identify the application type, operating
-# system, software vendor or software version of the requesting software user
-# agent.
-# Validating User-Agent header on server side is a common operation so be sure
-# to use valid browser’s User-Agent string to avoid getting blocked.
-# Font: https://go-colly.org/articles/scraping_related_http_headers/
-# Font: https://stackoverflow.com/questions/68259148/getting-404-error-for-
-#       certain-stocks-and-pages-on-yahoo-finance-python
-headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)" +
-    "AppleWebKit/537.36 (KHTML, like Gecko)" +
-    "Chrome/71.0.3578.98 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application" +
-    "/xml;q=0.9,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "DNT": "1",  # Do not track request header.
-    "Connection": "close"
-}
+from exceptions import AssetNotFound
+from timing import labelled, timed, timer
+from transport import fetch, get_session
 
 
 class StocksReitsETFs:
@@ -39,24 +20,28 @@ class StocksReitsETFs:
     Retrieve the stocks, reits and ETFs companies infos.
     """
 
-    def __init__(self, ticket):
+    def __init__(self, ticket, session=None):
         self.ticket = ticket
+        self.session = session if session is not None else get_session()
         url = "https://dividendinvestor.com/dividend-history-detail/{}"
         self.url = url.format(ticket.lower())
 
+    @labelled
     def _get_soup(self):
         url = self.url
-        page = requests.get(url, headers=headers, timeout=None)
-        soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
+        page = fetch(url, "payments", session=self.session)
+        with timer("html_parse", chars=len(page.text)):
+            soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
         # Checking if asset exist.
         if (page.status_code != 200 or
             soup.find("table", {"id": "dividends"}) is None or
             soup.find_all(string="No Symbol Found") or
             soup.find_all(string=lambda text: text and
                           "No dividends retrieved for" in text)):
-            raise ValueError("Info does not exist")
+            raise AssetNotFound("Info does not exist")
         return soup
 
+    @timed("parse_cards")
     def _parse_table_payment(self, soup):
         # Table.
         webtable = soup.find("table", {"id": "dividends"})
@@ -0,0 +1,41 @@
+"""
+Summary.
+
+Errors raised by the scrapers, telling a missing asset from a network
+failure worth retrying later and from a page the parsers do not understand.
+"""
+# -*- coding: utf-8 -*-
+
+
+class ScrapingError(Exception):
+    """
+    Summary.
+
+    Base error of the scrapers.
+    """
+
+
+class AssetNotFound(ScrapingError, ValueError):
+    """
+    Summary.
+
+    The website has no page (or no data) for the asset.
+    A ValueError, as raised before for a missing asset.
+    """
+
+
+class TransientFetchError(ScrapingError):
+    """
+    Summary.
+
+    The download failed after the retries (timeout, connection error or
+    HTTP 5xx/429): the asset may exist, trying again later may work.
+    """
+
+
+class ParseError(ScrapingError, ValueError):
+    """
+    Summary.
+
+    The page was downloaded but its layout is not the expected one.
+    """
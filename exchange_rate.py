@@ -7,7 +7,7 @@ Exchange rate extracted from Brazil central bank.
 
 from datetime import date, timedelta
 import pandas as pd
-import requests
+from transport import fetch
 
 
 def ptax_bcb(start_date, currency):
@@ -31,7 +31,7 @@ def ptax_bcb(start_date, currency):
            "&$filter=tipoBoletim%20eq%20'Fechamento'&$format=json&$select=" +
            "cotacaoCompra,cotacaoVenda,dataHoraCotacao")  # URL.
     url = url.format(moeda, start_date, fim)
-    page = requests.get(url, timeout=None).json()
+    page = fetch(url, "rate").json()
     df2 = pd.DataFrame(page["value"])
     # # Adjustments.
     tmp = {"cotacaoCompra": "numPTAXCompra"+currency,
@@ -72,7 +72,7 @@ def ptax_today_bcb(currency):
            "&@dataInicialCotacao='{}'&@dataFinalCotacao='{}'&$format=json" +
            "&$select=cotacaoCompra,cotacaoVenda,dataHoraCotacao")  # URL.
     url = url.format(currency, inicio, fim)
-    page = requests.get(url, timeout=None).json()
+    page = fetch(url, "rate").json()
     df = pd.DataFrame(page["value"])
     # # Adjustments.
     tmp = {"cotacaoCompra": "COTAÇÃO COMPRA", "cotacaoVenda": "COTAÇÃO VENDA",
@@ -101,7 +101,7 @@ def ptax_today(currency):
     """
     url = "https://economia.awesomeapi.com.br/last/{}"
     url = url.format(currency)
-    page = requests.get(url, timeout=None).json()
+    page = fetch(url, "rate").json()
     df = pd.DataFrame(page)
     df = df.T.reset_index(drop=False)
     df["TICKET"] = df["code"] + "-" + df["codein"]
@@ -0,0 +1,186 @@
+"""
+Summary.
+
+Record the real responses of the websites into a versioned fixtures folder
+and replay them locally, so the scrapers run without the network (e.g. the
+benchmarks in benchmark.py).
+"""
+# -*- coding: utf-8 -*-
+
+from contextlib import contextmanager
+import json
+import os
+import threading
+import time
+from transport import (Response, ResponseCache, cache_key, get_cache,
+                       get_session, set_cache, set_rate_limiting,
+                       set_session)
+
+FIXTURES_FOLDER = "fixtures"
+FIXTURES_VERSION = "v1"  # New version when the websites layout changes.
+_VALIDATORS = ("ETag", "Last-Modified")
+
+
+# # Common functions.
+def fixtures_path(folder=FIXTURES_FOLDER, version=FIXTURES_VERSION):
+    """
+    Summary.
+
+    Folder of a fixtures version.
+    folder: String. Fixtures root folder.
+    version: String. Fixtures version.
+    """
+    return os.path.join(folder, version)
+
+
+class RecordedPage:
+    """
+    Summary.
+
+    Replayed response, with the attributes read by transport.fetch.
+    """
+
+    def __init__(self, response):
+        self.url = response.url
+        self.status_code = response.status_code
+        self.content = response.content
+        self.encoding = response.encoding
+        self.headers = dict(response.validators)
+
+    @property
+    def text(self):
+        """
+        Summary.
+
+        Function to retrieve the decoded body.
+        """
+        return self.content.decode(self.encoding, errors="replace")
+
+
+class RecordingSession:
+    """
+    Summary.
+
+    Session downloading through a real session and saving every response
+    into the fixtures folder (index.json lists the recorded URLs).
+    """
+
+    def __init__(self, session=None, folder=FIXTURES_FOLDER,
+                 version=FIXTURES_VERSION):
+        self.session = session if session is not None else get_session()
+        self.path = fixtures_path(folder, version)
+        self.store = ResponseCache(self.path, max_bytes=float("inf"))
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        """
+        Summary.
+
+        Function to download and record a page (always a full download,
+        the conditional headers are dropped).
+        url: String. URL.
+        params: Dictionary. Query parameters.
+        headers: Dictionary. Extra request headers (ignored).
+        timeout: Tuple. Seconds to connect and to wait for data.
+        """
+        del headers  # Recording the whole body, never a 304.
+        page = self.session.get(url, params=params, timeout=timeout)
+        validators = {name: page.headers[name] for name in _VALIDATORS
+                      if name in page.headers}
+        key = cache_key(url, params)
+        self.store.set(key, Response(url, page.status_code, page.content,
+                                     page.encoding, validators))
+        self._index(key, url, page.status_code)
+        return page
+
+    def _index(self, key, url, status_code):
+        index = os.path.join(self.path, "index.json")
+        with self._lock:
+            try:
+                with open(index, encoding="utf-8") as file:
+                    entries = json.load(file)
+            except (OSError, ValueError):
+                entries = {}
+            entries[key] = {"url": url, "status_code": status_code,
+                            "recorded": time.strftime("%Y-%m-%d %H:%M:%S")}
+            with open(index, "w", encoding="utf-8") as file:
+                json.dump(entries, file, indent=1, sort_keys=True)
+
+
+class ReplaySession:
+    """
+    Summary.
+
+    Session answering from the fixtures folder, without the network.
+    A request without fixture raises LookupError.
+    """
+
+    def __init__(self, folder=FIXTURES_FOLDER, version=FIXTURES_VERSION):
+        self.path = fixtures_path(folder, version)
+        if not os.path.isdir(self.path):
+            raise LookupError(f"Fixtures not found: {self.path}")
+        self.store = ResponseCache(self.path, max_bytes=float("inf"))
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        """
+        Summary.
+
+        Function to answer a request with the recorded response.
+        url: String. URL.
+        params: Dictionary. Query parameters.
+        headers: Dictionary. Extra request headers (ignored).
+        timeout: Tuple. Ignored, nothing is downloaded.
+        """
+        del headers, timeout  # Always the recorded body.
+        response, _ = self.store.get(cache_key(url, params))
+        if response is None:
+            raise LookupError(f"No fixture recorded for {url}")
+        return RecordedPage(response)
+
+
+@contextmanager
+def _transport(session, limiting):
+    """
+    Summary.
+
+    Use the session as default one, without the response cache, restoring
+    the transport settings at the end.
+    session: Session. Recording or replay session.
+    limiting: Boolean. Whether the requests are rate limited.
+    """
+    old_session, old_cache = get_session(), get_cache()
+    set_session(session)
+    set_cache(None)  # Every request reaches the session.
+    set_rate_limiting(limiting)
+    try:
+        yield session
+    finally:
+        set_session(old_session)
+        set_cache(old_cache)
+        set_rate_limiting(True)
+
+
+def recording(folder=FIXTURES_FOLDER, version=FIXTURES_VERSION):
+    """
+    Summary.
+
+    Context manager recording the responses of the scrapers run inside it.
+    Scrapers created with an explicit session are not recorded.
+    folder: String. Fixtures root folder.
+    version: String. Fixtures version.
+    """
+    return _transport(RecordingSession(folder=folder, version=version),
+                      limiting=True)
+
+
+def replaying(folder=FIXTURES_FOLDER, version=FIXTURES_VERSION):
+    """
+    Summary.
+
+    Context manager replaying the recorded responses to the scrapers run
+    inside it (no network, no rate limiting).
+    folder: String. Fixtures root folder.
+    version: String. Fixtures version.
+    """
+    return _transport(ReplaySession(folder=folder, version=version),
+                      limiting=False)
@@ -7,75 +7,56 @@ Retrieve the companies infos from Fundamentus website.
 # pylint: disable=too-few-public-methods
 # pylint: disable=too-many-locals
 
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import timedelta
+import os
+import threading
+import time
 from bs4 import BeautifulSoup
-import requests
 import pandas as pd
-import numpy as np
-
-# Header to use to get the web page content in text format.
-# The User-Agent request header contains a characteristic string that allows
-# the network protocol peers to identify the application type, operating
-# system, software vendor or software version of the requesting software user
-# agent.
-# Validating User-Agent header on server side is a common operation so be sure
-# to use valid browser’s User-Agent string to avoid getting blocked.
-# Font: https://go-colly.org/articles/scraping_related_http_headers/
-# Font: https://stackoverflow.com/questions/68259148/getting-404-error-for-
-#       certain-stocks-and-pages-on-yahoo-finance-python
-headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)" +
-    "AppleWebKit/537.36 (KHTML, like Gecko)" +
-    "Chrome/71.0.3578.98 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application" +
-    "/xml;q=0.9,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "DNT": "1",  # Do not track request header.
-    "Connection": "close"
-}
+from exceptions import AssetNotFound, ParseError
+from normalize import numeric_columns, string_columns
+from schema import apply_schema
+from timing import labelled, timed, timer
+from transport import fetch, get_session, grow_pool
+
+
+# Market tables (resultado.php and fii_resultado.php) already downloaded.
+# The whole market comes in a single page, so it is downloaded once and shared
+# by every ticket lookup until it gets older than MARKET_TTL seconds.
+MARKET_TTL = 15 * 60
+_MARKET = {}  # URL: (download time, dataframe indexed by TICKET).
+_MARKET_LOCK = threading.Lock()
 
 
 # # Common functions.
-def _string_columns(df, columns):
+def _market_table(url, build):
     """
     Summary.
 
-    Format string columns.
-    df: Dataframe.
-    columns: Dataframe columns.
+    Retrieve a market table from the snapshot, downloading it when stale.
+    url: String. Market table URL.
+    build: Function. Function to download and format the market table.
     """
-    for column in columns:
-        if column in df.columns:
-            df[column] = (df[column].str.replace(" %", "%", regex=False)
-                          .str.replace(",", ".", regex=False)
-                          .str.replace(" / ", "/", regex=False)
-                          .replace({"-%": None, "-% A.A": None, "-": None,
-                                    "--": None, "": None, "0.00%": None}))
-            df[column] = df[column].str.upper()
-    return df
-
-
-def _numeric_columns(df, columns):
+    with _MARKET_LOCK:  # Avoiding simultaneous downloads of the same table.
+        cached = _MARKET.get(url)
+        if cached is None or time.monotonic() - cached[0] > MARKET_TTL:
+            df = build()
+            df = df.drop_duplicates(subset=["TICKET"])
+            df = df.set_index("TICKET", drop=False)  # Indexing by ticket.
+            cached = (time.monotonic(), df)
+            _MARKET[url] = cached
+    return cached[1]
+
+
+def clear_market_cache():
     """
     Summary.
 
-    Format numeric columns.
-    df: Dataframe.
-    columns: Dataframe columns.
+    Discard the market tables snapshot, forcing a new download.
     """
-    for column in columns:
-        if column in df.columns:
-            df[column] = (df[column].str.replace("R$ ", "", regex=False)
-                          .str.replace("R$\n", "", regex=False)
-                          .str.replace("US$", "", regex=False)
-                          .str.replace("US$\n", "", regex=False)
-                          .str.replace("$ ", "", regex=False)
-                          .str.replace(".", "", regex=False)
-                          .str.replace(",", ".", regex=False)
-                          .replace({"0": None, "0.00": None, "-": None,
-                                    "--": None, "": None, np.nan: None}))
-            df[column] = pd.to_numeric(df[column], errors="coerce")
-    return df
+    with _MARKET_LOCK:
+        _MARKET.clear()
 
 
 class StocksBR:
@@ -85,30 +66,38 @@ class StocksBR:
     Retrieve the brazilian stocks companies infos.
     """
 
-    def __init__(self, ticket, type_table):
+    def __init__(self, ticket, type_table, session=None):
         self.ticket = ticket
+        self.session = session if session is not None else get_session()
         if type_table == "KPI":
             urlr = "https://www.fundamentus.com.br/resultado.php"
             self.url = urlr
+            self.source = "market"  # Cache TTL.
         elif type_table == "PAYMENT":
             urlp = ("https://www.fundamentus.com.br/proventos.php?" +
                     "papel={}+&tipo=2")
             self.url = urlp.format(ticket.lower())
+            self.source = "payments"  # Cache TTL.
 
+    @labelled
     def _get_soup(self):
         url = self.url
-        page = requests.get(url, headers=headers, timeout=None)
-        soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
+        page = fetch(url, self.source, session=self.session)
+        with timer("html_parse", chars=len(page.text)):
+            soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
         # Checking if asset exist.
         if (page.status_code != 200
             or soup.find_all(string=lambda text: text and
                              "Nenhum provento encontrado" in text)):
-            raise ValueError("Info does not exist")
+            raise AssetNotFound("Info does not exist")
         return soup
 
+    @timed("parse_cards")
     def _parse_table_info(self, soup):
         # Table.
         webtable = soup.find("table")  # Getting <table>.
+        if webtable is None or webtable.tbody is None:
+            raise ParseError("Table not found")  # Layout changed.
         tmp = []
         for webtable_row in webtable.tbody.find_all("tr"):  # Getting <tr>.
             webtable_column = webtable_row.find_all("td")  # Getting <td>.
@@ -155,9 +144,12 @@ class StocksBR:
         table = pd.DataFrame(tmp)  # Temporary dataframe.
         return table
 
+    @timed("parse_cards")
     def _parse_table_payment(self, soup):
         # Table.
         webtable = soup.find("table")  # Getting <table>.
+        if webtable is None or webtable.tbody is None:
+            raise ParseError("Table not found")  # Layout changed.
         tmp = []
         for webtable_row in webtable.tbody.find_all("tr"):  # Getting <tr>.
             webtable_column = webtable_row.find_all("td")  # Getting <td>.
@@ -176,12 +168,7 @@ class StocksBR:
         table = pd.DataFrame(tmp)  # Temporary dataframe.
         return table
 
-    def table(self):
-        """
-        Summary.
-
-        Function to aggregate the brazilian stocks full infos.
-        """
+    def _build_table(self):
         soup = self._get_soup()
         df = self._parse_table_info(soup)  # Table info.
 
@@ -189,23 +176,37 @@ class StocksBR:
                "P/EBIT", "P/ATIVO CIRCULANTE LÍQUIDO", "EV/EBIT", "LIQUIDEZ",
                "EV/EBITDA", "LIQUIDEZ CORRENTE", "PATRIMÔNIO LÍQUIDO",
                "DÍVIDA BRUTA/PATRIMÔNIO"]
-        df = _numeric_columns(df, tmp)
+        df = numeric_columns(df, tmp)
 
         tmp = ["TICKET", "DIVIDEND YIELD", "ROIC", "ROE", "MARGEM EBIT",
                "MARGEM LÍQUIDA", "CAGR RECEITA 5 ANOS"]
-        df = _string_columns(df, tmp)
+        df = string_columns(df, tmp)
         return df
 
+    def table(self):
+        """
+        Summary.
+
+        Function to aggregate the brazilian stocks full infos.
+        """
+        df = _market_table(self.url, self._build_table)
+        return apply_schema(df.reset_index(drop=True))
+
+    def _market_row(self):
+        df = _market_table(self.url, self._build_table)
+        ticket = str.upper(self.ticket)
+        if ticket in df.index:  # Direct lookup, no full table scan.
+            return df.loc[[ticket]].reset_index(drop=True)
+        return df.iloc[0:0].reset_index(drop=True)
+
     def price(self):
         """
         Summary.
 
         Function to retrieve the brazilian stocks prices infos.
         """
-        df = self.table()
+        df = self._market_row()
         df = df[["TICKET", "COTAÇÃO"]]
-        df = (df[df["TICKET"] == str.upper(self.ticket)]
-              .reset_index(drop=True))
         df = df.T.reset_index(drop=False)
         df = df.rename(columns={"index": "INFO", 0: "VALOR"})
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
@@ -217,15 +218,13 @@ class StocksBR:
 
         Function to retrieve the brazilian stocks kpi's infos.
         """
-        df = self.table()
+        df = self._market_row()
         df = df[["TICKET", "P/L", "P/VP", "PSR", "P/ATIVO",
                  "P/CAPITAL DE GIRO", "P/EBIT", "P/ATIVO CIRCULANTE LÍQUIDO",
                  "EV/EBIT", "LIQUIDEZ", "EV/EBITDA", "LIQUIDEZ CORRENTE",
                  "PATRIMÔNIO LÍQUIDO", "DÍVIDA BRUTA/PATRIMÔNIO",
                  "DIVIDEND YIELD", "ROIC", "ROE", "MARGEM EBIT",
                  "MARGEM LÍQUIDA", "CAGR RECEITA 5 ANOS"]]
-        df = (df[df["TICKET"] == str.upper(self.ticket)]
-              .reset_index(drop=True))
         df = df.T.reset_index(drop=False)
         df = df.rename(columns={"index": "INFO", 0: "VALOR"})
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
@@ -276,30 +275,38 @@ class ReitsBR:
     Retrieve the brazilian reits companies infos.
     """
 
-    def __init__(self, ticket, type_table):
+    def __init__(self, ticket, type_table, session=None):
         self.ticket = ticket
+        self.session = session if session is not None else get_session()
         if type_table == "KPI":
             urlr = "https://www.fundamentus.com.br/fii_resultado.php"
             self.url = urlr
+            self.source = "market"  # Cache TTL.
         elif type_table == "PAYMENT":
             urlp = ("https://www.fundamentus.com.br/fii_proventos.php?" +
                     "papel={}&tipo=2")
             self.url = urlp.format(ticket.lower())
+            self.source = "payments"  # Cache TTL.
 
+    @labelled
     def _get_soup(self):
         url = self.url
-        page = requests.get(url, headers=headers, timeout=None)
-        soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
+        page = fetch(url, self.source, session=self.session)
+        with timer("html_parse", chars=len(page.text)):
+            soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
         # Checking if asset exist.
         if (page.status_code != 200
             or soup.find_all(string=lambda text: text and
                              "Nenhum provento encontrado" in text)):
-            raise ValueError("Info does not exist")
+            raise AssetNotFound("Info does not exist")
         return soup
 
+    @timed("parse_cards")
     def _parse_table_info(self, soup):
         # Table.
         webtable = soup.find("table")  # Getting <table>.
+        if webtable is None or webtable.tbody is None:
+            raise ParseError("Table not found")  # Layout changed.
         tmp = []
         for webtable_row in webtable.tbody.find_all("tr"):  # Getting <tr>.
             webtable_column = webtable_row.find_all("td")  # Getting <td>.
@@ -333,9 +340,12 @@ class ReitsBR:
         table = pd.DataFrame(tmp)  # Temporary dataframe.
         return table
 
+    @timed("parse_cards")
     def _parse_table_payment(self, soup):
         # Table.
         webtable = soup.find("table")  # Getting <table>.
+        if webtable is None or webtable.tbody is None:
+            raise ParseError("Table not found")  # Layout changed.
         tmp = []
         for webtable_row in webtable.tbody.find_all("tr"):  # Getting <tr>.
             webtable_column = webtable_row.find_all("td")  # Getting <td>.
@@ -352,34 +362,43 @@ class ReitsBR:
         table = pd.DataFrame(tmp)  # Temporary dataframe.
         return table
 
-    def table(self):
-        """
-        Summary.
-
-        Function to aggregate the brazilian reits full infos.
-        """
+    def _build_table(self):
         soup = self._get_soup()
         df = self._parse_table_info(soup)  # Table info.
 
         tmp = ["COTAÇÃO", "P/VP", "VALOR DE MERCADO", "LIQUIDEZ", "ALUGUEL M2",
                "QUANTIDADE DE IMÓVEIS", "PREÇO M2"]
-        df = _numeric_columns(df, tmp)
+        df = numeric_columns(df, tmp)
 
         tmp = ["TICKET", "SEGMENTO", "LUCRO LÍQUIDO AJUSTADO/VALOR DE MERCADO",
                "DIVIDEND YIELD", "CAP RATE", "VACÂNCIA"]
-        df = _string_columns(df, tmp)
+        df = string_columns(df, tmp)
         return df
 
+    def table(self):
+        """
+        Summary.
+
+        Function to aggregate the brazilian reits full infos.
+        """
+        df = _market_table(self.url, self._build_table)
+        return apply_schema(df.reset_index(drop=True))
+
+    def _market_row(self):
+        df = _market_table(self.url, self._build_table)
+        ticket = str.upper(self.ticket)
+        if ticket in df.index:  # Direct lookup, no full table scan.
+            return df.loc[[ticket]].reset_index(drop=True)
+        return df.iloc[0:0].reset_index(drop=True)
+
     def info(self):
         """
         Summary.
 
         Function to retrieve the brazilian reits infos.
         """
-        df = self.table()
+        df = self._market_row()
         df = df[["TICKET", "SEGMENTO"]]
-        df = (df[df["TICKET"] == str.upper(self.ticket)]
-              .reset_index(drop=True))
         df = df.T.reset_index(drop=False)
         df = df.rename(columns={"index": "INFO", 0: "VALOR"})
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
@@ -391,10 +410,8 @@ class ReitsBR:
 
         Function to retrieve the brazilian reits prices infos.
         """
-        df = self.table()
+        df = self._market_row()
         df = df[["TICKET", "COTAÇÃO"]]
-        df = (df[df["TICKET"] == str.upper(self.ticket)]
-              .reset_index(drop=True))
         df = df.T.reset_index(drop=False)
         df = df.rename(columns={"index": "INFO", 0: "VALOR"})
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
@@ -406,13 +423,11 @@ class ReitsBR:
 
         Function to retrieve the brazilian reits kpi's infos.
         """
-        df = self.table()
+        df = self._market_row()
         df = df[["TICKET", "P/VP", "VALOR DE MERCADO", "LIQUIDEZ",
                  "ALUGUEL M2", "QUANTIDADE DE IMÓVEIS", "PREÇO M2",
                  "LUCRO LÍQUIDO AJUSTADO/VALOR DE MERCADO", "DIVIDEND YIELD",
                  "CAP RATE", "VACÂNCIA"]]
-        df = (df[df["TICKET"] == str.upper(self.ticket)]
-              .reset_index(drop=True))
         df = df.T.reset_index(drop=False)
         df = df.rename(columns={"index": "INFO", 0: "VALOR"})
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
@@ -454,3 +469,84 @@ class ReitsBR:
         df = df[["TICKET", "DATA COM", "DATA EX", "DATA PAGAMENTO", "VALOR",
                  "TIPO PROVENTO"]]  # Reorder dataframe.
         return df
+
+
+def _payments(cls, ticket, session):
+    """
+    Summary.
+
+    Retrieve the payments of one ticket (runs in a worker thread).
+    cls: Class. StocksBR or ReitsBR.
+    ticket: String. Ticket code.
+    session: Session. Shared session.
+    """
+    return cls(ticket=ticket, type_table="PAYMENT", session=session).payments()
+
+
+def payments_many(tickers, type_asset="STOCKS", workers=16, session=None):
+    """
+    Summary.
+
+    Generator of the payments of many tickets, downloaded concurrently and
+    yielded as (ticket, dataframe, error) in completion order. A failed
+    ticket yields (ticket, None, exception), the others keep going.
+    At most 2 * workers results wait to be consumed, so the whole market
+    history can be written to disk without holding it in memory.
+    tickers: List. Ticket codes.
+    type_asset: String. "STOCKS" (proventos.php) or "REITS"
+    (fii_proventos.php).
+    workers: Integer. Simultaneous requests.
+    session: Session. Shared session (the default one, its pool enlarged
+    to workers connections).
+    """
+    cls = {"STOCKS": StocksBR, "REITS": ReitsBR}[type_asset]
+    if session is None:  # One pooled connection per worker.
+        session = grow_pool(get_session(), workers)
+    tickers = iter(dict.fromkeys(tickers))  # Removing duplicates.
+    executor = ThreadPoolExecutor(max_workers=workers)
+    pending = {}  # Future: ticket.
+    try:
+        while True:
+            # Keeping the window full.
+            for ticket in tickers:
+                future = executor.submit(_payments, cls, ticket, session)
+                pending[future] = ticket
+                if len(pending) >= 2 * workers:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                ticket = pending.pop(future)
+                try:
+                    yield ticket, future.result(), None
+                except Exception as error:  # pylint: disable=broad-except
+                    yield ticket, None, error
+    finally:
+        # Consumer stopped early: the waiting downloads are dropped.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def write_payments(tickers, path, type_asset="STOCKS", workers=16,
+                   session=None):
+    """
+    Summary.
+
+    Append the payments of many tickets to a CSV file as they are
+    downloaded (see payments_many), returning the errors per ticket.
+    tickers: List. Ticket codes.
+    path: String. CSV file (the header is written once).
+    type_asset: String. "STOCKS" or "REITS".
+    workers: Integer. Simultaneous requests.
+    session: Session. Shared session.
+    """
+    errors = {}
+    header = not os.path.exists(path) or os.path.getsize(path) == 0
+    for ticket, df, error in payments_many(tickers, type_asset, workers,
+                                           session):
+        if error is not None:
+            errors[ticket] = error
+            continue
+        df.to_csv(path, mode="a", header=header, index=False)
+        header = False
+    return errors
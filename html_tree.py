@@ -0,0 +1,358 @@
+"""
+Summary.
+
+Single lxml tree per page, with the BeautifulSoup lookups used by the
+scrapers (find, find_all, select, get_text) answered by XPath.
+"""
+# -*- coding: utf-8 -*-
+
+from functools import lru_cache
+import re
+from lxml import etree
+from exceptions import ParseError
+from timing import timer
+
+# Text nodes shown by get_text (BeautifulSoup skips scripts and styles).
+_TEXT = etree.XPath("descendant-or-self::text()" +
+                    "[not(parent::script or parent::style)]")
+_TOKEN = re.compile(r"([\w-]*)((?:[.#][\w-]+)*)")
+_STRING = etree.XPath("descendant::text()[. = $s]")
+
+
+@lru_cache(maxsize=None)
+def compiled(path):
+    """
+    Summary.
+
+    Compiled XPath of an expression, built once and reused for every page.
+    path: String. XPath expression.
+    """
+    return etree.XPath(path)
+
+
+def compile_plan(paths):
+    """
+    Summary.
+
+    Compile the XPath selectors of a page layout once (at import), as
+    {name: compiled XPath}; each one is called with the page root.
+    paths: Dictionary. Name: XPath expression.
+    """
+    return {name: compiled(path) for name, path in paths.items()}
+
+
+def _has_class(name):
+    """
+    Summary.
+
+    XPath condition of an element having the class name.
+    name: String. XPath variable holding the class.
+    """
+    return ("contains(concat(' ', normalize-space(@class), ' '), " +
+            f"concat(' ', ${name}, ' '))")
+
+
+@lru_cache(maxsize=None)
+def _conditions(spec, offset=0):
+    """
+    Summary.
+
+    XPath conditions matching the attributes like BeautifulSoup does.
+    A single class matches any of the element classes, a class with spaces
+    matches the whole class attribute. The values are the XPath variables
+    v<offset>, v<offset + 1>... (see _spec).
+    spec: Tuple. (attribute, class with spaces) pairs.
+    offset: Integer. Number of the first variable.
+    """
+    conditions = []
+    for position, (attr, whole) in enumerate(spec, start=offset):
+        name = f"v{position}"
+        if attr == "class" and not whole:
+            conditions.append(_has_class(name))
+        elif attr == "class":
+            conditions.append(f"normalize-space(@class) = ${name}")
+        else:
+            conditions.append(f"@{attr} = ${name}")
+    return "".join(f"[{condition}]" for condition in conditions)
+
+
+def _spec(attrs):
+    """
+    Summary.
+
+    Layout of the attributes conditions, without the values, so the
+    compiled XPath is shared by every search with the same layout.
+    attrs: Dictionary. Attribute values.
+    """
+    return tuple((attr, attr == "class" and " " in value.strip())
+                 for attr, value in attrs.items())
+
+
+@lru_cache(maxsize=None)
+def _css_to_xpath(selector):
+    """
+    Summary.
+
+    Translate a descendant CSS selector (tags, .class and #id) to a compiled
+    XPath, returning (XPath, variables).
+    selector: String. CSS selector (e.g. ".br ._card span").
+    """
+    steps = []
+    variables = {}
+    for token in selector.split():
+        match = _TOKEN.fullmatch(token)
+        if match is None:
+            raise ValueError(f"Unsupported selector: {selector}")
+        tag, rest = match.groups()
+        conditions = ""
+        for kind, value in re.findall(r"([.#])([\w-]+)", rest):
+            attr = "class" if kind == "." else "id"
+            conditions += _conditions(_spec({attr: value}), len(variables))
+            variables[f"v{len(variables)}"] = value
+        steps.append(f"descendant::{tag or '*'}{conditions}")
+    return compiled("/".join(steps)), tuple(variables.items())
+
+
+class Node:
+    """
+    Summary.
+
+    HTML element of the lxml tree.
+    """
+
+    __slots__ = ("element",)
+
+    def __init__(self, element):
+        self.element = element
+
+    def __bool__(self):
+        return True  # lxml elements without children are falsy.
+
+    def _search(self, name, attrs, string, kwargs):
+        if string is not None:
+            return _STRING(self.element, s=string)
+        attrs = dict(attrs or {}, **kwargs)
+        path = compiled(f"descendant::{name or '*'}" +
+                        _conditions(_spec(attrs)))
+        variables = {f"v{position}": value
+                     for position, value in enumerate(attrs.values())}
+        return [Node(element) for element in path(self.element, **variables)]
+
+    def find(self, name=None, attrs=None, string=None, **kwargs):
+        """
+        Summary.
+
+        Function to retrieve the first matching descendant, or None.
+        name: String. Tag name.
+        attrs: Dictionary. Attribute values (e.g. {"class": "info"}).
+        string: String. Exact text, searching text nodes instead.
+        """
+        found = self._search(name, attrs, string, kwargs)
+        return found[0] if found else None
+
+    def expect(self, name=None, attrs=None, **kwargs):
+        """
+        Summary.
+
+        Function to retrieve the first matching descendant that the parser
+        needs, raising ParseError when the page has none (the website
+        layout changed).
+        name: String. Tag name.
+        attrs: Dictionary. Attribute values (e.g. {"class": "info"}).
+        """
+        found = self.find(name, attrs, **kwargs)
+        if found is None:
+            raise ParseError(f"Element not found: {name} "
+                             f"{dict(attrs or {}, **kwargs)}")
+        return found
+
+    def find_all(self, name=None, attrs=None, string=None, **kwargs):
+        """
+        Summary.
+
+        Function to retrieve every matching descendant.
+        name: String. Tag name.
+        attrs: Dictionary. Attribute values (e.g. {"class": "info"}).
+        string: String. Exact text, searching text nodes instead.
+        """
+        return self._search(name, attrs, string, kwargs)
+
+    def select(self, selector):
+        """
+        Summary.
+
+        Function to retrieve the descendants matching a CSS selector.
+        selector: String. CSS selector (e.g. "._card-header span").
+        """
+        path, variables = _css_to_xpath(selector)
+        return [Node(element)
+                for element in path(self.element, **dict(variables))]
+
+    def xpath(self, path, **variables):
+        """
+        Summary.
+
+        Function to run an XPath query on the raw lxml element (compiled
+        once per expression).
+        path: String. XPath expression.
+        """
+        return compiled(path)(self.element, **variables)
+
+    def get(self, key, default=None):
+        """
+        Summary.
+
+        Function to retrieve an attribute value.
+        key: String. Attribute name.
+        default: Value returned when the attribute is missing.
+        """
+        return self.element.get(key, default)
+
+    def get_text(self, strip=False):
+        """
+        Summary.
+
+        Function to retrieve the text of the element and its descendants.
+        strip: Boolean. Strip each text piece, dropping the empty ones.
+        """
+        texts = _TEXT(self.element)
+        if strip:
+            return "".join(text.strip() for text in texts if text.strip())
+        return "".join(texts)
+
+    @property
+    def text(self):
+        """
+        Summary.
+
+        Text of the element and its descendants.
+        """
+        return self.get_text()
+
+
+@lru_cache(maxsize=None)
+def _start_tag(tag, spec):
+    """
+    Summary.
+
+    Regex of the opening tags having the attributes (each class token for
+    the class), used to find a section before parsing.
+    tag: String. Tag name.
+    spec: Tuple. (attribute, value) pairs.
+    """
+    lookaheads = ""
+    for attr, value in spec:
+        tokens = value.split() if attr == "class" else [value]
+        for token in tokens:
+            lookaheads += (rf"(?=[^>]*\s{re.escape(attr)}\s*=\s*[\"']?" +
+                           rf"[^\"'>]*(?<![\w-]){re.escape(token)}(?![\w-]))")
+    return re.compile(rf"<{re.escape(tag)}(?=[\s>]){lookaheads}",
+                      re.IGNORECASE)
+
+
+@lru_cache(maxsize=None)
+def _tags(tag):
+    """
+    Summary.
+
+    Regex of the opening and closing tags of a name.
+    tag: String. Tag name.
+    """
+    return re.compile(rf"<(/?){re.escape(tag)}(?=[\s>/])[^>]*?(/?)>",
+                      re.IGNORECASE)
+
+
+def _section_end(text, tag, start):
+    """
+    Summary.
+
+    Position after the closing tag of the element opened at start, or None
+    when it is not closed.
+    text: String. Page HTML.
+    tag: String. Tag name.
+    start: Integer. Position of the opening tag.
+    """
+    depth = 0
+    for match in _tags(tag).finditer(text, start):
+        closing, empty = match.groups()
+        if empty:  # <tag/>
+            continue
+        depth += -1 if closing else 1
+        if depth == 0:
+            return match.end()
+    return None
+
+
+def _section_starts(text, tag, attrs):
+    """
+    Summary.
+
+    Positions of the opening tags of a section. The rarest looking value
+    (the longest token) is searched as plain text first and only its
+    enclosing tag is checked with the regex.
+    text: String. Page HTML.
+    tag: String. Tag name.
+    attrs: Dictionary. Attribute values.
+    """
+    regex = _start_tag(tag, tuple(attrs.items()))
+    key = max((token for value in attrs.values() for token in value.split()),
+              key=len)
+    position = text.find(key)
+    while position != -1:
+        start = text.rfind("<", 0, position)
+        if (start != -1 and text.find(">", start) > position
+                and regex.match(text, start)):
+            yield start
+        position = text.find(key, position + len(key))
+
+
+def slice_sections(text, sections):
+    """
+    Summary.
+
+    Cut the sections out of the page before parsing (byte-range slicing),
+    returning a small HTML with only them, or None when a section is not
+    found so the whole page is parsed instead.
+    text: String. Page HTML.
+    sections: List. (tag, attributes) of the sections, e.g.
+              [("section", {"id": "cards-ticker"})].
+    """
+    ranges = []
+    for tag, attrs in sections:
+        found = False
+        for start in _section_starts(text, tag, attrs):
+            end = _section_end(text, tag, start)
+            if end is not None:  # Unclosed matches (e.g. in scripts).
+                ranges.append((start, end))
+                found = True
+        if not found:
+            return None
+    pieces = []
+    last = 0
+    for start, end in sorted(ranges):
+        if start >= last:  # Skipping the sections inside another one.
+            pieces.append(text[start:end])
+            last = end
+    return "<html><body>" + "\n".join(pieces) + "</body></html>"
+
+
+def parse(text, sections=None):
+    """
+    Summary.
+
+    Parse the page once, returning (node, dom).
+    node answers the BeautifulSoup lookups and dom is the lxml root for
+    the XPath ones, both sharing the same tree.
+    With sections, only those parts of the page are parsed (see
+    slice_sections), so absolute XPaths do not apply.
+    text: String. Page HTML.
+    sections: List. (tag, attributes) of the sections to parse.
+    """
+    if sections:
+        partial = slice_sections(text, sections)
+        text = partial if partial is not None else text
+    with timer("html_parse", chars=len(text)):
+        dom = etree.HTML(text) if text.strip() else None
+        if dom is None:  # Empty page.
+            dom = etree.HTML("<html></html>")
+    return Node(dom), dom
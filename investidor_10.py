@@ -8,32 +8,29 @@ Retrieve the companies infos from Investidor 10 website.
 # pylint: disable=too-many-lines
 # pylint: disable=too-many-locals
 
-from bs4 import BeautifulSoup
-from lxml import etree
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+import hashlib
+import json
+import os
+import re
+import threading
 import pandas as pd
-import numpy as np
-
-# Header to use to get the web page content in text format.
-# The User-Agent request header contains a characteristic string that allows
-# the network protocol peers to identify the application type, operating
-# system, software vendor or software version of the requesting software user
-# agent.
-# Validating User-Agent header on server side is a common operation so be sure
-# to use valid browser’s User-Agent string to avoid getting blocked.
-# Font: https://go-colly.org/articles/scraping_related_http_headers/
-# Font: https://stackoverflow.com/questions/68259148/getting-404-error-for-
-#       certain-stocks-and-pages-on-yahoo-finance-python
-headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)" +
-    "AppleWebKit/537.36 (KHTML, like Gecko)" +
-    "Chrome/71.0.3578.98 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application" +
-    "/xml;q=0.9,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "DNT": "1",  # Do not track request header.
-    "Connection": "close"
-}
+from exceptions import AssetNotFound, ParseError, TransientFetchError
+from html_tree import compile_plan, parse
+from normalize import (LETTER_UNITS, WORD_UNITS, magnitude,
+                       numeric_columns, string_columns)
+from records import merge_rows, to_number, wide_row
+from schema import apply_schema
+from timing import labelled, timed
+from transport import Response, fetch, get_session, rate_limit
+
+# Auxiliar tables with the ETFs listing infos (see etfbr_auxtable and
+# etf_auxtable).
+ETFBR_AUX = "INVESTIDOR-10_ETFS-BR_AUX.parquet"
+ETF_AUX = "INVESTIDOR-10_ETFS_AUX.parquet"
+_AUX = {}  # Path: (file modification time, dataframe indexed by ATIVO).
+_AUX_LOCK = threading.Lock()
 
 
 # # Common functions.
@@ -44,6 +41,8 @@ def _clean_cards(df):
     Clean parsed cards.
     df: Dataframe.
     """
+    if "INFO" not in df.columns:  # No card found: layout changed.
+        raise ParseError("No cards parsed")
     df = df.dropna(subset=["INFO"])
     df.loc[:, "INFO"] = df["INFO"].str.replace(" / ", "/")
     df.loc[:, "INFO"] = df["INFO"].str.replace(r"^DIVIDEND YIELD.*$",
@@ -64,137 +63,159 @@ def _clean_cards(df):
     return df
 
 
-def _string_columns(df, columns):
+def _last_page(text, default):
     """
     Summary.
 
-    Format string columns.
-    df: Dataframe.
-    columns: Dataframe columns.
+    Discover the last listing page from the pagination links.
+    text: String. HTML of the first listing page.
+    default: Integer. Last page when no pagination link is found.
     """
-    for column in columns:
-        if column in df.columns:
-            df[column] = (df[column].str.replace(" %", "%", regex=False)
-                          .str.replace(",", ".", regex=False)
-                          .str.replace(" / ", "/", regex=False)
-                          .replace({"-%": None, "-% A.A": None, "-": None,
-                                    "--": None, "": None, "0.00%": None}))
-            df[column] = df[column].str.upper()
-    return df
+    pages = [int(page) for page in re.findall(r"[?&;]page=(\d+)", text)]
+    return max(pages) if pages else default
 
 
-def _numeric_columns(df, columns):
+def _crawl_pages(url_format, default_last, session, workers):
     """
     Summary.
 
-    Format numeric columns.
-    df: Dataframe.
-    columns: Dataframe columns.
+    Download every listing page, returning the responses in page order and
+    the numbers of the pages whose download failed (blank responses).
+    The first page is downloaded alone to discover the last page number, the
+    remaining pages are downloaded concurrently.
+    url_format: String. Listing URL with a placeholder for the page number.
+    default_last: Integer. Last page when no pagination link is found.
+    session: Session. Requests session.
+    workers: Integer. Simultaneous downloads.
     """
-    for column in columns:
-        if column in df.columns:
-            df[column] = (df[column].str.replace("R$ ", "", regex=False)
-                          .str.replace("R$\n", "", regex=False)
-                          .str.replace("US$", "", regex=False)
-                          .str.replace("US$\n", "", regex=False)
-                          .str.replace("$ ", "", regex=False)
-                          .str.replace(".", "", regex=False)
-                          .str.replace(",", ".", regex=False)
-                          .replace({"0": None, "0.00": None, "-": None,
-                                    "--": None, "": None, np.nan: None}))
-            df[column] = pd.to_numeric(df[column], errors="coerce")
-    return df
+    failed = []
 
+    def get_page(page):
+        url = url_format.format(page)
+        try:
+            return fetch(url, "listing", session=session)
+        except TransientFetchError:  # Unavailable page, skipped later.
+            failed.append(page)
+            return Response(url, 503, b"")
 
-def _times(value):
+    first = get_page(1)
+    last = _last_page(first.text, default_last)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pages = [first] + list(executor.map(get_page, range(2, last + 1)))
+    return pages, sorted(failed)
+
+
+def _parse_etfbr_page(soup):
     """
     Summary.
 
-    Convert financial values in words into numbers.
-    value: String. String number to convert.
+    Parse the brazilian ETFs listing table of a page.
+    soup: Node. Page HTML (see html_tree).
     """
-    if value is None or value is np.nan:
-        return None
-
-    consts = {
-        "MILHÃO": 1_000_000,
-        "MILHÕES": 1_000_000,
-        "MIL": 1_000,
-        "BILHÃO": 1_000_000_000,
-        "BILHÕES": 1_000_000_000,
-        "TRILHÃO": 1_000_000_000_000,
-        "TRILHÕES": 1_000_000_000_000
-    }
-
-    for k, const in consts.items():
-        if k in value:
-            return round(float(value.replace(f" {k}", "").strip()) * const, 2)
-    return round(float(value), 2)
-
-
-def _times2(value):
+    table = soup.find("table")  # Getting elements from tables.
+    tmp = []
+    if table:
+        for row in table.find("tbody").find_all("tr"):
+            column = row.find_all("td")
+            if column:
+                nome = column[0].text.strip().upper()
+                ativo = column[1].text.strip().upper()
+                cotacao = column[2].text.strip().upper()
+                volume = column[3].text.strip().upper()
+                var_30d = column[4].text.strip().upper()
+                var_12m = column[5].text.strip().upper()
+                tmp.append({"NOME": nome, "ATIVO": ativo,
+                            "COTAÇÃO": cotacao, "LIQUIDEZ": volume,
+                            "VARIAÇÃO DE COTAÇÃO 1 MÊS": var_30d,
+                            "VARIAÇÃO DE COTAÇÃO 1 ANO": var_12m})
+    return pd.DataFrame(tmp)
+
+
+def _parse_etf_page(soup):
     """
     Summary.
 
-    Convert financial values in words into numbers.
-    value: String. String number to convert.
+    Parse the ETFs listing table of a page.
+    soup: Node. Page HTML (see html_tree).
     """
-    if value is None or value is np.nan:
-        return None
-
-    # Replace commas with dots for float conversion.
-    value = value.replace(",", ".")
-
-    consts = {
-        "K": 1_000,
-        "M": 1_000_000,
-        "B": 1_000_000_000,
-        "T": 1_000_000_000_000
-    }
+    table = soup.find("table")  # # Getting elements from tables.
+    tmp = []
+    if table:
+        for row in table.find("tbody").find_all("tr"):
+            column = row.find_all("td")
+            if column:
+                nome = column[0].text.strip().upper()
+                ativo = column[1].text.strip().upper()
+                cotacao_usd = column[2].text.strip().upper()
+                cotacao_brl = column[3].text.strip().upper()
+                # val_mercado = column[4].text.strip().upper()
+                volume_usd = column[5].text.strip().upper()
+                var_30d = column[6].text.strip().upper()
+                var_12m = column[7].text.strip().upper()
+                tmp.append({"NOME": nome, "ATIVO": ativo,
+                            "VARIAÇÃO DE COTAÇÃO USD 1 ANO": var_12m,
+                            "COTAÇÃO USD": cotacao_usd,
+                            "COTAÇÃO BRL": cotacao_brl,
+                            # "VALOR DE MERCADO USD": val_mercado,
+                            "LIQUIDEZ USD": volume_usd,
+                            "VARIAÇÃO DE COTAÇÃO USD 1 MÊS": var_30d})
+    return pd.DataFrame(tmp)
+
+
+def _page_digest(text):
+    """
+    Summary.
 
-    for k, const in consts.items():
-        if k in value:
-            return round(float(value.replace(f" {k}", "").strip()) * const, 2)
-    return round(float(value), 2)
+    Hash of the listing table of a page (the rest of the page, as tokens and
+    ads, changes between requests even when the listing does not).
+    text: String. Page HTML.
+    """
+    begin = text.find("<table")
+    finish = text.find("</table>", begin)
+    if begin != -1 and finish != -1:
+        text = text[begin:finish]
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
-def etfbr_auxtable():
+def _parse_pages(pages, parse_page, digests=None):
     """
     Summary.
 
-    Retrieve the auxiliar table for brazilian ETFs.
+    Parse the downloaded listing pages, skipping the unavailable ones.
+    Returns the parsed dataframe and the pages digests; with digests, the
+    pages whose digest did not change are not parsed again.
+    pages: List. Listing pages responses, in page order.
+    parse_page: Function. Page parser.
+    digests: Dictionary. Page number: digest of the previous run.
     """
-    url_format = ("https://investidor10.com.br/etfs/?order=ticker&" +
-                  "dir=asc&page={}")  # URL.
+    digests = digests if digests is not None else {}
+    new_digests = dict(digests)
     df = []  # Definitive list.
-    for page in range(1, 6):  # 5 pages.
-        url = url_format.format(page)
-        page = requests.get(url, headers=headers, timeout=None)
-        soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
-        if page.status_code != 200:
+    for number, page in enumerate(pages, start=1):
+        if page.status_code != 200:  # Checking if page exist.
             continue
             # raise ValueError("Page does not exist")
 
-        table = soup.find("table")  # Getting elements from tables.
-        if table:
-            tmp = []
-            for row in table.tbody.find_all("tr"):
-                column = row.find_all("td")
-                if column:
-                    nome = column[0].text.strip().upper()
-                    ativo = column[1].text.strip().upper()
-                    cotacao = column[2].text.strip().upper()
-                    volume = column[3].text.strip().upper()
-                    var_30d = column[4].text.strip().upper()
-                    var_12m = column[5].text.strip().upper()
-                    tmp.append({"NOME": nome, "ATIVO": ativo,
-                                "COTAÇÃO": cotacao, "LIQUIDEZ": volume,
-                                "VARIAÇÃO DE COTAÇÃO 1 MÊS": var_30d,
-                                "VARIAÇÃO DE COTAÇÃO 1 ANO": var_12m})
-            df.append(pd.DataFrame(tmp))
-
-    df = pd.concat(df, ignore_index=True)  # Definitive dataframe.
+        digest = _page_digest(page.text)
+        new_digests[str(number)] = digest
+        if digests.get(str(number)) == digest:  # Page without changes.
+            continue
+
+        soup = parse(page.text)[0]  # Getting HTML.
+        tmp = parse_page(soup)
+        if not tmp.empty:
+            df.append(tmp)
+    df = pd.concat(df, ignore_index=True) if df else pd.DataFrame()
+    return df, new_digests
 
+
+def _format_etfbr(df):
+    """
+    Summary.
+
+    Format the brazilian ETFs auxiliar table columns.
+    df: Dataframe.
+    """
     tmp = ["COTAÇÃO", "LIQUIDEZ"]
     for column in tmp:
         if column in df.columns:
@@ -210,54 +231,17 @@ def etfbr_auxtable():
                                           if pd.notna(x) else x)
 
     tmp = ["NOME", "ATIVO"]
-    df = _string_columns(df=df, columns=tmp)
-    df.to_parquet("INVESTIDOR-10_ETFS-BR_AUX.parquet")
+    df = string_columns(df=df, columns=tmp)
     return df
 
 
-def etf_auxtable():
+def _format_etf(df):
     """
     Summary.
 
-    Retrieve the auxiliar table for ETFs.
+    Format the ETFs auxiliar table columns.
+    df: Dataframe.
     """
-    url_format = ("https://investidor10.com.br/etfs-global/?" +
-                  "order=ticker&dir=asc&page={}")  # URL.
-    df = []  # Definitive list.
-    for page in range(1, 106):  # 105 pages.
-        url = url_format.format(page)
-        page = requests.get(url, headers=headers, timeout=None)
-        soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
-        # Checking if page exist.
-        if page.status_code != 200:
-            continue
-            # raise ValueError("Page does not exist")
-
-        table = soup.find("table")  # # Getting elements from tables.
-        if table:
-            tmp = []
-            for row in table.tbody.find_all("tr"):
-                column = row.find_all("td")
-                if column:
-                    nome = column[0].text.strip().upper()
-                    ativo = column[1].text.strip().upper()
-                    cotacao_usd = column[2].text.strip().upper()
-                    cotacao_brl = column[3].text.strip().upper()
-                    # val_mercado = column[4].text.strip().upper()
-                    volume_usd = column[5].text.strip().upper()
-                    var_30d = column[6].text.strip().upper()
-                    var_12m = column[7].text.strip().upper()
-                    tmp.append({"NOME": nome, "ATIVO": ativo,
-                                "VARIAÇÃO DE COTAÇÃO USD 1 ANO": var_12m,
-                                "COTAÇÃO USD": cotacao_usd,
-                                "COTAÇÃO BRL": cotacao_brl,
-                                # "VALOR DE MERCADO USD": val_mercado,
-                                "LIQUIDEZ USD": volume_usd,
-                                "VARIAÇÃO DE COTAÇÃO USD 1 MÊS": var_30d})
-            df.append(pd.DataFrame(tmp))
-
-    df = pd.concat(df, ignore_index=True)  # Definitive dataframe.
-
     tmp = ["COTAÇÃO USD", "COTAÇÃO BRL", "VALOR DE MERCADO USD",
            "LIQUIDEZ USD"]
     for column in tmp:
@@ -274,11 +258,140 @@ def etf_auxtable():
                                           if pd.notna(x) else x)
 
     tmp = ["NOME", "ATIVO"]
-    df = _string_columns(df=df, columns=tmp)
-    df.to_parquet("INVESTIDOR-10_ETFS_AUX.parquet")
+    df = string_columns(df=df, columns=tmp)
+    return df
+
+
+def _auxtable(source, path, incremental, session, workers, rate):
+    """
+    Summary.
+
+    Retrieve an auxiliar table, saving it in a parquet file.
+    In incremental mode the pages digests are kept next to the parquet file,
+    the unchanged pages are not parsed and only the rows of the changed
+    pages are upserted (by ATIVO) into the saved table.
+    A full refresh raises, keeping the saved table, when a page download
+    failed or no row was parsed.
+    source: Tuple. (URL format, default last page, page parser, formatter).
+    path: String. Parquet file.
+    incremental: Boolean. Reuse the saved table and digests.
+    session: Session. Requests session, the shared one by default.
+    workers: Integer. Simultaneous page downloads.
+    rate: Float. Requests per second to the website, None keeps the
+    configured one.
+    """
+    url_format, default_last, parse_page, fmt = source
+    session = session if session is not None else get_session()
+    digests_path = os.path.splitext(path)[0] + "_HASHES.json"
+    incremental = (incremental and os.path.exists(path) and
+                   os.path.exists(digests_path))
+    digests = None
+    if incremental:
+        with open(digests_path, encoding="utf-8") as file:
+            digests = json.load(file)
+
+    # The crawl rate, restored at the end (see transport.HOST_RATES).
+    limit = (rate_limit("investidor10.com.br", rate) if rate
+             else nullcontext())
+    with limit:
+        pages, failed = _crawl_pages(url_format, default_last, session,
+                                     workers)
+    if failed and not incremental:  # Keeping the last complete table.
+        raise TransientFetchError(f"Listing pages not downloaded: {failed}")
+    df, digests = _parse_pages(pages, parse_page, digests)
+    if df.empty and not incremental:
+        raise ParseError("No listing rows parsed")
+    if incremental:
+        old = pd.read_parquet(path)
+        if df.empty:  # Nothing changed, nothing to write.
+            return old
+        df = fmt(df)
+        df = pd.concat([old[~old["ATIVO"].isin(df["ATIVO"])], df])
+        df = df.sort_values(by="ATIVO", kind="stable")
+        df = df.reset_index(drop=True)
+    else:
+        df = fmt(df)
+
+    df.to_parquet(path)
+    with _AUX_LOCK:  # Discarding the stale shared table.
+        _AUX.pop(path, None)
+    with open(digests_path, "w", encoding="utf-8") as file:
+        json.dump(digests, file)
     return df
 
 
+def _aux_table(path):
+    """
+    Summary.
+
+    Retrieve an auxiliar table indexed by ATIVO, shared by the whole process.
+    The parquet file is read again only when it is modified.
+    path: String. Parquet file.
+    """
+    mtime = os.path.getmtime(path)
+    with _AUX_LOCK:
+        cached = _AUX.get(path)
+        if cached is None or cached[0] != mtime:
+            df = pd.read_parquet(path)
+            df = df.drop_duplicates(subset=["ATIVO"])
+            df = df.set_index("ATIVO", drop=False)  # Indexing by ticket.
+            cached = (mtime, df)
+            _AUX[path] = cached
+    return cached[1]
+
+
+def _aux_info(path, ticket, columns):
+    """
+    Summary.
+
+    Retrieve the auxiliar table infos of a ticket in INFO/VALOR format.
+    path: String. Parquet file.
+    ticket: String. Ticket code.
+    columns: List. Necessary columns.
+    """
+    df = _aux_table(path)
+    ticket = ticket.strip().upper()
+    if ticket in df.index:  # Direct lookup, no full column scan.
+        values = [df.at[ticket, column] for column in columns]
+    else:
+        values = [None] * len(columns)
+    return pd.DataFrame({"INFO": columns, "VALOR": values})
+
+
+def etfbr_auxtable(session=None, workers=4, rate=None, incremental=False):
+    """
+    Summary.
+
+    Retrieve the auxiliar table for brazilian ETFs.
+    session: Session. Requests session, the shared one by default.
+    workers: Integer. Simultaneous page downloads.
+    rate: Float. Requests per second to the website during the crawl
+    (see transport.rate_limit), None keeps the configured one.
+    incremental: Boolean. Parse and upsert only the changed pages.
+    """
+    url_format = ("https://investidor10.com.br/etfs/?order=ticker&" +
+                  "dir=asc&page={}")  # URL.
+    source = (url_format, 5, _parse_etfbr_page, _format_etfbr)
+    return _auxtable(source, ETFBR_AUX, incremental, session, workers, rate)
+
+
+def etf_auxtable(session=None, workers=8, rate=None, incremental=False):
+    """
+    Summary.
+
+    Retrieve the auxiliar table for ETFs.
+    session: Session. Requests session, the shared one by default.
+    workers: Integer. Simultaneous page downloads.
+    rate: Float. Requests per second to the website during the crawl
+    (see transport.rate_limit), None keeps the configured one.
+    incremental: Boolean. Parse and upsert only the changed pages.
+    """
+    url_format = ("https://investidor10.com.br/etfs-global/?" +
+                  "order=ticker&dir=asc&page={}")  # URL.
+    source = (url_format, 105, _parse_etf_page, _format_etf)
+    return _auxtable(source, ETF_AUX, incremental, session, workers, rate)
+
+
 class StocksBR:
     """
     Summary.
@@ -286,18 +399,55 @@ class StocksBR:
     Retrieve the brazilian stocks companies infos.
     """
 
-    def __init__(self, ticket):
+    # Only the data sections are parsed (see html_tree.slice_sections).
+    # The other classes parse the whole page: they read absolute XPaths
+    # (/html/body/...) or cards spread over the page ("cell" divs).
+    _SECTIONS = [
+        ("div", {"class": "basic_info"}),
+        ("div", {"class": "table grid-3", "id": "table-indicators-company"}),
+        ("section", {"id": "cards-ticker"}),
+        ("div", {"class": "table table-bordered outter-borderless",
+                 "id": "table-indicators"})]
+
+    def __init__(self, ticket, session=None):
         self.ticket = ticket
+        self.session = session if session is not None else get_session()
         url = "https://investidor10.com.br/acoes/{}"
         self.url = url.format(ticket.lower())
+        self._snapshot = None  # Page fetched and parsed once.
 
-    def _get_soup(self):
-        url = self.url
-        page = requests.get(url, headers=headers, timeout=None)
-        soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
-        dom = etree.HTML(str(soup))
+    @labelled
+    def download(self):
+        """
+        Summary.
+
+        Function to download the page, returning (html, status code).
+        """
+        page = fetch(self.url, "quote", session=self.session)
+        return page.text, page.status_code
+
+    def load(self, html, status_code=200):
+        """
+        Summary.
+
+        Function to use a page downloaded elsewhere (see download), e.g.
+        parsing it in another process.
+        html: String. Page HTML.
+        status_code: Integer. HTTP status of the download.
+        """
+        self._snapshot = self._load_page(html, status_code)
+        return self
+
+    @labelled
+    def _fetch_page(self):
+        return self._load_page(*self.download())
+
+    @labelled
+    def _load_page(self, html, status_code):
+        # Getting HTML (one lxml tree of the data sections).
+        soup, dom = parse(html, self._SECTIONS)
         # Checking if asset exist.
-        if (page.status_code != 200 or
+        if (status_code != 200 or
             soup.find("div", {"class": "basic_info"}) is None or
             soup.find("div",
                       {"class": "table grid-3",
@@ -306,9 +456,23 @@ class StocksBR:
             soup.find("div", {"class": "table table-bordered outter-" +
                               "borderless",
                               "id": "table-indicators"}) is None):
-            raise ValueError("Asset does not exist")
+            raise AssetNotFound("Asset does not exist")
         return soup, dom
 
+    def _get_soup(self):
+        if self._snapshot is None:  # Downloading and parsing just once.
+            self._snapshot = self._fetch_page()
+        return self._snapshot
+
+    def refresh(self):
+        """
+        Summary.
+
+        Function to discard the page snapshot, forcing a new download.
+        """
+        self._snapshot = None
+
+    @timed("xpath_common")
     def _parse_common_data(self):
         tmp = []
         tmp.append({"INFO": "TICKET", "VALOR": self.ticket.strip().upper()})
@@ -317,9 +481,10 @@ class StocksBR:
         df = _clean_cards(df=df)
         return df
 
+    @timed("parse_cards")
     def _parse_company(self, soup):
         # Company 1.
-        table = soup.find("div", {"class": "basic_info"})
+        table = soup.expect("div", {"class": "basic_info"})
         tmp = []
         for row in table.find_all("tr"):
             column = row.find_all("td")
@@ -330,8 +495,8 @@ class StocksBR:
         df1 = pd.DataFrame(tmp)  # Temporary dataframe.
 
         # Company 2.
-        cells = soup.find("div", {"class": "table grid-3",
-                                  "id": "table-indicators-company"})
+        cells = soup.expect("div", {"class": "table grid-3",
+                                    "id": "table-indicators-company"})
         cells = cells.find_all("div", {"class": "cell"})
         tmp = []
         for cell in cells:
@@ -356,8 +521,9 @@ class StocksBR:
         company = _clean_cards(df=company)
         return company
 
+    @timed("parse_cards")
     def _parse_price(self, soup):
-        cells = soup.find("section", id="cards-ticker")
+        cells = soup.expect("section", id="cards-ticker")
         cells = cells.select("._card")
         tmp = []
         for cell in cells:
@@ -375,10 +541,11 @@ class StocksBR:
         price = _clean_cards(df=price)
         return price
 
+    @timed("parse_cards")
     def _parse_kpi(self, soup):
-        cells = soup.find("div",
-                          {"class": "table table-bordered outter-" +
-                           "borderless", "id": "table-indicators"})
+        cells = soup.expect("div",
+                            {"class": "table table-bordered outter-" +
+                             "borderless", "id": "table-indicators"})
         cells = cells.find_all("div", {"class": "cell"})
         tmp = []
         for cell in cells:
@@ -398,10 +565,9 @@ class StocksBR:
         kpi = _clean_cards(df=kpi)
         return kpi
 
+    @timed("adjust_columns")
     def _adjust_columns(self, df):
-        df = df.T  # Transposing.
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
+        df = wide_row(df)  # One row, INFO values as columns.
         column_mapping = {
             "Nº TOTAL DE PAPEIS": "QUANTIDADE DE PAPÉIS",
             "P/CAP.GIRO": "P/CAPITAL DE GIRO", "CNPJ:": "CNPJ",
@@ -418,11 +584,12 @@ class StocksBR:
         df = df.rename(columns=column_mapping)
         return df
 
-    def info(self):
+    def info(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian stocks infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup = self._get_soup()[0]
         df1 = self._parse_common_data()
@@ -434,16 +601,19 @@ class StocksBR:
                "SEGMENTO"]
         df = df.loc[:, [col for col in tmp if col in df.columns]]
 
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def price(self):
+    def price(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian stocks prices infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup = self._get_soup()[0]
         df1 = self._parse_common_data()
@@ -456,19 +626,22 @@ class StocksBR:
         df = df.loc[:, [col for col in tmp if col in df.columns]]
 
         tmp = ["VARIAÇÃO DE COTAÇÃO 1 ANO"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         tmp = ["COTAÇÃO"]
-        df = _numeric_columns(df=df, columns=tmp)
+        df = numeric_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def kpi(self):
+    def kpi(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian stocks kpis infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup = self._get_soup()[0]
         df1 = self._parse_common_data()
@@ -498,7 +671,7 @@ class StocksBR:
                "ROE", "ROIC", "CAGR LUCROS 5 ANOS", "TICKET", "MOEDA",
                "MARGEM LÍQUIDA", "MARGEM BRUTA", "MARGEM EBIT",
                "MARGEM EBITDA", "CAGR RECEITAS 5 ANOS"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         tmp = ["VALOR DE MERCADO", "VALOR DE FIRMA", "PATRIMÔNIO LÍQUIDO",
                "QUANTIDADE DE PAPÉIS", "ATIVOS", "ATIVO CIRCULANTE",
@@ -510,23 +683,23 @@ class StocksBR:
                "PATRIMÔNIO LÍQUIDO/ATIVOS", "DÍVIDA LÍQUIDA/EBIT", "EV/EBITDA",
                "QUANTIDADE DE FUNCIONÁRIOS", "P/RECEITA LÍQUIDA", "P/EBITDA",
                "DÍVIDA LÍQUIDA/EBITDA"]
-        df = _numeric_columns(df=df, columns=tmp)
+        df = numeric_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def table(self):
+    def record(self):
         """
         Summary.
 
-        Function to aggregate the brazilian stocks full infos.
+        Function to aggregate the brazilian stocks full infos as a dictionary
+        (one table row).
         """
-        df = pd.concat([self.info(), self.price(), self.kpi()])
-        df = df.drop_duplicates()  # Remove duplicates.
-        df = df.T.reset_index(drop=False)
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
-        df = df.drop(["INFO"], axis=1, errors="ignore")  # Removing column.
+        row = merge_rows([self.info(wide=True),
+                          self.price(wide=True),
+                          self.kpi(wide=True)])
 
         tmp = ["COTAÇÃO", "VALOR DE MERCADO", "VALOR DE FIRMA", "P/EBITDA",
                "QUANTIDADE DE PAPÉIS", "ATIVOS", "ATIVO CIRCULANTE",
@@ -539,18 +712,25 @@ class StocksBR:
                "QUANTIDADE DE FUNCIONÁRIOS", "P/RECEITA LÍQUIDA",
                "DÍVIDA LÍQUIDA/EBITDA", "PATRIMÔNIO LÍQUIDO"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = pd.to_numeric(df[column], errors="coerce")
+            if column in row:
+                row[column] = to_number(row[column])
 
         tmp = ["VARIAÇÃO DE COTAÇÃO 1 ANO", "FREE FLOAT", "TAG ALONG",
                "DIVIDEND YIELD", "PAYOUT", "ROA", "ROE", "ROIC",
                "CAGR LUCROS 5 ANOS", "MARGEM LÍQUIDA", "MARGEM BRUTA",
                "MARGEM EBIT", "MARGEM EBITDA", "CAGR RECEITAS 5 ANOS"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = df[column].str.replace("%", "", regex=False)
-                df[column] = pd.to_numeric(df[column], errors="coerce")
-        return df
+            if column in row:
+                row[column] = to_number(row[column], percent=True)
+        return row
+
+    def table(self):
+        """
+        Summary.
+
+        Function to aggregate the brazilian stocks full infos.
+        """
+        return apply_schema(pd.DataFrame([self.record()]))
 
 
 class ReitsBR:
@@ -560,23 +740,63 @@ class ReitsBR:
     Retrieve the brazilian reits companies infos.
     """
 
-    def __init__(self, ticket):
+    def __init__(self, ticket, session=None):
         self.ticket = ticket
+        self.session = session if session is not None else get_session()
         url = "https://investidor10.com.br/fiis/{}"
         self.url = url.format(ticket.lower())
+        self._snapshot = None  # Page fetched and parsed once.
 
-    def _get_soup(self):
-        url = self.url
-        page = requests.get(url, headers=headers, timeout=None)
-        soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
-        dom = etree.HTML(str(soup))
+    @labelled
+    def download(self):
+        """
+        Summary.
+
+        Function to download the page, returning (html, status code).
+        """
+        page = fetch(self.url, "quote", session=self.session)
+        return page.text, page.status_code
+
+    def load(self, html, status_code=200):
+        """
+        Summary.
+
+        Function to use a page downloaded elsewhere (see download), e.g.
+        parsing it in another process.
+        html: String. Page HTML.
+        status_code: Integer. HTTP status of the download.
+        """
+        self._snapshot = self._load_page(html, status_code)
+        return self
+
+    @labelled
+    def _fetch_page(self):
+        return self._load_page(*self.download())
+
+    @labelled
+    def _load_page(self, html, status_code):
+        soup, dom = parse(html)  # Getting HTML (one lxml tree).
         # Checking if asset exist.
-        if (page.status_code != 200 or
+        if (status_code != 200 or
            soup.find_all("div", {"class": "cell"}) is None or
            soup.find("section", id="cards-ticker") is None):
-            raise ValueError("Asset does not exist")
+            raise AssetNotFound("Asset does not exist")
         return soup, dom
 
+    def _get_soup(self):
+        if self._snapshot is None:  # Downloading and parsing just once.
+            self._snapshot = self._fetch_page()
+        return self._snapshot
+
+    def refresh(self):
+        """
+        Summary.
+
+        Function to discard the page snapshot, forcing a new download.
+        """
+        self._snapshot = None
+
+    @timed("xpath_common")
     def _parse_common_data(self):
         tmp = []
         tmp.append({"INFO": "TICKET", "VALOR": self.ticket.strip().upper()})
@@ -585,6 +805,7 @@ class ReitsBR:
         df = _clean_cards(df=df)
         return df
 
+    @timed("parse_cards")
     def _parse_company(self, soup):
         cells = soup.find_all("div", {"class": "cell"})
         tmp = []
@@ -602,8 +823,9 @@ class ReitsBR:
         company = _clean_cards(df=company)
         return company
 
+    @timed("parse_cards")
     def _parse_price(self, soup):
-        cells = soup.find("section", id="cards-ticker")
+        cells = soup.expect("section", id="cards-ticker")
         cells = cells.select("._card")
         tmp = []
         for cell in cells:
@@ -619,10 +841,9 @@ class ReitsBR:
         price = _clean_cards(df=price)
         return price
 
+    @timed("adjust_columns")
     def _adjust_columns(self, df):
-        df = df.T  # Transposing.
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
+        df = wide_row(df)  # One row, INFO values as columns.
         column_mapping = {
             "RAZÃO SOCIAL": "NOME", "LIQUIDEZ DIÁRIA": "LIQUIDEZ",
             "TIPO DE FUNDO": "SETOR", "TIPO DE GESTÃO": "GESTÃO",
@@ -635,11 +856,12 @@ class ReitsBR:
         df = df.rename(columns=column_mapping)
         return df
 
-    def info(self):
+    def info(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian reits infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup = self._get_soup()[0]
         df1 = self._parse_common_data()
@@ -651,16 +873,19 @@ class ReitsBR:
                "SEGMENTO", "SETOR", "PRAZO DE DURAÇÃO", "GESTÃO"]
         df = df.loc[:, [col for col in tmp if col in df.columns]]
 
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def price(self):
+    def price(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian reits prices infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup = self._get_soup()[0]
         df1 = self._parse_common_data()
@@ -675,19 +900,22 @@ class ReitsBR:
         df = df.loc[:, [col for col in tmp if col in df.columns]]
 
         tmp = ["TICKET", "MOEDA", "VARIAÇÃO DE COTAÇÃO 1 ANO"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         tmp = ["COTAÇÃO", "ÚLTIMO RENDIMENTO"]
-        df = _numeric_columns(df=df, columns=tmp)
+        df = numeric_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def kpi(self):
+    def kpi(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian reits kpis infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup = self._get_soup()[0]
         df1 = self._parse_common_data()
@@ -705,11 +933,11 @@ class ReitsBR:
 
         tmp = ["TICKET", "MOEDA", "VACÂNCIA", "DIVIDEND YIELD",
                "TAXA ADMINISTRATIVA"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         tmp = ["QUANTIDADE DE COTISTAS", "QUANTIDADE DE COTAS", "P/VP",
                "VALOR PATRIMONIAL/COTA"]
-        df = _numeric_columns(df=df, columns=tmp)
+        df = numeric_columns(df=df, columns=tmp)
 
         tmp = ["VALOR PATRIMONIAL", "LIQUIDEZ"]
         for column in tmp:
@@ -718,38 +946,46 @@ class ReitsBR:
                               .str.replace(".", "", regex=False)
                               .str.replace(",", ".", regex=False))
 
-        df["VALOR PATRIMONIAL"] = df["VALOR PATRIMONIAL"].apply(_times)
-        df["LIQUIDEZ"] = df["LIQUIDEZ"].apply(_times2)
+        df["VALOR PATRIMONIAL"] = magnitude(df["VALOR PATRIMONIAL"],
+                                            WORD_UNITS)
+        df["LIQUIDEZ"] = magnitude(df["LIQUIDEZ"], LETTER_UNITS)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def table(self):
+    def record(self):
         """
         Summary.
 
-        Function to aggregate the brazilian reits full infos.
+        Function to aggregate the brazilian reits full infos as a dictionary
+        (one table row).
         """
-        df = pd.concat([self.info(), self.price(), self.kpi()])
-        df = df.drop_duplicates()  # Remove duplicates.
-        df = df.T.reset_index(drop=False)
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
-        df = df.drop(["INFO"], axis=1, errors="ignore")  # Necessary rows.
+        row = merge_rows([self.info(wide=True),
+                          self.price(wide=True),
+                          self.kpi(wide=True)])
 
         tmp = ["ÚLTIMO RENDIMENTO", "QUANTIDADE DE COTISTAS", "P/VP",
                "QUANTIDADE DE COTAS", "VALOR PATRIMONIAL/COTA", "COTAÇÃO",
                "VALOR PATRIMONIAL", "LIQUIDEZ"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = pd.to_numeric(df[column], errors="coerce")
+            if column in row:
+                row[column] = to_number(row[column])
 
         tmp = ["VARIAÇÃO DE COTAÇÃO 1 ANO", "VACÂNCIA", "DIVIDEND YIELD"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = df[column].str.replace("%", "", regex=False)
-                df[column] = pd.to_numeric(df[column], errors="coerce")
-        return df
+            if column in row:
+                row[column] = to_number(row[column], percent=True)
+        return row
+
+    def table(self):
+        """
+        Summary.
+
+        Function to aggregate the brazilian reits full infos.
+        """
+        return apply_schema(pd.DataFrame([self.record()]))
 
 
 class ETFsBR:
@@ -759,26 +995,68 @@ class ETFsBR:
     Retrieve the brazilian ETFs companies infos.
     """
 
-    def __init__(self, ticket):
+    # Page layout selectors, compiled once (see compile_plan).
+    _XPATHS = compile_plan({
+        "nome": "/html/body/div[4]/main/header/div[2]/div/div[1]/div[2]/h2"})
+
+    def __init__(self, ticket, session=None):
         self.ticket = ticket
-        self.aux = pd.read_parquet("INVESTIDOR-10_ETFS-BR_AUX.parquet")
+        self.session = session if session is not None else get_session()
         url = "https://investidor10.com.br/etfs/{}"
         self.url = url.format(ticket.lower())
+        self._snapshot = None  # Page fetched and parsed once.
 
-    def _get_soup(self):
-        url = self.url
-        page = requests.get(url, headers=headers, timeout=None)
-        soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
-        dom = etree.HTML(str(soup))
+    @labelled
+    def download(self):
+        """
+        Summary.
+
+        Function to download the page, returning (html, status code).
+        """
+        page = fetch(self.url, "quote", session=self.session)
+        return page.text, page.status_code
+
+    def load(self, html, status_code=200):
+        """
+        Summary.
+
+        Function to use a page downloaded elsewhere (see download), e.g.
+        parsing it in another process.
+        html: String. Page HTML.
+        status_code: Integer. HTTP status of the download.
+        """
+        self._snapshot = self._load_page(html, status_code)
+        return self
+
+    @labelled
+    def _fetch_page(self):
+        return self._load_page(*self.download())
+
+    @labelled
+    def _load_page(self, html, status_code):
+        soup, dom = parse(html)  # Getting HTML (one lxml tree).
         # Checking if asset exist.
-        if (page.status_code != 200 or
+        if (status_code != 200 or
            soup.find("section", id="cards-ticker") is None):
-            raise ValueError("Asset does not exist")
+            raise AssetNotFound("Asset does not exist")
         return soup, dom
 
+    def _get_soup(self):
+        if self._snapshot is None:  # Downloading and parsing just once.
+            self._snapshot = self._fetch_page()
+        return self._snapshot
+
+    def refresh(self):
+        """
+        Summary.
+
+        Function to discard the page snapshot, forcing a new download.
+        """
+        self._snapshot = None
+
+    @timed("xpath_common")
     def _parse_common_data(self, dom):
-        nome = dom.xpath("/html/body/div[4]/main/header/div[2]/div/" +
-                         "div[1]/div[2]/h2")
+        nome = self._XPATHS["nome"](dom)
         nome = (nome[0].text.upper().strip()
                 if nome and nome[0].text else None)
         infos = []
@@ -789,8 +1067,9 @@ class ETFsBR:
         df = _clean_cards(df=df)
         return df
 
+    @timed("parse_cards")
     def _parse_price(self, soup):
-        cells = soup.find("section", id="cards-ticker")
+        cells = soup.expect("section", id="cards-ticker")
         cells = cells.select(".br ._card")
         tmp = []
         for cell in cells:
@@ -807,10 +1086,9 @@ class ETFsBR:
         price = _clean_cards(df=price)
         return price
 
+    @timed("adjust_columns")
     def _adjust_columns(self, df):
-        df = df.T  # Transposing.
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
+        df = wide_row(df)  # One row, INFO values as columns.
         column_mapping = {
             "DY": "DIVIDEND YIELD", "CAPITALIZAÇÃO": "VALOR DE MERCADO",
             "VARIAÇÃO (12M)": "VARIAÇÃO DE COTAÇÃO 1 ANO",
@@ -818,30 +1096,30 @@ class ETFsBR:
         df = df.rename(columns=column_mapping)
         return df
 
-    def info(self):
+    def info(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian ETFs infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         dom = self._get_soup()[1]
         df = self._parse_common_data(dom)
         df = df.drop([2])  # Removing unnecessary rows.
+        if wide:  # One row per ticket (see record).
+            return wide_row(df)
         return df
 
-    def price(self):
+    def price(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian ETFs prices infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
-        df1 = self.aux
-        df1 = df1[df1["ATIVO"] == self.ticket.strip().upper()]
-        df1 = df1[["VARIAÇÃO DE COTAÇÃO 1 MÊS"]]
-        df1 = df1.reset_index(drop=True)
-        df1 = df1.T.reset_index(drop=False)
-        df1 = df1.rename(columns={"index": "INFO", 0: "VALOR"})
+        df1 = _aux_info(ETFBR_AUX, self.ticket,
+                        ["VARIAÇÃO DE COTAÇÃO 1 MÊS"])
         df2 = self._parse_common_data(dom)
         df3 = self._parse_price(soup)
         df = pd.concat([df1, df2, df3])
@@ -853,27 +1131,25 @@ class ETFsBR:
 
         tmp = ["TICKET", "MOEDA", "VARIAÇÃO DE COTAÇÃO 1 ANO",
                "VARIAÇÃO DE COTAÇÃO 5 ANOS"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         tmp = ["COTAÇÃO"]
-        df = _numeric_columns(df=df, columns=tmp)
+        df = numeric_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def kpi(self):
+    def kpi(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian ETFs kpis infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
-        df1 = self.aux
-        df1 = df1[df1["ATIVO"] == self.ticket.strip().upper()]
-        df1 = df1[["LIQUIDEZ"]]
-        df1 = df1.reset_index(drop=True)
-        df1 = df1.T.reset_index(drop=False)
-        df1 = df1.rename(columns={"index": "INFO", 0: "VALOR"})
+        df1 = _aux_info(ETFBR_AUX, self.ticket, ["LIQUIDEZ"])
         df2 = self._parse_common_data(dom)
         df3 = self._parse_price(soup)
         df = pd.concat([df1, df2, df3])
@@ -884,40 +1160,48 @@ class ETFsBR:
         df = df.loc[:, [col for col in tmp if col in df.columns]]
 
         tmp = ["DIVIDEND YIELD"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         df["VALOR DE MERCADO"] = (df["VALOR DE MERCADO"]
                                   .str.replace("R$\n", "", regex=False))
-        df["VALOR DE MERCADO"] = df["VALOR DE MERCADO"].apply(_times2)
+        df["VALOR DE MERCADO"] = magnitude(df["VALOR DE MERCADO"],
+                                           LETTER_UNITS)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def table(self):
+    def record(self):
         """
         Summary.
 
-        Function to aggregate the brazilian ETFs full infos.
+        Function to aggregate the brazilian ETFs full infos as a dictionary
+        (one table row).
         """
-        df = pd.concat([self.info(), self.price(), self.kpi()])
-        df = df.drop_duplicates()  # Remove duplicates.
-        df = df.T.reset_index(drop=False)
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
-        df = df.drop(["INFO"], axis=1, errors="ignore")  # Necessary rows.
+        row = merge_rows([self.info(wide=True),
+                          self.price(wide=True),
+                          self.kpi(wide=True)])
 
         tmp = ["COTAÇÃO", "VALOR DE MERCADO", "LIQUIDEZ"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = pd.to_numeric(df[column], errors="coerce")
+            if column in row:
+                row[column] = to_number(row[column])
 
         tmp = ["VARIAÇÃO DE COTAÇÃO 1 ANO", "VARIAÇÃO DE COTAÇÃO 5 ANOS",
                "DIVIDEND YIELD"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = df[column].str.replace("%", "", regex=False)
-                df[column] = pd.to_numeric(df[column], errors="coerce")
-        return df
+            if column in row:
+                row[column] = to_number(row[column], percent=True)
+        return row
+
+    def table(self):
+        """
+        Summary.
+
+        Function to aggregate the brazilian ETFs full infos.
+        """
+        return apply_schema(pd.DataFrame([self.record()]))
 
 
 class StocksReits:
@@ -927,22 +1211,54 @@ class StocksReits:
     Retrieve the stocks and reits companies infos.
     """
 
-    def __init__(self, ticket, type_asset):
+    # Page layout selectors, compiled once (see compile_plan).
+    _XPATHS = compile_plan({
+        "empresa": "/html/body/div[4]/main/header/div[2]/div/div[1]/div[2]/h2",
+        "cotacao_brl": ("/html/body/div[4]/main/section/div/section[1]/" +
+                        "div[1]/div[2]/div/span[2]")})
+
+    def __init__(self, ticket, type_asset, session=None):
         self.ticket = ticket
+        self.session = session if session is not None else get_session()
         if type_asset == "STOCKS":
             urls = "https://investidor10.com.br/stocks/{}"
             self.url = urls.format(ticket.lower())
         elif type_asset == "REITS":
             urlr = "https://investidor10.com.br/reits/{}"
             self.url = urlr.format(ticket.lower())
+        self._snapshot = None  # Page fetched and parsed once.
 
-    def _get_soup(self):
-        url = self.url
-        page = requests.get(url, headers=headers, timeout=None)
-        soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
-        dom = etree.HTML(str(soup))
+    @labelled
+    def download(self):
+        """
+        Summary.
+
+        Function to download the page, returning (html, status code).
+        """
+        page = fetch(self.url, "quote", session=self.session)
+        return page.text, page.status_code
+
+    def load(self, html, status_code=200):
+        """
+        Summary.
+
+        Function to use a page downloaded elsewhere (see download), e.g.
+        parsing it in another process.
+        html: String. Page HTML.
+        status_code: Integer. HTTP status of the download.
+        """
+        self._snapshot = self._load_page(html, status_code)
+        return self
+
+    @labelled
+    def _fetch_page(self):
+        return self._load_page(*self.download())
+
+    @labelled
+    def _load_page(self, html, status_code):
+        soup, dom = parse(html)  # Getting HTML (one lxml tree).
         # Checking if asset exist.
-        if (page.status_code != 200 or
+        if (status_code != 200 or
             soup.find("div", {"class": "basic_info"}) is None or
             soup.find("div", {"class": "table grid-3",
                               "id": "table-indicators-company"}) is None or
@@ -950,16 +1266,28 @@ class StocksReits:
             soup.find("div", {"class": "table table-bordered outter-" +
                               "borderless three_columns",
                               "id": "table-indicators"}) is None):
-            raise ValueError("Asset does not exist")
+            raise AssetNotFound("Asset does not exist")
         return soup, dom
 
+    def _get_soup(self):
+        if self._snapshot is None:  # Downloading and parsing just once.
+            self._snapshot = self._fetch_page()
+        return self._snapshot
+
+    def refresh(self):
+        """
+        Summary.
+
+        Function to discard the page snapshot, forcing a new download.
+        """
+        self._snapshot = None
+
+    @timed("xpath_common")
     def _parse_common_data(self, dom):
-        empresa = dom.xpath("/html/body/div[4]/main/header/div[2]/div/" +
-                            "div[1]/div[2]/h2")
+        empresa = self._XPATHS["empresa"](dom)
         empresa = (empresa[0].text.upper().strip()
                    if empresa and empresa[0].text else None)
-        cotacao_brl = dom.xpath("/html/body/div[4]/main/section/div/" +
-                                "section[1]/div[1]/div[2]/div/span[2]")
+        cotacao_brl = self._XPATHS["cotacao_brl"](dom)
         cotacao_brl = (cotacao_brl[0].text.upper().strip()
                        if cotacao_brl and cotacao_brl[0].text else None)
         infos = []
@@ -971,9 +1299,10 @@ class StocksReits:
         df = _clean_cards(df=df)
         return df
 
+    @timed("parse_cards")
     def _parse_company(self, soup):
         # Company 1.
-        table = soup.find("div", {"class": "basic_info"})
+        table = soup.expect("div", {"class": "basic_info"})
         tmp = []
         for row in table.find_all("tr"):
             column = row.find_all("td")
@@ -984,8 +1313,8 @@ class StocksReits:
         df1 = pd.DataFrame(tmp)  # Temporary dataframe.
 
         # Company 2.
-        cells = soup.find("div", {"class": "table grid-3",
-                                  "id": "table-indicators-company"})
+        cells = soup.expect("div", {"class": "table grid-3",
+                                    "id": "table-indicators-company"})
         cells = cells.find_all("div", {"class": "cell"})
         tmp = []
         for cell in cells:
@@ -1009,8 +1338,9 @@ class StocksReits:
         company = _clean_cards(df=company)
         return company
 
+    @timed("parse_cards")
     def _parse_price(self, soup):
-        cells = soup.find("section", id="cards-ticker")
+        cells = soup.expect("section", id="cards-ticker")
         cells = cells.select("._card")
         tmp = []
         for cell in cells:
@@ -1028,11 +1358,12 @@ class StocksReits:
         price = _clean_cards(df=price)
         return price
 
+    @timed("parse_cards")
     def _parse_kpi(self, soup):
-        cells = soup.find("div",
-                          {"class": "table table-bordered outter-" +
-                           "borderless three_columns",
-                           "id": "table-indicators"})
+        cells = soup.expect("div",
+                            {"class": "table table-bordered outter-" +
+                             "borderless three_columns",
+                             "id": "table-indicators"})
         cells = cells.find_all("div", {"class": "cell"})
         tmp = []
         for cell in cells:
@@ -1052,10 +1383,9 @@ class StocksReits:
         kpi = _clean_cards(df=kpi)
         return kpi
 
+    @timed("adjust_columns")
     def _adjust_columns(self, df):
-        df = df.T  # Transposing.
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
+        df = wide_row(df)  # One row, INFO values as columns.
         column_mapping = {
             "Nº TOTAL DE PAPEIS": "QUANTIDADE DE PAPÉIS", "CEO:": "CEO",
             "INDÚSTRIA": "SUBSETOR", "SETOR": "SETOR",
@@ -1072,11 +1402,12 @@ class StocksReits:
         df = df.rename(columns=column_mapping)
         return df
 
-    def info(self):
+    def info(self, wide=False):
         """
         Summary.
 
         Function to retrieve the stocks and reits infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
         df1 = self._parse_common_data(dom)
@@ -1088,16 +1419,19 @@ class StocksReits:
                "SUBSETOR", "CEO"]
         df = df.loc[:, [col for col in tmp if col in df.columns]]
 
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def price(self):
+    def price(self, wide=False):
         """
         Summary.
 
         Function to retrieve the stocks and reits prices infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
         df1 = self._parse_common_data(dom)
@@ -1109,19 +1443,22 @@ class StocksReits:
         df = df.loc[:, [col for col in tmp if col in df.columns]]
 
         tmp = ["TICKET", "MOEDA", "VARIAÇÃO DE COTAÇÃO USD 1 ANO"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         tmp = ["COTAÇÃO USD", "COTAÇÃO BRL"]
-        df = _numeric_columns(df=df, columns=tmp)
+        df = numeric_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def kpi(self):
+    def kpi(self, wide=False):
         """
         Summary.
 
         Function to retrieve the stocks and reits kpis infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
         df1 = self._parse_common_data(dom)
@@ -1142,29 +1479,29 @@ class StocksReits:
         tmp = ["DIVIDEND YIELD", "ROA", "ROE", "ROIC", "MARGEM LÍQUIDA",
                "MARGEM BRUTA", "MARGEM OPERACIONAL", "CAGR RECEITAS 5 ANOS",
                "CAGR LUCROS 5 ANOS", "TICKET", "MOEDA"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         tmp = ["VALOR DE MERCADO USD", "PATRIMÔNIO LÍQUIDO USD", "P/EBITDA",
                "ATIVOS USD", "QUANTIDADE DE PAPÉIS", "LIQUIDEZ USD", "P/L",
                "P/RECEITA LÍQUIDA", "P/VP", "P/EBIT", "P/ATIVO", "VPA", "LPA",
                "PATRIMÔNIO LÍQUIDO/ATIVOS", "QUANTIDADE DE FUNCIONÁRIOS"]
-        df = _numeric_columns(df=df, columns=tmp)
+        df = numeric_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def table(self):
+    def record(self):
         """
         Summary.
 
-        Function to aggregate the brazilian stocks and reits full infos.
+        Function to aggregate the brazilian stocks and reits full infos as a
+        dictionary (one table row).
         """
-        df = pd.concat([self.info(), self.price(), self.kpi()])
-        df = df.drop_duplicates()  # Remove duplicates.
-        df = df.T.reset_index(drop=False)
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
-        df = df.drop(["INFO"], axis=1, errors="ignore")  # Necessary rows.
+        row = merge_rows([self.info(wide=True),
+                          self.price(wide=True),
+                          self.kpi(wide=True)])
 
         tmp = ["COTAÇÃO USD", "COTAÇÃO BRL", "VALOR DE MERCADO USD",
                "PATRIMÔNIO LÍQUIDO USD", "P/EBITDA", "ATIVOS USD",
@@ -1172,17 +1509,24 @@ class StocksReits:
                "P/RECEITA LÍQUIDA", "P/VP", "P/EBIT", "P/ATIVO", "VPA", "LPA",
                "PATRIMÔNIO LÍQUIDO/ATIVOS", "QUANTIDADE DE FUNCIONÁRIOS"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = pd.to_numeric(df[column], errors="coerce")
+            if column in row:
+                row[column] = to_number(row[column])
 
         tmp = ["VARIAÇÃO DE COTAÇÃO USD 1 ANO", "DIVIDEND YIELD", "ROA", "ROE",
                "ROIC", "MARGEM LÍQUIDA", "MARGEM BRUTA", "MARGEM OPERACIONAL",
                "CAGR RECEITAS 5 ANOS", "CAGR LUCROS 5 ANOS"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = df[column].str.replace("%", "", regex=False)
-                df[column] = pd.to_numeric(df[column], errors="coerce")
-        return df
+            if column in row:
+                row[column] = to_number(row[column], percent=True)
+        return row
+
+    def table(self):
+        """
+        Summary.
+
+        Function to aggregate the brazilian stocks and reits full infos.
+        """
+        return apply_schema(pd.DataFrame([self.record()]))
 
 
 class ETFs:
@@ -1192,30 +1536,73 @@ class ETFs:
     Retrieve the ETFs companies infos.
     """
 
-    def __init__(self, ticket):
+    # Page layout selectors, compiled once (see compile_plan).
+    _XPATHS = compile_plan({
+        "nome": "/html/body/div[4]/main/header/div[2]/div/div[1]/div[2]/h2",
+        "cotacao_brl": ("/html/body/div[4]/main/section/div/section[1]/" +
+                        "div[1]/div[2]/div/span[2]")})
+
+    def __init__(self, ticket, session=None):
         self.ticket = ticket
-        self.aux = pd.read_parquet("INVESTIDOR-10_ETFS_AUX.parquet")
+        self.session = session if session is not None else get_session()
         url = "https://investidor10.com.br/etfs-global/{}"
         self.url = url.format(ticket.lower())
+        self._snapshot = None  # Page fetched and parsed once.
 
-    def _get_soup(self):
-        url = self.url
-        page = requests.get(url, headers=headers, timeout=None)
-        soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
-        dom = etree.HTML(str(soup))
+    @labelled
+    def download(self):
+        """
+        Summary.
+
+        Function to download the page, returning (html, status code).
+        """
+        page = fetch(self.url, "quote", session=self.session)
+        return page.text, page.status_code
+
+    def load(self, html, status_code=200):
+        """
+        Summary.
+
+        Function to use a page downloaded elsewhere (see download), e.g.
+        parsing it in another process.
+        html: String. Page HTML.
+        status_code: Integer. HTTP status of the download.
+        """
+        self._snapshot = self._load_page(html, status_code)
+        return self
+
+    @labelled
+    def _fetch_page(self):
+        return self._load_page(*self.download())
+
+    @labelled
+    def _load_page(self, html, status_code):
+        soup, dom = parse(html)  # Getting HTML (one lxml tree).
         # Checking if asset exist.
-        if (page.status_code != 200 or
+        if (status_code != 200 or
            soup.find("section", id="cards-ticker") is None):
-            raise ValueError("Asset does not exist")
+            raise AssetNotFound("Asset does not exist")
         return soup, dom
 
+    def _get_soup(self):
+        if self._snapshot is None:  # Downloading and parsing just once.
+            self._snapshot = self._fetch_page()
+        return self._snapshot
+
+    def refresh(self):
+        """
+        Summary.
+
+        Function to discard the page snapshot, forcing a new download.
+        """
+        self._snapshot = None
+
+    @timed("xpath_common")
     def _parse_common_data(self, dom):
-        nome = dom.xpath("/html/body/div[4]/main/header/div[2]/div/" +
-                         "div[1]/div[2]/h2")
+        nome = self._XPATHS["nome"](dom)
         nome = (nome[0].text.upper().strip()
                 if nome and nome[0].text else None)
-        cotacao_brl = dom.xpath("/html/body/div[4]/main/section/div/" +
-                                "section[1]/div[1]/div[2]/div/span[2]")
+        cotacao_brl = self._XPATHS["cotacao_brl"](dom)
         cotacao_brl = (cotacao_brl[0].text.upper().strip()
                        if cotacao_brl and cotacao_brl[0].text else None)
         infos = []
@@ -1227,9 +1614,10 @@ class ETFs:
         df = _clean_cards(df=df)
         return df
 
+    @timed("parse_cards")
     def _parse_price(self, soup):
         # Price.
-        cells = soup.find("section", id="cards-ticker")
+        cells = soup.expect("section", id="cards-ticker")
         cells = cells.select(".global ._card")
         tmp = []
         for cell in cells:
@@ -1246,10 +1634,9 @@ class ETFs:
         price = _clean_cards(df=price)
         return price
 
+    @timed("adjust_columns")
     def _adjust_columns(self, df):
-        df = df.T  # Transposing.
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
+        df = wide_row(df)  # One row, INFO values as columns.
         column_mapping = {
             "COTAÇÃO": "COTAÇÃO USD", "DY": "DIVIDEND YIELD",
             "CAPITALIZAÇÃO": "VALOR DE MERCADO USD",
@@ -1258,30 +1645,30 @@ class ETFs:
         df = df.rename(columns=column_mapping)
         return df
 
-    def info(self):
+    def info(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian ETFs infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
-        dom = self._get_soup()
+        dom = self._get_soup()[1]
         df = self._parse_common_data(dom)
         df = df.drop([2, 3])  # Removing unnecessary rows.
+        if wide:  # One row per ticket (see record).
+            return wide_row(df)
         return df
 
-    def price(self):
+    def price(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian ETFs prices infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
-        df1 = self.aux
-        df1 = df1[df1["ATIVO"] == self.ticket.strip().upper()]
-        df1 = df1[["VARIAÇÃO DE COTAÇÃO USD 1 MÊS"]]
-        df1 = df1.reset_index(drop=True)
-        df1 = df1.T.reset_index(drop=False)
-        df1 = df1.rename(columns={"index": "INFO", 0: "VALOR"})
+        df1 = _aux_info(ETF_AUX, self.ticket,
+                        ["VARIAÇÃO DE COTAÇÃO USD 1 MÊS"])
         df2 = self._parse_common_data(dom, )
         df3 = self._parse_price(soup)
         df = pd.concat([df1, df2, df3])
@@ -1294,27 +1681,25 @@ class ETFs:
 
         tmp = ["TICKET", "MOEDA", "VARIAÇÃO DE COTAÇÃO USD 1 ANO",
                "VARIAÇÃO DE COTAÇÃO USD 5 ANOS"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         tmp = ["COTAÇÃO BRL", "COTAÇÃO USD"]
-        df = _numeric_columns(df=df, columns=tmp)
+        df = numeric_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def kpi(self):
+    def kpi(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian ETFs kpis infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
-        df1 = self.aux
-        df1 = df1[df1["ATIVO"] == self.ticket.strip().upper()]
-        df1 = df1[["LIQUIDEZ USD"]]
-        df1 = df1.reset_index(drop=True)
-        df1 = df1.T.reset_index(drop=False)
-        df1 = df1.rename(columns={"index": "INFO", 0: "VALOR"})
+        df1 = _aux_info(ETF_AUX, self.ticket, ["LIQUIDEZ USD"])
         df2 = self._parse_common_data(dom)
         df3 = self._parse_price(soup)
         df = pd.concat([df1, df2, df3])
@@ -1325,38 +1710,46 @@ class ETFs:
         df = df.loc[:, [col for col in tmp if col in df.columns]]
 
         tmp = ["TICKET", "MOEDA", "DIVIDEND YIELD"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         df["VALOR DE MERCADO USD"] = (df["VALOR DE MERCADO USD"]
                                       .str.replace("US$\n", "", regex=False))
-        df["VALOR DE MERCADO USD"] = df["VALOR DE MERCADO USD"].apply(_times2)
+        df["VALOR DE MERCADO USD"] = magnitude(
+            df["VALOR DE MERCADO USD"], LETTER_UNITS)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def table(self):
+    def record(self):
         """
         Summary.
 
-        Function to aggregate the brazilian ETFs full infos.
+        Function to aggregate the brazilian ETFs full infos as a dictionary
+        (one table row).
         """
-        df = pd.concat([self.info(), self.price(), self.kpi()])
-        df = df.drop_duplicates()  # Remove duplicates.
-        df = df.T.reset_index(drop=False)
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
-        df = df.drop(["INFO"], axis=1, errors="ignore")  # Necessary rows.
+        row = merge_rows([self.info(wide=True),
+                          self.price(wide=True),
+                          self.kpi(wide=True)])
 
         tmp = ["COTAÇÃO BRL", "COTAÇÃO USD", "VALOR DE MERCADO USD",
                "LIQUIDEZ USD"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = pd.to_numeric(df[column], errors="coerce")
+            if column in row:
+                row[column] = to_number(row[column])
 
         tmp = ["VARIAÇÃO DE COTAÇÃO USD 1 ANO", "DIVIDEND YIELD",
                "VARIAÇÃO DE COTAÇÃO USD 5 ANOS"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = df[column].str.replace("%", "", regex=False)
-                df[column] = pd.to_numeric(df[column], errors="coerce")
-        return df
+            if column in row:
+                row[column] = to_number(row[column], percent=True)
+        return row
+
+    def table(self):
+        """
+        Summary.
+
+        Function to aggregate the brazilian ETFs full infos.
+        """
+        return apply_schema(pd.DataFrame([self.record()]))
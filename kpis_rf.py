@@ -5,17 +5,26 @@ Exchange rate function.
 """
 # -*- coding: utf-8 -*-
 
+from io import StringIO
 import pandas as pd
+from transport import fetch
 
+_PARSED = {}  # (Response digest, parsed series) per URL.
 
-def cdi_annually():
+
+def _cdi(url):
     """
     Summary.
 
     Function to access BCB open data API.
+    url: String. SGS 1178 series URL.
     """
-    df = pd.read_json("https://api.bcb.gov.br/dados/serie/bcdata.sgs.1178/" +
-                      "dados?formato=json")
+    page = fetch(url, "rate")
+    # Parsing again only when the response has changed.
+    if _PARSED.get(url, (None,))[0] != page.digest:
+        df = pd.read_json(StringIO(page.text))
+        _PARSED[url] = (page.digest, df)
+    df = _PARSED[url][1].copy()
     df = df.rename(columns={"data": "dataValor", "valor": "numValor"})
     df["dataValor"] = pd.to_datetime(df["dataValor"],
                                      format="%d/%m/%Y").dt.date
@@ -27,13 +36,27 @@ def cdi_annually():
     return df
 
 
+def cdi_annually():
+    """
+    Summary.
+
+    Function to access BCB open data API.
+    """
+    url = ("https://api.bcb.gov.br/dados/serie/bcdata.sgs.1178/" +
+           "dados?formato=json")
+    return _cdi(url)
+
+
 def cdi_annually_today():
     """
     Summary.
 
     Function to access BCB open data API.
     """
-    df = cdi_annually()
+    # Only the last value, not the whole history.
+    url = ("https://api.bcb.gov.br/dados/serie/bcdata.sgs.1178/" +
+           "dados/ultimos/1?formato=json")
+    df = _cdi(url)
     # cdi = (df[df["dataValor"] == dff["dataValor"].max()]
     #        .reset_index(drop=True))
     cdi = df.loc[len(df)-1:, ].reset_index(drop=True)
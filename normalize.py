@@ -0,0 +1,147 @@
+"""
+Summary.
+
+Shared formatting of the scraped string and numeric columns.
+"""
+# -*- coding: utf-8 -*-
+
+from functools import lru_cache
+import re
+import numpy as np
+import pandas as pd
+from timing import timer
+
+# Values meaning "no data" once the replacements are done.
+_STRING_NULLS = frozenset({"-%", "-% A.A", "-", "--", "", "0.00%"})
+_NUMERIC_NULLS = frozenset({"0", "0.00", "-", "--", ""})
+
+# Multipliers of the magnitude suffixes (see magnitude).
+WORD_UNITS = {
+    "MIL": 1_000,
+    "MILHÃO": 1_000_000,
+    "MILHÕES": 1_000_000,
+    "BILHÃO": 1_000_000_000,
+    "BILHÕES": 1_000_000_000,
+    "TRILHÃO": 1_000_000_000_000,
+    "TRILHÕES": 1_000_000_000_000
+}
+LETTER_UNITS = {
+    "K": 1_000,
+    "M": 1_000_000,
+    "B": 1_000_000_000,
+    "T": 1_000_000_000_000
+}
+
+
+def _clean_string(value):
+    """
+    Summary.
+
+    Format one string value.
+    value: String. Scraped value.
+    """
+    if not isinstance(value, str):
+        return np.nan
+    value = value.replace(" %", "%").replace(",", ".").replace(" / ", "/")
+    return None if value in _STRING_NULLS else value.upper()
+
+
+def _clean_number(value):
+    """
+    Summary.
+
+    Format one numeric value (currency symbols and thousands separators).
+    value: String. Scraped value.
+    """
+    if not isinstance(value, str):
+        return None
+    value = (value.replace("R$ ", "").replace("R$\n", "").replace("US$", "")
+             .replace("$ ", "").replace(".", "").replace(",", "."))
+    return None if value in _NUMERIC_NULLS else value
+
+
+def _clean(df, columns, clean):
+    """
+    Summary.
+
+    Apply clean to every value of the columns in a single pass, returning
+    (columns, values).
+    df: Dataframe.
+    columns: Dataframe columns.
+    clean: Function. Value formatter.
+    """
+    columns = [column for column in dict.fromkeys(columns)
+               if column in df.columns]
+    values = df[columns].to_numpy(dtype=object)
+    values = np.array([clean(value) for value in values.ravel()],
+                      dtype=object).reshape(values.shape)
+    return columns, values
+
+
+def string_columns(df, columns):
+    """
+    Summary.
+
+    Format string columns.
+    df: Dataframe.
+    columns: Dataframe columns.
+    """
+    with timer("numeric_normalise", kind="string", rows=len(df)):
+        columns, values = _clean(df, columns, _clean_string)
+        for position, column in enumerate(columns):
+            series = pd.Series(values[:, position], index=df.index,
+                               dtype=object)
+            # Keeping the string dtype while no value became None, as the
+            # pandas replace does.
+            if (isinstance(df[column].dtype, pd.StringDtype)
+                    and series.notna().eq(df[column].notna()).all()):
+                series = series.astype(df[column].dtype)
+            df[column] = series
+    return df
+
+
+def numeric_columns(df, columns):
+    """
+    Summary.
+
+    Format numeric columns.
+    df: Dataframe.
+    columns: Dataframe columns.
+    """
+    with timer("numeric_normalise", kind="numeric", rows=len(df)):
+        columns, values = _clean(df, columns, _clean_number)
+        for position, column in enumerate(columns):
+            df[column] = pd.to_numeric(values[:, position], errors="coerce")
+    return df
+
+
+@lru_cache(maxsize=None)
+def _magnitude_pattern(suffixes):
+    """
+    Summary.
+
+    Compiled regex capturing the number and its magnitude suffix.
+    suffixes: Tuple. Suffixes, the longest ones tried first.
+    """
+    suffixes = sorted(suffixes, key=len, reverse=True)  # MILHÕES x MIL.
+    return re.compile(r"^\s*([-+]?\d+(?:\.\d+)?)\s*(" +
+                      "|".join(re.escape(suffix) for suffix in suffixes) +
+                      r")?\s*$")
+
+
+def magnitude(values, units):
+    """
+    Summary.
+
+    Convert financial values in words into numbers ("12.3 BILHÕES", "4,5 B").
+    Values not matching a number (with an optional suffix) become NaN.
+    values: Series. String numbers to convert.
+    units: Dictionary. Suffix multipliers (WORD_UNITS or LETTER_UNITS).
+    """
+    with timer("numeric_normalise", kind="magnitude", rows=len(values)):
+        values = pd.Series(values, dtype=object)
+        parts = (values.str.replace(",", ".", regex=False)
+                 .str.extract(_magnitude_pattern(tuple(units))))
+        number = pd.to_numeric(parts[0], errors="coerce")
+        factor = parts[1].map(units).fillna(1).astype(float)
+        return (number * factor).round(2)
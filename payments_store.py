@@ -0,0 +1,245 @@
+"""
+Summary.
+
+Local dividends history (SQLite) of the payments scrapers (Fundamentus,
+Dividend Investor, Yahoo Finance), keyed by source, TICKET, DATA COM and
+TIPO PROVENTO. The latest date stored per ticket and source (high-water
+mark) is remembered, so a refresh merges only the new rows and the reads
+never reach the network while the ticket is fresh.
+"""
+# -*- coding: utf-8 -*-
+
+from contextlib import closing
+import sqlite3
+import time
+import pandas as pd
+import dividend_investor
+import fundamentus
+from exceptions import AssetNotFound
+from transport import TTL
+
+STORE_PATH = "payments.sqlite"
+COLUMNS = ["TICKET", "DATA COM", "DATA EX", "DATA PAGAMENTO", "VALOR",
+           "TIPO PROVENTO"]
+YAHOO_START = "2000-01-01"  # First download of the Yahoo Finance history.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS payments (
+    "FONTE" TEXT NOT NULL,
+    "TICKET" TEXT NOT NULL,
+    "DATA COM" TEXT NOT NULL,
+    "DATA EX" TEXT,
+    "DATA PAGAMENTO" TEXT,
+    "VALOR" REAL,
+    "TIPO PROVENTO" TEXT NOT NULL,
+    PRIMARY KEY ("FONTE", "TICKET", "DATA COM", "TIPO PROVENTO")
+);
+CREATE TABLE IF NOT EXISTS marks (
+    "FONTE" TEXT NOT NULL,
+    "TICKET" TEXT NOT NULL,
+    "DATA COM" TEXT,
+    "ATUALIZADO" REAL NOT NULL,
+    PRIMARY KEY ("FONTE", "TICKET")
+);
+"""
+
+
+# # Common functions.
+def _fundamentus(ticket, since, type_asset="STOCKS", session=None):
+    """
+    Summary.
+
+    Download the Fundamentus payments (the whole history page).
+    ticket: String. Ticket code.
+    since: String. High-water mark (unused, no date filter in the page).
+    type_asset: String. "STOCKS" or "REITS".
+    session: Session. Requests session.
+    """
+    del since
+    cls = {"STOCKS": fundamentus.StocksBR,
+           "REITS": fundamentus.ReitsBR}[type_asset]
+    return cls(ticket=ticket, type_table="PAYMENT",
+               session=session).payments()
+
+
+def _dividend_investor(ticket, since, session=None):
+    """
+    Summary.
+
+    Download the Dividend Investor payments (the whole history page).
+    ticket: String. Ticket code.
+    since: String. High-water mark (unused, no date filter in the page).
+    session: Session. Requests session.
+    """
+    del since
+    return dividend_investor.StocksReitsETFs(ticket=ticket,
+                                             session=session).payments()
+
+
+def _yahoo_finance(ticket, since, country="BR"):
+    """
+    Summary.
+
+    Download the Yahoo Finance payments from the high-water mark on.
+    ticket: String. Ticket code.
+    since: String. High-water mark (None for the whole history).
+    country: String. "BR" for the B3 tickets.
+    """
+    # Optional: yfinance is only needed for this source.
+    import yahoo_finance  # pylint: disable=import-outside-toplevel
+    return yahoo_finance.AllTypeAssets(ticket=ticket, country=country) \
+        .payments(start=since or YAHOO_START)
+
+
+# Source: (download function, column of the payment date).
+# Yahoo Finance has no DATA COM, the DATA EX takes its place in the key.
+SOURCES = {
+    "fundamentus": (_fundamentus, "DATA COM"),
+    "dividend_investor": (_dividend_investor, "DATA COM"),
+    "yahoo_finance": (_yahoo_finance, "DATA EX"),
+}
+
+
+def _text(value):
+    """
+    Summary.
+
+    Date as ISO text, None for the missing ones.
+    value: Object. Date, string or missing value.
+    """
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    value = str(value)[:10]
+    return None if value in ("", "NaT", "None", "nan") else value
+
+
+class PaymentsStore:
+    """
+    Summary.
+
+    Local dividends history with per ticket and source high-water marks.
+    """
+
+    def __init__(self, path=STORE_PATH, max_age=TTL["payments"]):
+        self.path = path
+        self.max_age = max_age  # Seconds a ticket stays fresh.
+        with closing(self._connect()) as connection:
+            connection.executescript(_SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def mark(self, ticket, source="fundamentus"):
+        """
+        Summary.
+
+        Function to retrieve the high-water mark of a ticket as (latest
+        date, update time), (None, None) if it was never downloaded.
+        ticket: String. Ticket code.
+        source: String. Website module (see SOURCES).
+        """
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                'SELECT "DATA COM", "ATUALIZADO" FROM marks '
+                'WHERE "FONTE" = ? AND "TICKET" = ?',
+                (source, ticket.upper())).fetchone()
+        return tuple(row) if row else (None, None)
+
+    def fresh(self, ticket, source="fundamentus"):
+        """
+        Summary.
+
+        Function to check whether a ticket was updated less than max_age
+        seconds ago.
+        ticket: String. Ticket code.
+        source: String. Website module (see SOURCES).
+        """
+        updated = self.mark(ticket, source)[1]
+        return updated is not None and time.time() - updated < self.max_age
+
+    def update(self, ticket, source="fundamentus", **kwargs):
+        """
+        Summary.
+
+        Function to download the payments of a ticket and merge the rows
+        from its high-water mark on, returning the number of merged rows.
+        Rows on the mark date are merged again (late announcements). A
+        ticket already stored without payments after the mark (Yahoo
+        Finance "No payments.") merges nothing but is fresh again.
+        ticket: String. Ticket code.
+        source: String. Website module (see SOURCES).
+        kwargs: Download arguments (type_asset, session, country).
+        """
+        download, column = SOURCES[source]
+        ticket = ticket.upper()
+        since = self.mark(ticket, source)[0]
+        try:
+            df = download(ticket, since, **kwargs)
+        except AssetNotFound:
+            if since is None:  # Never stored: the asset has no payments.
+                raise
+            df = pd.DataFrame(columns=COLUMNS)  # Nothing new.
+
+        tmp = []
+        for row in df.to_dict("records"):
+            key = _text(row.get(column))
+            if key is None or (since is not None and key < since):
+                continue  # Already stored.
+            tmp.append((source, ticket, key, _text(row.get("DATA EX")),
+                        _text(row.get("DATA PAGAMENTO")),
+                        float(row["VALOR"]),
+                        row.get("TIPO PROVENTO") or "DIVIDENDO"))
+        latest = max([row[2] for row in tmp] + ([since] if since else []),
+                     default=None)
+
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO payments VALUES (?, ?, ?, ?, ?, ?, ?)',
+                tmp)
+            connection.execute(
+                "INSERT OR REPLACE INTO marks VALUES (?, ?, ?, ?)",
+                (source, ticket, latest, time.time()))
+        return len(tmp)
+
+    def payments(self, ticket, source="fundamentus", since=None,
+                 refresh=False, **kwargs):
+        """
+        Summary.
+
+        Function to retrieve the payments of a ticket from the store,
+        downloading only when the ticket is not fresh (see max_age).
+        ticket: String. Ticket code.
+        source: String. Website module (see SOURCES).
+        since: String. First payment date (e.g. "2020-01-01").
+        refresh: Boolean. Download even if fresh.
+        kwargs: Download arguments (type_asset, session, country).
+        """
+        if refresh or not self.fresh(ticket, source):
+            self.update(ticket, source, **kwargs)
+        return self.read(ticket, source, since)
+
+    def read(self, ticket=None, source="fundamentus", since=None):
+        """
+        Summary.
+
+        Function to read the stored payments (never downloads), newest
+        first.
+        ticket: String. Ticket code (None for every ticket).
+        source: String. Website module (see SOURCES).
+        since: String. First payment date (e.g. "2020-01-01").
+        """
+        query = 'SELECT * FROM payments WHERE "FONTE" = ?'
+        params = [source]
+        if ticket is not None:
+            query += ' AND "TICKET" = ?'
+            params.append(ticket.upper())
+        if since is not None:
+            query += ' AND "DATA COM" >= ?'
+            params.append(_text(since))
+        query += ' ORDER BY "TICKET", "DATA COM" DESC'
+        with closing(self._connect()) as connection:
+            df = pd.read_sql_query(query, connection, params=params)
+
+        if SOURCES[source][1] == "DATA EX":  # Key column, not a DATA COM.
+            df["DATA COM"] = None
+        return df[COLUMNS]
@@ -0,0 +1,113 @@
+"""
+Summary.
+
+Wide (one row per ticket) output of the scrapers, built without the
+transposes of the INFO/VALOR frames.
+"""
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+
+def wide_row(df):
+    """
+    Summary.
+
+    Turn a long INFO/VALOR frame into a one-row frame (no transpose).
+    The first value of a repeated INFO is kept.
+    df: Dataframe. Columns INFO and VALOR.
+    """
+    row = {}
+    for info, value in zip(df["INFO"], df["VALOR"]):
+        row.setdefault(info, value)
+    wide = pd.DataFrame([row], index=["VALOR"], dtype=df["VALOR"].dtype)
+    return wide.rename_axis(columns="INFO")
+
+
+def merge_rows(frames):
+    """
+    Summary.
+
+    Merge one-row frames (info, price, kpi) into a dictionary.
+    The first value of a repeated column is kept.
+    frames: List. One-row dataframes.
+    """
+    row = {}
+    for df in frames:
+        for column, value in zip(df.columns, df.to_numpy(dtype=object)[0]):
+            row.setdefault(column, value)
+    return row
+
+
+def to_number(value, percent=False):
+    """
+    Summary.
+
+    Convert a single value to number (NaN when not possible).
+    value: String. Value to convert.
+    percent: Boolean. Remove the "%" sign first (text values only).
+    """
+    if isinstance(value, str):
+        if percent:
+            value = value.replace("%", "")
+        return pd.to_numeric(value, errors="coerce")
+    if percent or value is None:
+        return np.nan
+    return value
+
+
+class ColumnarBuilder:
+    """
+    Summary.
+
+    Append records (dictionaries) straight into column lists, building a
+    single dataframe at the end.
+    """
+
+    def __init__(self):
+        self._columns = {}
+        self._rows = 0
+
+    def __len__(self):
+        return self._rows
+
+    def append(self, record):
+        """
+        Summary.
+
+        Function to add a record, new keys becoming new columns.
+        record: Dictionary. Column: value.
+        """
+        for column, value in record.items():
+            values = self._columns.get(column)
+            if values is None:  # New column, empty for the previous rows.
+                values = self._columns[column] = [None] * self._rows
+            values.append(value)
+        self._rows += 1
+        for values in self._columns.values():
+            if len(values) < self._rows:  # Column missing in the record.
+                values.append(None)
+
+    def frame(self):
+        """
+        Summary.
+
+        Function to build the dataframe, one row per record.
+        """
+        if not self._columns:
+            return pd.DataFrame(index=range(self._rows))
+        return pd.DataFrame(self._columns)
+
+
+def to_frame(records):
+    """
+    Summary.
+
+    Build a dataframe from records (see ColumnarBuilder).
+    records: List. Dictionaries, one per ticket.
+    """
+    builder = ColumnarBuilder()
+    for record in records:
+        builder.append(record)
+    return builder.frame()
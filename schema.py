@@ -0,0 +1,124 @@
+"""
+Summary.
+
+Typed schema of the scraper tables, applied once at the end.
+"""
+# -*- coding: utf-8 -*-
+
+import pandas as pd
+
+# Percentages, stored as numbers (12.5 for "12.5%").
+PERCENT = [
+    "CAGR LUCROS", "CAGR LUCROS 5 ANOS", "CAGR LUCROS TRIMESTRAL",
+    "CAGR RECEITA 5 ANOS", "CAGR RECEITAS 5 ANOS",
+    "CAGR RECEITAS TRIMESTRAL", "CAP RATE", "DIVIDEND YIELD",
+    "DIVIDEND YIELD 5 ANOS", "DÍVIDA BRUTA/PATRIMÔNIO", "FREE FLOAT",
+    "LUCRO LÍQUIDO AJUSTADO/VALOR DE MERCADO", "MARGEM BRUTA", "MARGEM EBIT",
+    "MARGEM EBITDA", "MARGEM LÍQUIDA", "MARGEM OPERACIONAL",
+    "PAPÉIS COM INSTITUIÇÕES", "PAPÉIS COM INTERNOS", "PAYOUT",
+    "RETORNO MÉDIO 3 ANOS", "RETORNO MÉDIO 5 ANOS", "RETORNO SOBRE ATIVOS",
+    "RETORNO SOBRE PATRIMÔNIO", "RETORNO TOTAL ACUMULADO", "ROA", "ROE",
+    "ROIC", "TAG ALONG", "TAXA ADMINISTRATIVA", "VACÂNCIA",
+    "VALOR EM CAIXA %", "VALORIZAÇÃO DE COTAÇÃO 1 ANO",
+    "VALORIZAÇÃO DE COTAÇÃO 1 MÊS", "VALORIZAÇÃO DE COTAÇÃO USD 1 ANO",
+    "VALORIZAÇÃO DE COTAÇÃO USD 1 MÊS", "VARIAÇÃO DE COTAÇÃO 1 ANO",
+    "VARIAÇÃO DE COTAÇÃO 5 ANOS", "VARIAÇÃO DE COTAÇÃO USD 1 ANO",
+    "VARIAÇÃO DE COTAÇÃO USD 5 ANOS"]
+# Multiples and ratios, small numbers where float32 is precise enough.
+RATIO = [
+    "BETA", "BETA 3 ANOS", "CAGR 3 ANOS", "CAGR 5 ANOS",
+    "CAGR DIVIDENDOS 3 ANOS", "CAGR DIVIDENDOS 5 ANOS",
+    "DÍVIDA BRUTA/PATRIMÔNIO LÍQUIDO", "DÍVIDA LÍQUIDA/EBIT",
+    "DÍVIDA LÍQUIDA/EBITDA", "DÍVIDA LÍQUIDA/PATRIMÔNIO LÍQUIDO", "EV/EBIT",
+    "EV/EBITDA", "EV/RECEITA", "GIRO ATIVOS", "LIQUIDEZ CORRENTE", "P/ATIVO",
+    "P/ATIVO CIRCULANTE LÍQUIDO", "P/CAPITAL DE GIRO", "P/EBIT", "P/EBITDA",
+    "P/L", "P/L FUTURO", "P/RECEITA LÍQUIDA", "P/VP", "PASSIVOS/ATIVOS",
+    "PATRIMÔNIO LÍQUIDO/ATIVOS", "PEG RATIO", "PSR", "RATIO", "RISCO GERAL"]
+# Counts.
+INTEGER = [
+    "LOTE MÍNIMO", "LOTE PADRÃO", "QUANTIDADE DE COTAS",
+    "QUANTIDADE DE COTISTAS", "QUANTIDADE DE FUNCIONÁRIOS",
+    "QUANTIDADE DE IMÓVEIS", "QUANTIDADE DE PAPÉIS"]
+# Texts repeated along the rows.
+CATEGORY = [
+    "CATEGORIA", "FAMÍLIA", "MOEDA", "PAÍS", "RECOMENDAÇÃO", "SEGMENTO",
+    "SEGMENTO DE LISTAGEM", "SETOR", "SUBSETOR", "TIPO ATIVO",
+    "TIPO PROVENTO"]
+DATE = ["DATA COM", "DATA DE CRIAÇÃO", "DATA EX", "DATA PAGAMENTO"]
+
+# Column: dtype. Other numeric columns (prices, money amounts) are float64.
+DTYPES = {}
+DTYPES.update(dict.fromkeys(PERCENT, "percent"))
+DTYPES.update(dict.fromkeys(RATIO, "float32"))
+DTYPES.update(dict.fromkeys(INTEGER, "Int64"))
+DTYPES.update(dict.fromkeys(CATEGORY, "category"))
+DTYPES.update(dict.fromkeys(DATE, "date"))
+
+
+def register(columns, dtype):
+    """
+    Summary.
+
+    Declare the dtype of columns.
+    columns: List. Dataframe columns.
+    dtype: String. "percent", "float32", "float64", "Int64", "category" or
+           "date".
+    """
+    DTYPES.update(dict.fromkeys(columns, dtype))
+
+
+def _number(series):
+    """
+    Summary.
+
+    Convert a column to number, removing the "%" of text values.
+    series: Series. Dataframe column.
+    """
+    if not pd.api.types.is_numeric_dtype(series):
+        series = series.astype(object).where(series.notna(), None)
+        series = series.map(lambda x: x.replace("%", "")
+                            if isinstance(x, str) else x)
+    return pd.to_numeric(series, errors="coerce")
+
+
+def _date(series):
+    """
+    Summary.
+
+    Convert a column to datetime, ISO dates (2023-12-31) first and the
+    brazilian ones (31/12/2023) for the rest.
+    series: Series. Dataframe column.
+    """
+    dates = pd.to_datetime(series, errors="coerce", format="ISO8601")
+    missing = dates.isna() & series.notna()
+    if missing.any():
+        dates[missing] = pd.to_datetime(series[missing], errors="coerce",
+                                        format="%d/%m/%Y")
+    return dates
+
+
+def apply_schema(df):
+    """
+    Summary.
+
+    Cast the dataframe columns to their declared dtypes.
+    df: Dataframe.
+    """
+    df = df.copy()
+    for column in df.columns.unique():
+        dtype = DTYPES.get(column, "float64")
+        series = df[column]
+        if isinstance(series, pd.DataFrame):  # Repeated column name.
+            continue
+        if dtype in ("percent", "float32"):
+            df[column] = _number(series).astype("float32")
+        elif dtype == "Int64":
+            df[column] = _number(series).round().astype("Int64")
+        elif dtype == "category":
+            df[column] = series.astype("category")
+        elif dtype == "date":
+            df[column] = _date(series)
+        elif (pd.api.types.is_numeric_dtype(series)
+              and not pd.api.types.is_bool_dtype(series)):
+            df[column] = series.astype(dtype)  # Stable dtype per column.
+    return df
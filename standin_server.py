@@ -0,0 +1,266 @@
+"""
+Summary.
+
+Local stand-in HTTP server answering for the scraped websites with the
+recorded fixtures (see fixtures.py), with configurable latency, error rate
+and 429 throttling, to load test the concurrent scrapers on a laptop.
+
+python standin_server.py --port 8000 --latency lognormal:-3,0.5
+    --error-rate 0.02 --rate 20 --burst 40
+"""
+# -*- coding: utf-8 -*-
+
+import argparse
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+from fixtures import FIXTURES_FOLDER, FIXTURES_VERSION, fixtures_path
+from transport import ResponseCache, set_host_override
+
+# Latency distributions (seconds): name: sampler(random, *parameters).
+LATENCY = {
+    "fixed": lambda rng, value: value,
+    "uniform": lambda rng, low, high: rng.uniform(low, high),
+    "exponential": lambda rng, mean: rng.expovariate(1 / mean),
+    "lognormal": lambda rng, mu, sigma: rng.lognormvariate(mu, sigma),
+}
+
+
+# # Common functions.
+def parse_latency(text, rng=random):
+    """
+    Summary.
+
+    Latency sampler from a "name:parameters" text (e.g. "fixed:0.05",
+    "uniform:0.01,0.2", "exponential:0.1", "lognormal:-3,0.5").
+    text: String. Distribution and its comma separated parameters.
+    rng: Random. Random numbers generator.
+    """
+    name, _, params = (text or "fixed:0").partition(":")
+    if name not in LATENCY:
+        raise ValueError(f"Unknown latency distribution: {name}")
+    params = [float(param) for param in params.split(",") if param]
+    LATENCY[name](rng, *params)  # Checking the parameters.
+    return lambda: max(0.0, LATENCY[name](rng, *params))
+
+
+class HostThrottle:
+    """
+    Summary.
+
+    Server side token bucket per website: requests over rate (per second)
+    and burst are answered with 429 and a Retry-After header.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._buckets = {}  # Host: (tokens, update time).
+        self._lock = threading.Lock()
+
+    def allow(self, host):
+        """
+        Summary.
+
+        Function to take a token of the website, returning (allowed,
+        seconds until the next token).
+        host: String. Website.
+        """
+        if not self.rate:
+            return True, 0
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(host, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[host] = (tokens, now)
+            return allowed, (1 - tokens) / self.rate if not allowed else 0
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Summary.
+
+    Threaded HTTP server of the recorded pages, at
+    http://host:port/<website>/<path>, e.g. /statusinvest.com.br/acoes/bbas3.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, folder=FIXTURES_FOLDER,
+                 version=FIXTURES_VERSION, latency="fixed:0",
+                 error_rate=0.0, rate=0.0, burst=1, seed=None):
+        super().__init__(address, _Handler)
+        path = fixtures_path(folder, version)
+        with open(os.path.join(path, "index.json"), encoding="utf-8") as file:
+            index = json.load(file)
+        self.store = ResponseCache(path, max_bytes=float("inf"))
+        # (website, path and query): fixture key.
+        self.pages = {}
+        for key, entry in index.items():
+            parts = urlsplit(entry["url"])
+            target = parts.path + ("?" + parts.query if parts.query else "")
+            self.pages[(parts.netloc, target)] = key
+        self.random = random.Random(seed)
+        self.latency = parse_latency(latency, self.random)
+        self.error_rate = error_rate
+        self.throttle = HostThrottle(rate, burst)
+        self.stats = {}  # Status code: answered requests.
+        self._lock = threading.Lock()
+
+    @property
+    def hosts(self):
+        """
+        Summary.
+
+        Websites with recorded pages.
+        """
+        return sorted({host for host, _ in self.pages})
+
+    @property
+    def base_url(self):
+        """
+        Summary.
+
+        Server base URL.
+        """
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, status_code):
+        """
+        Summary.
+
+        Function to count an answered request.
+        status_code: Integer. HTTP status.
+        """
+        with self._lock:
+            self.stats[status_code] = self.stats.get(status_code, 0) + 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    Summary.
+
+    Request handler of the stand-in server.
+    """
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, as the real websites.
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass  # Quiet under load.
+
+    def _answer(self, status_code, body=b"", headers=None):
+        self.server.count(status_code)
+        self.send_response(status_code)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Summary.
+
+        Function to answer a request with the recorded page.
+        """
+        server = self.server
+        if self.path == "/_stats":  # Answered requests per status.
+            body = json.dumps(server.stats).encode("utf-8")
+            self._answer(200, body, {"Content-Type": "application/json"})
+            return
+        host, _, target = self.path.lstrip("/").partition("/")
+        time.sleep(server.latency())
+
+        allowed, wait = server.throttle.allow(host)
+        if not allowed:
+            self._answer(429, headers={"Retry-After": f"{wait:.3f}"})
+            return
+        if server.random.random() < server.error_rate:
+            self._answer(server.random.choice([500, 502, 503, 504]))
+            return
+        key = server.pages.get((host, "/" + target))
+        response = server.store.get(key)[0] if key else None
+        if response is None:
+            self._answer(404)
+            return
+        etag = response.validators.get("ETag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            self._answer(304, headers={"ETag": etag})
+            return
+        headers = dict(response.validators)
+        headers["Content-Type"] = f"text/html; charset={response.encoding}"
+        self._answer(response.status_code, response.content, headers)
+
+
+@contextmanager
+def standin(port=0, **kwargs):
+    """
+    Summary.
+
+    Context manager running the stand-in server in a thread and sending the
+    recorded websites requests to it (see transport.set_host_override).
+    port: Integer. Server port (0 for any free port).
+    kwargs: StandInServer arguments (latency, error_rate, rate...).
+    """
+    server = StandInServer(("127.0.0.1", port), **kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    for host in server.hosts:
+        set_host_override(host, server.base_url)
+    try:
+        yield server
+    finally:
+        for host in server.hosts:
+            set_host_override(host, None)
+        server.shutdown()
+        server.server_close()
+
+
+def main(argv=None):
+    """
+    Summary.
+
+    Parse the command line and serve until interrupted.
+    argv: List. Command line arguments (sys.argv by default).
+    """
+    parser = argparse.ArgumentParser(prog="standin_server.py",
+                                     description="Stand-in HTTP server.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--folder", default=FIXTURES_FOLDER)
+    parser.add_argument("--version", default=FIXTURES_VERSION)
+    parser.add_argument("--latency", default="fixed:0",
+                        help="Latency distribution (e.g. uniform:0.01,0.2).")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with 5xx.")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="Requests per second per website (0 no 429).")
+    parser.add_argument("--burst", type=int, default=1,
+                        help="Requests allowed at once per website.")
+    parser.add_argument("--seed", type=int, help="Random seed.")
+    args = parser.parse_args(argv)
+    server = StandInServer(("127.0.0.1", args.port), args.folder,
+                           args.version, args.latency, args.error_rate,
+                           args.rate, args.burst, args.seed)
+    print(f"Serving {', '.join(server.hosts)} at {server.base_url}")
+    print("Override the hosts with transport.set_host_override(host, "
+          f"\"{server.base_url}\").")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
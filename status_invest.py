@@ -8,32 +8,14 @@ Retrieve the companies infos from Status Invest website.
 # pylint: disable=too-many-lines
 # pylint: disable=too-many-statements
 
-from bs4 import BeautifulSoup
-from lxml import etree
-import requests
 import pandas as pd
-import numpy as np
-
-# Header to use to get the web page content in text format.
-# The User-Agent request header contains a characteristic string that allows
-# the network protocol peers to identify the application type, operating
-# system, software vendor or software version of the requesting software user
-# agent.
-# Validating User-Agent header on server side is a common operation so be sure
-# to use valid browser’s User-Agent string to avoid getting blocked.
-# Font: https://go-colly.org/articles/scraping_related_http_headers/
-# Font: https://stackoverflow.com/questions/68259148/getting-404-error-for-
-#       certain-stocks-and-pages-on-yahoo-finance-python
-headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)" +
-    "AppleWebKit/537.36 (KHTML, like Gecko)" +
-    "Chrome/71.0.3578.98 Safari/537.36",
-    "Accept": "text/html,application/xhtml+xml,application" +
-    "/xml;q=0.9,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.5",
-    "DNT": "1",  # Do not track request header.
-    "Connection": "close"
-}
+from exceptions import AssetNotFound, ParseError
+from html_tree import compile_plan, parse
+from normalize import numeric_columns, string_columns
+from records import merge_rows, to_number, wide_row
+from schema import apply_schema
+from timing import labelled, timed
+from transport import fetch, get_session
 
 
 # # Common functions.
@@ -44,6 +26,8 @@ def _clean_cards(df):
     Clean parsed cards.
     df: Dataframe.
     """
+    if "INFO" not in df.columns:  # No card found: layout changed.
+        raise ParseError("No cards parsed")
     df = df.dropna(subset=["INFO"])
     df.loc[:, "INFO"] = df["INFO"].str.replace(" / ", "/")
     df.loc[:, "INFO"] = df["INFO"].str.replace(r"^DIVIDEND YIELD.*$",
@@ -64,48 +48,6 @@ def _clean_cards(df):
     return df
 
 
-def _string_columns(df, columns):
-    """
-    Summary.
-
-    Format string columns.
-    df: Dataframe.
-    columns: Dataframe columns.
-    """
-    for column in columns:
-        if column in df.columns:
-            df[column] = (df[column].str.replace(" %", "%", regex=False)
-                          .str.replace(",", ".", regex=False)
-                          .str.replace(" / ", "/", regex=False)
-                          .replace({"-%": None, "-% A.A": None, "-": None,
-                                    "--": None, "": None, "0.00%": None}))
-            df[column] = df[column].str.upper()
-    return df
-
-
-def _numeric_columns(df, columns):
-    """
-    Summary.
-
-    Format numeric columns.
-    df: Dataframe.
-    columns: Dataframe columns.
-    """
-    for column in columns:
-        if column in df.columns:
-            df[column] = (df[column].str.replace("R$ ", "", regex=False)
-                          .str.replace("R$\n", "", regex=False)
-                          .str.replace("US$", "", regex=False)
-                          .str.replace("US$\n", "", regex=False)
-                          .str.replace("$ ", "", regex=False)
-                          .str.replace(".", "", regex=False)
-                          .str.replace(",", ".", regex=False)
-                          .replace({"0": None, "0.00": None, "-": None,
-                                    "--": None, "": None, np.nan: None}))
-            df[column] = pd.to_numeric(df[column], errors="coerce")
-    return df
-
-
 class StocksBR:
     """
     Summary.
@@ -113,44 +55,91 @@ class StocksBR:
     Retrieve the brazilian stocks companies infos.
     """
 
-    def __init__(self, ticket):
+    # Page layout selectors, compiled once (see compile_plan).
+    _XPATHS = compile_plan({
+        "cnpj": "/html/body/main/div[5]/div[1]/div/div[1]/div[2]/h4/small",
+        "tag_along": ("/html/body/main/div[2]/div/div[5]/div/div/div[2]/div/" +
+                      "div/div/strong"),
+        "empresa": "/html/body/main/div[5]/div[1]/div/div[1]/div[2]/h4/span",
+        "tipo_ativo1": ("/html/body/main/div[2]/div/div[5]/div/div/div[1]/" +
+                        "div/div/h3/strong"),
+        "tipo_ativo2": ("/html/body/main/div[2]/div/div[5]/div/div/div[1]/" +
+                        "div/div/strong"),
+        "liquidez": ("/html/body/main/div[2]/div/div[5]/div/div/div[3]/div/" +
+                     "div/div/strong")})
+
+    def __init__(self, ticket, session=None):
         self.ticket = ticket
+        self.session = session if session is not None else get_session()
         url = "https://statusinvest.com.br/acoes/{}"
         self.url = url.format(ticket.lower())
+        self._snapshot = None  # Page fetched and parsed once.
 
-    def _get_soup(self):
-        url = self.url
-        page = requests.get(url, headers=headers, timeout=None)
-        soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
-        dom = etree.HTML(str(soup))
+    @labelled
+    def download(self):
+        """
+        Summary.
+
+        Function to download the page, returning (html, status code).
+        """
+        page = fetch(self.url, "quote", session=self.session)
+        return page.text, page.status_code
+
+    def load(self, html, status_code=200):
+        """
+        Summary.
+
+        Function to use a page downloaded elsewhere (see download), e.g.
+        parsing it in another process.
+        html: String. Page HTML.
+        status_code: Integer. HTTP status of the download.
+        """
+        self._snapshot = self._load_page(html, status_code)
+        return self
+
+    @labelled
+    def _fetch_page(self):
+        return self._load_page(*self.download())
+
+    @labelled
+    def _load_page(self, html, status_code):
+        soup, dom = parse(html)  # Getting HTML (one lxml tree).
         # Checking if asset exist.
-        if page.status_code != 200 or soup.find_all(string="OPS. . ."):
-            raise ValueError("Asset does not exist")
+        if status_code != 200 or soup.find_all(string="OPS. . ."):
+            raise AssetNotFound("Asset does not exist")
         return soup, dom
 
+    def _get_soup(self):
+        if self._snapshot is None:  # Downloading and parsing just once.
+            self._snapshot = self._fetch_page()
+        return self._snapshot
+
+    def refresh(self):
+        """
+        Summary.
+
+        Function to discard the page snapshot, forcing a new download.
+        """
+        self._snapshot = None
+
+    @timed("xpath_common")
     def _parse_common_data(self, dom):
-        cnpj = dom.xpath("/html/body/main/div[5]/div[1]/div/div[1]/div[2]/" +
-                         "h4/small")
+        cnpj = self._XPATHS["cnpj"](dom)
         cnpj = (cnpj[0].text.strip() if cnpj and cnpj[0].text else None)
-        tag_along = dom.xpath("/html/body/main/div[2]/div/div[5]/div/" +
-                              "div/div[2]/div/div/div/strong")
+        tag_along = self._XPATHS["tag_along"](dom)
         tag_along = (tag_along[0].text.strip()
                      if tag_along and tag_along[0].text else None)
-        empresa = dom.xpath("/html/body/main/div[5]/div[1]/div/div[1]/" +
-                            "div[2]/h4/span")
+        empresa = self._XPATHS["empresa"](dom)
         empresa = (empresa[0].text.strip().upper()
                    if empresa and empresa[0].text else None)
-        tipo_ativo1 = dom.xpath("/html/body/main/div[2]/div/div[5]/div/" +
-                                "div/div[1]/div/div/h3/strong")
-        tipo_ativo2 = dom.xpath("/html/body/main/div[2]/div/div[5]/div/" +
-                                "div/div[1]/div/div/strong")
+        tipo_ativo1 = self._XPATHS["tipo_ativo1"](dom)
+        tipo_ativo2 = self._XPATHS["tipo_ativo2"](dom)
         tipo_ativo = (tipo_ativo1[0].text.strip().upper()
                       if tipo_ativo1 and tipo_ativo1[0].text
                       else tipo_ativo2[0].text.strip().upper()
                       if tipo_ativo2 and tipo_ativo2[0].text else
                       None)
-        liquidez = dom.xpath("/html/body/main/div[2]/div/div[5]/div/div/" +
-                             "div[3]/div/div/div/strong")
+        liquidez = self._XPATHS["liquidez"](dom)
         liquidez = (liquidez[0].text.strip().upper()
                     if liquidez and liquidez[0].text else None)
         tmp = []
@@ -165,11 +154,12 @@ class StocksBR:
         df = _clean_cards(df=df)
         return df
 
+    @timed("parse_cards")
     def _parse_company(self, soup):
         # Company 1.
-        cells = soup.find("div",
-                          {"class": "top-info info-3 sm d-flex " +
-                           "justify-between mb-3"})
+        cells = soup.expect("div",
+                            {"class": "top-info info-3 sm d-flex " +
+                             "justify-between mb-3"})
         cells = cells.find_all("div", {"class": "info"})
         tmp = []
         for cell in cells:
@@ -185,9 +175,9 @@ class StocksBR:
         df1.at[0, "INFO"] = "PATRIMÔNIO LÍQUIDO"  # Ranaming cell.
 
         # Company 2.
-        cells = soup.find("div",
-                          {"class": "card bg-main-gd-h white-text " +
-                           "rounded ov-hidden pt-0 pb-0"})
+        cells = soup.expect("div",
+                            {"class": "card bg-main-gd-h white-text " +
+                             "rounded ov-hidden pt-0 pb-0"})
         cells2 = cells.find_all("div", {"class": "info pr-md-2"}) + \
             cells.find_all("div", {"class": "info pl-md-2 pr-md-2"}) + \
             cells.find_all("div", {"class": "info pl-md-2"})
@@ -206,10 +196,11 @@ class StocksBR:
         company = _clean_cards(df=company)
         return company
 
+    @timed("parse_cards")
     def _parse_price(self, soup):
-        cells = soup.find("div",
-                          {"class": "top-info has-special d-flex " +
-                           "justify-between flex-wrap"})
+        cells = soup.expect("div",
+                            {"class": "top-info has-special d-flex " +
+                             "justify-between flex-wrap"})
         cells = cells.find_all("div", {"class": "info"})
         tmp = []
         tmp2 = []
@@ -235,8 +226,9 @@ class StocksBR:
         price = _clean_cards(df=price)
         return price
 
+    @timed("parse_cards")
     def _parse_kpi(self, soup):
-        cells = soup.find("div", {"class": "d-flex flex-wrap"})
+        cells = soup.expect("div", {"class": "d-flex flex-wrap"})
         cells2 = cells.find_all("div",
                                 {"class": "w-50 w-sm-33 w-md-25 " +
                                  "w-lg-16_6 mb-2 mt-2 item"}) + \
@@ -265,10 +257,9 @@ class StocksBR:
         kpi = _clean_cards(df=kpi)
         return kpi
 
+    @timed("adjust_columns")
     def _adjust_columns(self, df):
-        df = df.T  # Transposing.
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
+        df = wide_row(df)  # One row, INFO values as columns.
         column_mapping = {
             "VALOR ATUAL": "COTAÇÃO", "SETOR DE ATUAÇÃO": "SETOR",
             "MIN. 52 SEMANAS": "COTAÇÃO MÍNIMA 1 ANO",
@@ -292,11 +283,12 @@ class StocksBR:
         df = df.rename(columns=column_mapping)
         return df
 
-    def info(self):
+    def info(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian stocks infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
         df1 = self._parse_common_data(dom)
@@ -308,16 +300,19 @@ class StocksBR:
                "SEGMENTO DE LISTAGEM", "SETOR", "SUBSETOR", "SEGMENTO"]
         df = df.loc[:, [col for col in tmp if col in df.columns]]
 
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def price(self):
+    def price(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian stocks prices infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
         df1 = self._parse_common_data(dom)
@@ -334,21 +329,24 @@ class StocksBR:
 
         tmp = ["TICKET", "MOEDA", "VALORIZAÇÃO DE COTAÇÃO 1 MÊS",
                "VALORIZAÇÃO DE COTAÇÃO 1 ANO"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         tmp = ["COTAÇÃO", "COTAÇÃO MÍNIMA 1 MÊS", "COTAÇÃO MÁXIMA 1 MÊS",
                "COTAÇÃO MÍNIMA 1 ANO", "COTAÇÃO MÁXIMA 1 ANO",
                "DIVIDENDOS PAGOS 1 ANO"]
-        df = _numeric_columns(df=df, columns=tmp)
+        df = numeric_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def kpi(self):
+    def kpi(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian stocks kpis infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
         df1 = self._parse_common_data(dom)
@@ -377,7 +375,7 @@ class StocksBR:
                "MARGEM EBITDA", "MARGEM EBIT", "MARGEM LÍQUIDA", "ROE",
                "CAGR RECEITAS 5 ANOS", "CAGR LUCROS 5 ANOS", "FREE FLOAT",
                "TAG ALONG", "TICKET", "MOEDA"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         tmp = ["PATRIMÔNIO LÍQUIDO", "ATIVOS", "ATIVO CIRCULANTE",
                "DÍVIDA BRUTA", "DISPONIBILIDADE", "DÍVIDA LÍQUIDA",
@@ -389,23 +387,23 @@ class StocksBR:
                "DÍVIDA LÍQUIDA/EBIT", "PATRIMÔNIO LÍQUIDO/ATIVOS",
                "PASSIVOS/ATIVOS", "LIQUIDEZ CORRENTE", "GIRO ATIVOS",
                "LIQUIDEZ"]
-        df = _numeric_columns(df=df, columns=tmp)
+        df = numeric_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def table(self,):
+    def record(self):
         """
         Summary.
 
-        Function to aggregate the brazilian stocks full infos.
+        Function to aggregate the brazilian stocks full infos as a dictionary
+        (one table row).
         """
-        df = pd.concat([self.info(), self.price(), self.kpi()])
-        df = df.drop_duplicates()  # Remove duplicates.
-        df = df.T.reset_index(drop=False)
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
-        df = df.drop(["INFO"], axis=1, errors="ignore")  # Necessary rows.
+        row = merge_rows([self.info(wide=True),
+                          self.price(wide=True),
+                          self.kpi(wide=True)])
 
         tmp = ["COTAÇÃO", "COTAÇÃO MÍNIMA 1 MÊS", "COTAÇÃO MÁXIMA 1 MÊS",
                "COTAÇÃO MÍNIMA 1 ANO", "COTAÇÃO MÁXIMA 1 ANO", "LIQUIDEZ",
@@ -420,18 +418,25 @@ class StocksBR:
                "PASSIVOS/ATIVOS", "LIQUIDEZ CORRENTE", "GIRO ATIVOS",
                "ATIVO CIRCULANTE"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = pd.to_numeric(df[column], errors="coerce")
+            if column in row:
+                row[column] = to_number(row[column])
 
         tmp = ["VALORIZAÇÃO DE COTAÇÃO 1 MÊS", "VALORIZAÇÃO DE COTAÇÃO 1 ANO",
                "DIVIDEND YIELD", "MARGEM BRUTA", "ROIC", "ROA", "FREE FLOAT",
                "MARGEM EBITDA", "MARGEM EBIT", "MARGEM LÍQUIDA", "ROE",
                "CAGR RECEITAS 5 ANOS", "CAGR LUCROS 5 ANOS", "TAG ALONG"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = df[column].str.replace("%", "", regex=False)
-                df[column] = pd.to_numeric(df[column], errors="coerce")
-        return df
+            if column in row:
+                row[column] = to_number(row[column], percent=True)
+        return row
+
+    def table(self):
+        """
+        Summary.
+
+        Function to aggregate the brazilian stocks full infos.
+        """
+        return apply_schema(pd.DataFrame([self.record()]))
 
 
 class ReitsBR:
@@ -441,24 +446,68 @@ class ReitsBR:
     Retrieve the brazilian reits companies infos.
     """
 
-    def __init__(self, ticket):
+    # Page layout selectors, compiled once (see compile_plan).
+    _XPATHS = compile_plan({
+        "administrador": ("/html/body/main/div[3]/div/div/div[3]/div/div[2]/" +
+                          "div[1]/div/strong")})
+
+    def __init__(self, ticket, session=None):
         self.ticket = ticket
+        self.session = session if session is not None else get_session()
         url = "https://statusinvest.com.br/fundos-imobiliarios/{}"
         self.url = url.format(ticket.lower())
+        self._snapshot = None  # Page fetched and parsed once.
 
-    def _get_soup(self):
-        url = self.url
-        page = requests.get(url, headers=headers, timeout=None)
-        soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
-        dom = etree.HTML(str(soup))
+    @labelled
+    def download(self):
+        """
+        Summary.
+
+        Function to download the page, returning (html, status code).
+        """
+        page = fetch(self.url, "quote", session=self.session)
+        return page.text, page.status_code
+
+    def load(self, html, status_code=200):
+        """
+        Summary.
+
+        Function to use a page downloaded elsewhere (see download), e.g.
+        parsing it in another process.
+        html: String. Page HTML.
+        status_code: Integer. HTTP status of the download.
+        """
+        self._snapshot = self._load_page(html, status_code)
+        return self
+
+    @labelled
+    def _fetch_page(self):
+        return self._load_page(*self.download())
+
+    @labelled
+    def _load_page(self, html, status_code):
+        soup, dom = parse(html)  # Getting HTML (one lxml tree).
         # Checking if asset exist.
-        if page.status_code != 200 or soup.find_all(string="OPS. . ."):
-            raise ValueError("Asset does not exist")
+        if status_code != 200 or soup.find_all(string="OPS. . ."):
+            raise AssetNotFound("Asset does not exist")
         return soup, dom
 
+    def _get_soup(self):
+        if self._snapshot is None:  # Downloading and parsing just once.
+            self._snapshot = self._fetch_page()
+        return self._snapshot
+
+    def refresh(self):
+        """
+        Summary.
+
+        Function to discard the page snapshot, forcing a new download.
+        """
+        self._snapshot = None
+
+    @timed("xpath_common")
     def _parse_common_data(self, dom):
-        administrador = dom.xpath("/html/body/main/div[3]/div/div/" +
-                                  "div[3]/div/div[2]/div[1]/div/strong")
+        administrador = self._XPATHS["administrador"](dom)
         administrador = (administrador[0].text.upper().strip()
                          if administrador and administrador[0].text
                          else None)
@@ -470,11 +519,12 @@ class ReitsBR:
         df = _clean_cards(df=df)
         return df
 
+    @timed("parse_cards")
     def _parse_company(self, soup):
         # Company 1.
-        cells = soup.find("div",
-                          {"class": "top-info top-info-1 top-info-md-2 " +
-                           "sm d-flex justify-between"})
+        cells = soup.expect("div",
+                            {"class": "top-info top-info-1 top-info-md-2 " +
+                             "sm d-flex justify-between"})
         cells = cells.find_all("div", {"class": "info"})
         info = []
         for cell in cells:  # Getting elements.
@@ -489,9 +539,9 @@ class ReitsBR:
         df1 = pd.DataFrame(info)  # Temporary dataframe.
 
         # Company 2.
-        cells = soup.find("div",
-                          {"class": "top-info top-info-1 top-info-sm-2 " +
-                           "top-info-md-n sm d-flex justify-between"})
+        cells = soup.expect("div",
+                            {"class": "top-info top-info-1 top-info-sm-2 " +
+                             "top-info-md-n sm d-flex justify-between"})
         cells = cells.find_all("div", {"class": "info"})
         info = []
         for cell in cells:  # Getting elements.
@@ -506,9 +556,9 @@ class ReitsBR:
         df2 = pd.DataFrame(info)
 
         # Company 3.
-        cells = soup.find("div",
-                          {"class": "top-info top-info-2 top-info-md-n " +
-                           "width-auto sm d-flex justify-between"})
+        cells = soup.expect("div",
+                            {"class": "top-info top-info-2 top-info-md-n " +
+                             "width-auto sm d-flex justify-between"})
         cells = cells.find_all("div", {"class": "info"})
         info = []
         for cell in cells:  # Getting elements.
@@ -525,10 +575,11 @@ class ReitsBR:
         company = _clean_cards(df=company)
         return company
 
+    @timed("parse_cards")
     def _parse_price(self, soup):
-        cells = soup.find("div",
-                          {"class": "top-info d-flex flex-wrap " +
-                           "justify-between mb-3 mb-md-5"})
+        cells = soup.expect("div",
+                            {"class": "top-info d-flex flex-wrap " +
+                             "justify-between mb-3 mb-md-5"})
         cells = cells.find_all("div", {"class": "info"})
         tmp = []
         tmp2 = []
@@ -552,10 +603,11 @@ class ReitsBR:
         price = _clean_cards(df=price)
         return price
 
+    @timed("parse_cards")
     def _parse_kpi(self, soup):
-        cells = soup.find("div",
-                          {"class": "top-info top-info-2 top-info-md-3 " +
-                           "top-info-lg-n d-flex justify-between"})
+        cells = soup.expect("div",
+                            {"class": "top-info top-info-2 top-info-md-3 " +
+                             "top-info-lg-n d-flex justify-between"})
         cells = cells.find_all("div", {"class": "info"})
         tmp = []
         tmp2 = []
@@ -580,10 +632,9 @@ class ReitsBR:
         kpi = _clean_cards(df=kpi)
         return kpi
 
+    @timed("adjust_columns")
     def _adjust_columns(self, df):
-        df = df.T  # Transposing.
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
+        df = wide_row(df)  # One row, INFO values as columns.
         column_mapping = {
             "VALOR ATUAL": "COTAÇÃO",
             "MIN. 52 SEMANAS": "COTAÇÃO MÍNIMA 1 ANO",
@@ -608,11 +659,12 @@ class ReitsBR:
         df = df.rename(columns=column_mapping)
         return df
 
-    def info(self):
+    def info(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian reits infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
         df1 = self._parse_common_data(dom)
@@ -633,16 +685,19 @@ class ReitsBR:
                                                    errors="coerce").dt.date
             df["DATA DE CRIAÇÃO"] = df["DATA DE CRIAÇÃO"].astype(str)
 
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def price(self):
+    def price(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian reits prices infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
         df1 = self._parse_common_data(dom)
@@ -661,21 +716,24 @@ class ReitsBR:
 
         tmp = ["TICKET", "MOEDA", "VALORIZAÇÃO DE COTAÇÃO 1 ANO",
                "VALORIZAÇÃO DE COTAÇÃO 1 MÊS"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         tmp = ["COTAÇÃO", "COTAÇÃO MÍNIMA 1 ANO", "COTAÇÃO MÁXIMA 1 ANO",
                "COTAÇÃO MÍNIMA 1 MÊS", "COTAÇÃO MÁXIMA 1 MÊS",
                "DIVIDENDOS PAGOS 1 ANO", "RENDIMENTO MÉDIO 2 ANOS"]
-        df = _numeric_columns(df=df, columns=tmp)
+        df = numeric_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def kpi(self):
+    def kpi(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian reits kpis infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
         df1 = self._parse_common_data(dom)
@@ -702,30 +760,30 @@ class ReitsBR:
                 lambda x: f"{x}%" if pd.notna(x) else x)
 
         tmp = ["DIVIDEND YIELD", "VALOR EM CAIXA %", "TAXA ADMINISTRATIVA"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         tmp = ["LIQUIDEZ", "VALOR PATRIMONIAL/COTA",
                "P/VP", "VALOR EM CAIXA", "CAGR DIVIDENDOS 3 ANOS",
                "CAGR 3 ANOS", "QUANTIDADE DE COTISTAS", "VALOR PATRIMONIAL",
                "CAGR 5 ANOS", "VALOR DE MERCADO", "QUANTIDADE DE COTAS",
                "CAGR DIVIDENDOS 5 ANOS"]
-        df = _numeric_columns(df=df, columns=tmp)
+        df = numeric_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def table(self):
+    def record(self):
         """
         Summary.
 
-        Function to aggregate the brazilian reits full infos.
+        Function to aggregate the brazilian reits full infos as a dictionary
+        (one table row).
         """
-        df = pd.concat([self.info(), self.price(), self.kpi()])
-        df = df.drop_duplicates()  # Remove duplicates.
-        df = df.T.reset_index(drop=False)
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
-        df = df.drop(["INFO"], axis=1, errors="ignore")  # Necessary rows.
+        row = merge_rows([self.info(wide=True),
+                          self.price(wide=True),
+                          self.kpi(wide=True)])
 
         tmp = ["COTAÇÃO", "COTAÇÃO MÍNIMA 1 ANO", "COTAÇÃO MÁXIMA 1 ANO",
                "COTAÇÃO MÍNIMA 1 MÊS", "COTAÇÃO MÁXIMA 1 MÊS", "P/VP",
@@ -735,16 +793,23 @@ class ReitsBR:
                "QUANTIDADE DE COTISTAS", "VALOR PATRIMONIAL", "CAGR 5 ANOS",
                "QUANTIDADE DE COTAS", "CAGR DIVIDENDOS 5 ANOS"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = pd.to_numeric(df[column], errors="coerce")
+            if column in row:
+                row[column] = to_number(row[column])
 
         tmp = ["VALORIZAÇÃO DE COTAÇÃO 1 ANO", "VALORIZAÇÃO DE COTAÇÃO 1 MÊS",
                "DIVIDEND YIELD", "VALOR EM CAIXA %", "TAXA ADMINISTRATIVA"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = df[column].str.replace("%", "", regex=False)
-                df[column] = pd.to_numeric(df[column], errors="coerce")
-        return df
+            if column in row:
+                row[column] = to_number(row[column], percent=True)
+        return row
+
+    def table(self):
+        """
+        Summary.
+
+        Function to aggregate the brazilian reits full infos.
+        """
+        return apply_schema(pd.DataFrame([self.record()]))
 
 
 class ETFsBR:
@@ -754,36 +819,83 @@ class ETFsBR:
     Retrieve the brazilian ETFs companies infos.
     """
 
-    def __init__(self, ticket):
+    # Page layout selectors, compiled once (see compile_plan).
+    _XPATHS = compile_plan({
+        "administrador": ("/html/body/main/div[2]/div[1]/div[1]/div[1]/" +
+                          "div[2]/strong"),
+        "nome": "/html/body/main/div[2]/div[1]/h4/span",
+        "gestor": ("/html/body/main/div[2]/div[1]/div[1]/div[1]/" +
+                   "div[1]/strong"),
+        "indice": ("/html/body/main/div[1]/div[3]/div/div/div[1]/div/" +
+                   "div/div/strong/small")})
+
+    def __init__(self, ticket, session=None):
         self.ticket = ticket
+        self.session = session if session is not None else get_session()
         url = "https://statusinvest.com.br/etfs/{}"
         self.url = url.format(ticket.lower())
+        self._snapshot = None  # Page fetched and parsed once.
 
-    def _get_soup(self):
-        url = self.url
-        page = requests.get(url, headers=headers, timeout=None)
-        soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
-        dom = etree.HTML(str(soup))
+    @labelled
+    def download(self):
+        """
+        Summary.
+
+        Function to download the page, returning (html, status code).
+        """
+        page = fetch(self.url, "quote", session=self.session)
+        return page.text, page.status_code
+
+    def load(self, html, status_code=200):
+        """
+        Summary.
+
+        Function to use a page downloaded elsewhere (see download), e.g.
+        parsing it in another process.
+        html: String. Page HTML.
+        status_code: Integer. HTTP status of the download.
+        """
+        self._snapshot = self._load_page(html, status_code)
+        return self
+
+    @labelled
+    def _fetch_page(self):
+        return self._load_page(*self.download())
+
+    @labelled
+    def _load_page(self, html, status_code):
+        soup, dom = parse(html)  # Getting HTML (one lxml tree).
         # Checking if asset exist.
-        if page.status_code != 200 or soup.find_all(string="OPS. . ."):
-            raise ValueError("Asset does not exist")
+        if status_code != 200 or soup.find_all(string="OPS. . ."):
+            raise AssetNotFound("Asset does not exist")
         return soup, dom
 
+    def _get_soup(self):
+        if self._snapshot is None:  # Downloading and parsing just once.
+            self._snapshot = self._fetch_page()
+        return self._snapshot
+
+    def refresh(self):
+        """
+        Summary.
+
+        Function to discard the page snapshot, forcing a new download.
+        """
+        self._snapshot = None
+
+    @timed("xpath_common")
     def _parse_common_data(self, dom):
-        administrador = dom.xpath("/html/body/main/div[2]/div[1]/div[1]/" +
-                                  "div[1]/div[2]/strong")
+        administrador = self._XPATHS["administrador"](dom)
         administrador = (administrador[0].text.upper()
                          if administrador and administrador[0].text
                          else None)
-        nome = dom.xpath("/html/body/main/div[2]/div[1]/h4/span")
+        nome = self._XPATHS["nome"](dom)
         nome = (nome[0].text.upper().strip()
                 if nome and nome[0].text else None)
-        gestor = dom.xpath("/html/body/main/div[2]/div[1]/div[1]/div[1]/" +
-                           "div[1]/strong")
+        gestor = self._XPATHS["gestor"](dom)
         gestor = (gestor[0].text.upper().strip()
                   if gestor and gestor[0].text else None)
-        indice = dom.xpath("/html/body/main/div[1]/div[3]/div/div/" +
-                           "div[1]/div/div/div/strong/small")
+        indice = self._XPATHS["indice"](dom)
         indice = (indice[0].text.upper().strip()
                   if indice and indice[0].text else None)
         tmp = []
@@ -797,11 +909,12 @@ class ETFsBR:
         df = _clean_cards(df=df)
         return df
 
+    @timed("parse_cards")
     def _parse_company(self, soup):
         # Company 1.
-        cells = soup.find("div",
-                          {"class": "card bg-main-gd-h white-text " +
-                           "rounded mb-5"})
+        cells = soup.expect("div",
+                            {"class": "card bg-main-gd-h white-text " +
+                             "rounded mb-5"})
         cells = cells.find_all("div", {"class": "info pr-md-2"})
         tmp = []
         for cell in cells:
@@ -816,9 +929,9 @@ class ETFsBR:
         df1 = pd.DataFrame(tmp)  # Temporary dataframe.
 
         # Company 2.
-        cells = soup.find("div",
-                          {"class": "top-info info-3 sm d-flex " +
-                           "justify-between"})
+        cells = soup.expect("div",
+                            {"class": "top-info info-3 sm d-flex " +
+                             "justify-between"})
         cells = cells.find_all("div", {"class": "info"})
         tmp = []
         for cell in cells:
@@ -835,10 +948,11 @@ class ETFsBR:
         company = _clean_cards(df=company)
         return company
 
+    @timed("parse_cards")
     def _parse_price(self, soup):
-        cells = soup.find("div",
-                          {"class": "top-info mt-4 has-special d-flex " +
-                           "justify-between flex-wrap"})
+        cells = soup.expect("div",
+                            {"class": "top-info mt-4 has-special d-flex " +
+                             "justify-between flex-wrap"})
         cells = cells.find_all("div", {"class": "info"})
         tmp = []
         tmp2 = []
@@ -872,10 +986,9 @@ class ETFsBR:
         price = _clean_cards(df=price)
         return price
 
+    @timed("adjust_columns")
     def _adjust_columns(self, df):
-        df = df.T  # Transposing.
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
+        df = wide_row(df)  # One row, INFO values as columns.
         column_mapping = {
             "Nº DE COTISTAS": "QUANTIDADE DE COTISTAS", "CÓDIGO ISIN": "ISIN",
             "DATA DE INÍCIO": "DATA DE CRIAÇÃO", "D.Y": "DIVIDEND YIELD",
@@ -893,11 +1006,12 @@ class ETFsBR:
         df = df.rename(columns=column_mapping)
         return df
 
-    def info(self):
+    def info(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian ETFs infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
         df1 = self._parse_common_data(dom)
@@ -916,16 +1030,19 @@ class ETFsBR:
                                                    errors="coerce").dt.date
             df["DATA DE CRIAÇÃO"] = df["DATA DE CRIAÇÃO"].astype(str)
 
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def price(self):
+    def price(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian ETFs prices infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
         df1 = self._parse_common_data(dom)
@@ -941,20 +1058,23 @@ class ETFsBR:
 
         tmp = ["TICKET", "MOEDA", "VALORIZAÇÃO DE COTAÇÃO 1 ANO",
                "VALORIZAÇÃO DE COTAÇÃO 1 MÊS"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         tmp = ["COTAÇÃO", "COTAÇÃO MÍNIMA 1 ANO", "COTAÇÃO MÁXIMA 1 ANO",
                "COTAÇÃO MÍNIMA 1 MÊS", "COTAÇÃO MÁXIMA 1 MÊS"]
-        df = _numeric_columns(df=df, columns=tmp)
+        df = numeric_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def kpi(self):
+    def kpi(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian ETFs kpis infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
         df1 = self._parse_common_data(dom)
@@ -968,44 +1088,51 @@ class ETFsBR:
         df = df.loc[:, [col for col in tmp if col in df.columns]]
 
         tmp = ["TICKET", "MOEDA", "TAXA ADMINISTRATIVA"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         tmp = ["PATRIMÔNIO LÍQUIDO", "TOTAL EM CARTEIRA", "LIQUIDEZ", "RATIO",
                "LOTE PADRÃO", "LOTE MÍNIMO", "QUANTIDADE DE COTISTAS"]
-        df = _numeric_columns(df=df, columns=tmp)
+        df = numeric_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def table(self):
+    def record(self):
         """
         Summary.
 
-        Function to aggregate the brazilian ETFs full infos.
+        Function to aggregate the brazilian ETFs full infos as a dictionary
+        (one table row).
 
         """
-        df = pd.concat([self.info(), self.price(), self.kpi()])
-        df = df.drop_duplicates()  # Remove duplicates.
-        df = df.T.reset_index(drop=False)
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
-        df = df.drop(["INFO"], axis=1, errors="ignore")  # Necessary rows.
+        row = merge_rows([self.info(wide=True),
+                          self.price(wide=True),
+                          self.kpi(wide=True)])
 
         tmp = ["COTAÇÃO", "COTAÇÃO MÍNIMA 1 ANO", "COTAÇÃO MÁXIMA 1 ANO",
                "COTAÇÃO MÍNIMA 1 MÊS", "COTAÇÃO MÁXIMA 1 MÊS", "LOTE PADRÃO",
                "PATRIMÔNIO LÍQUIDO", "LOTE MÍNIMO", "TOTAL EM CARTEIRA",
                "LIQUIDEZ", "RATIO", "QUANTIDADE DE COTISTAS"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = pd.to_numeric(df[column], errors="coerce")
+            if column in row:
+                row[column] = to_number(row[column])
 
         tmp = ["VALORIZAÇÃO DE COTAÇÃO 1 ANO", "VALORIZAÇÃO DE COTAÇÃO 1 MÊS",
                "TAXA ADMINISTRATIVA"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = df[column].str.replace("%", "", regex=False)
-                df[column] = pd.to_numeric(df[column], errors="coerce")
-        return df
+            if column in row:
+                row[column] = to_number(row[column], percent=True)
+        return row
+
+    def table(self):
+        """
+        Summary.
+
+        Function to aggregate the brazilian ETFs full infos.
+        """
+        return apply_schema(pd.DataFrame([self.record()]))
 
 
 class StocksReits:
@@ -1015,28 +1142,71 @@ class StocksReits:
     Retrieve the stocks and reits companies infos.
     """
 
-    def __init__(self, ticket, type_asset):
+    # Page layout selectors, compiled once (see compile_plan).
+    _XPATHS = compile_plan({
+        "tipo_ativo": "/html/body/main/header/div[2]/div/div[1]/div[1]/span"})
+
+    def __init__(self, ticket, type_asset, session=None):
         self.ticket = ticket
+        self.session = session if session is not None else get_session()
         if type_asset == "STOCKS":
             urls = "https://statusinvest.com.br/acoes/eua/{}"
             self.url = urls.format(ticket.lower())
         elif type_asset == "REITS":
             urlr = "https://statusinvest.com.br/reits/{}"
             self.url = urlr.format(ticket.lower())
+        self._snapshot = None  # Page fetched and parsed once.
 
-    def _get_soup(self):
-        url = self.url
-        page = requests.get(url, headers=headers, timeout=None)
-        soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
-        dom = etree.HTML(str(soup))
+    @labelled
+    def download(self):
+        """
+        Summary.
+
+        Function to download the page, returning (html, status code).
+        """
+        page = fetch(self.url, "quote", session=self.session)
+        return page.text, page.status_code
+
+    def load(self, html, status_code=200):
+        """
+        Summary.
+
+        Function to use a page downloaded elsewhere (see download), e.g.
+        parsing it in another process.
+        html: String. Page HTML.
+        status_code: Integer. HTTP status of the download.
+        """
+        self._snapshot = self._load_page(html, status_code)
+        return self
+
+    @labelled
+    def _fetch_page(self):
+        return self._load_page(*self.download())
+
+    @labelled
+    def _load_page(self, html, status_code):
+        soup, dom = parse(html)  # Getting HTML (one lxml tree).
         # Checking if asset exist.
-        if page.status_code != 200 or soup.find_all(string="OPS. . ."):
-            raise ValueError("Asset does not exist")
+        if status_code != 200 or soup.find_all(string="OPS. . ."):
+            raise AssetNotFound("Asset does not exist")
         return soup, dom
 
+    def _get_soup(self):
+        if self._snapshot is None:  # Downloading and parsing just once.
+            self._snapshot = self._fetch_page()
+        return self._snapshot
+
+    def refresh(self):
+        """
+        Summary.
+
+        Function to discard the page snapshot, forcing a new download.
+        """
+        self._snapshot = None
+
+    @timed("xpath_common")
     def _parse_common_data(self, dom):
-        tipo_ativo = dom.xpath("/html/body/main/header/div[2]/div/" +
-                               "div[1]/div[1]/span")
+        tipo_ativo = self._XPATHS["tipo_ativo"](dom)
         tipo_ativo = (tipo_ativo[0].text.upper().strip()
                       if tipo_ativo and tipo_ativo[0].text else None)
         tmp = []
@@ -1047,10 +1217,11 @@ class StocksReits:
         df = _clean_cards(df=df)
         return df
 
+    @timed("parse_cards")
     def _parse_company(self, soup):
-        cells = soup.find("div",
-                          {"class": "card rounded text-main-green-dark " +
-                           "mb-5"})
+        cells = soup.expect("div",
+                            {"class": "card rounded text-main-green-dark " +
+                             "mb-5"})
         cells = cells.find_all("div", {"class": "info"})
         tmp = []
         for cell in cells:
@@ -1075,9 +1246,9 @@ class StocksReits:
         df1 = df1.rename(columns={"D": "VALOR"})  # Renaming columns.
 
         # Company 2.
-        cells = soup.find("div",
-                          {"class": "card bg-main-gd-h white-text " +
-                           "rounded"})
+        cells = soup.expect("div",
+                            {"class": "card bg-main-gd-h white-text " +
+                             "rounded"})
         cells = cells.find_all("div", {"class": "info"})
         tmp = []
         for cell in cells:
@@ -1092,9 +1263,9 @@ class StocksReits:
         df2 = pd.DataFrame(tmp)  # Temporary dataframe.
 
         # Company 3.
-        cells = soup.find("div",
-                          {"class": "top-info info-3 sm d-flex justify-" +
-                           "between mb-5"})
+        cells = soup.expect("div",
+                            {"class": "top-info info-3 sm d-flex justify-" +
+                             "between mb-5"})
         cells = cells.find_all("div", {"class": "info"})
         tmp = []
         for cell in cells:
@@ -1112,10 +1283,11 @@ class StocksReits:
         company = _clean_cards(df=company)
         return company
 
+    @timed("parse_cards")
     def _parse_price(self, soup):
-        cells = soup.find("div",
-                          {"class": "top-info has-special d-flex justify-" +
-                           "between flex-wrap"})
+        cells = soup.expect("div",
+                            {"class": "top-info has-special d-flex justify-" +
+                             "between flex-wrap"})
         cells = cells.find_all("div", {"class": "info"})
         tmp = []
         tmp2 = []
@@ -1150,8 +1322,9 @@ class StocksReits:
         price = _clean_cards(df=price)
         return price
 
+    @timed("parse_cards")
     def _parse_kpi(self, soup):
-        cells = soup.find("div", {"class": "d-flex flex-wrap"})
+        cells = soup.expect("div", {"class": "d-flex flex-wrap"})
         cells2 = cells.find_all("div",
                                 {"class": "w-50 w-sm-33 w-md-25 " +
                                  "w-lg-16_6 mb-2 mt-2 item"}) + \
@@ -1180,10 +1353,9 @@ class StocksReits:
         kpi = _clean_cards(df=kpi)
         return kpi
 
+    @timed("adjust_columns")
     def _adjust_columns(self, df):
-        df = df.T  # Transposing.
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
+        df = wide_row(df)  # One row, INFO values as columns.
         column_mapping = {
             "BOOKNAME": "EMPRESA", "SETOR": "SETOR EUA",
             "SETOR DE ATUAÇÃO": "SETOR", "M. LÍQUIDA": "MARGEM LÍQUIDA",
@@ -1215,11 +1387,12 @@ class StocksReits:
         df = df.rename(columns=column_mapping)
         return df
 
-    def info(self):
+    def info(self, wide=False):
         """
         Summary.
 
         Function to retrieve the stocks and reits infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
         df1 = self._parse_common_data(dom)
@@ -1231,18 +1404,21 @@ class StocksReits:
                "SUBSETOR EUA", "SETOR", "SUBSETOR", "SEGMENTO"]
         df = df.loc[:, [col for col in tmp if col in df.columns]]
 
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def price(self):
+    def price(self, wide=False):
         """
         Summary.
 
         Function to retrieve the stocks and reits prices infos.
         ticket: String. Ticket code.
         type_asset: String. "STOCK" or "REIT".
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
         df1 = self._parse_common_data(dom)
@@ -1259,21 +1435,24 @@ class StocksReits:
 
         tmp = ["TICKET", "MOEDA", "VALORIZAÇÃO DE COTAÇÃO USD 1 ANO",
                "VALORIZAÇÃO DE COTAÇÃO USD 1 MÊS"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         tmp = ["COTAÇÃO USD", "COTAÇÃO MÍNIMA USD 1 ANO",
                "COTAÇÃO MÁXIMA USD 1 ANO", "COTAÇÃO MÍNIMA USD 1 MÊS",
                "COTAÇÃO MÁXIMA USD 1 MÊS", "DIVIDENDOS PAGOS USD 1 ANO"]
-        df = _numeric_columns(df=df, columns=tmp)
+        df = numeric_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def kpi(self):
+    def kpi(self, wide=False):
         """
         Summary.
 
         Function to retrieve the stocks and reits kpis infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
         df1 = self._parse_common_data(dom)
@@ -1300,7 +1479,7 @@ class StocksReits:
         tmp = ["DIVIDEND YIELD", "ROE", "ROA", "ROIC", "MARGEM BRUTA",
                "MARGEM EBITDA", "MARGEM EBIT", "MARGEM LÍQUIDA", "MOEDA",
                "CAGR RECEITAS 5 ANOS", "CAGR LUCROS 5 ANOS", "TICKET"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         tmp = ["PATRIMÔNIO LÍQUIDO USD", "ATIVOS USD", "ATIVO CIRCULANTE USD",
                "DÍVIDA BRUTA USD", "DISPONIBILIDADE USD", "DÍVIDA LÍQUIDA USD",
@@ -1311,24 +1490,24 @@ class StocksReits:
                "DÍVIDA LÍQUIDA/PATRIMÔNIO LÍQUIDO", "DÍVIDA LÍQUIDA/EBITDA",
                "DÍVIDA LÍQUIDA/EBIT", "PATRIMÔNIO LÍQUIDO/ATIVOS",
                "PASSIVOS/ATIVOS", "LIQUIDEZ CORRENTE"]
-        df = _numeric_columns(df=df, columns=tmp)
+        df = numeric_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def table(self):
+    def record(self):
         """
         Summary.
 
-        Function to aggregate the stocks and reits full infos.
+        Function to aggregate the stocks and reits full infos as a dictionary
+        (one table row).
         ticket: String. Ticket code.
         """
-        df = pd.concat([self.info(), self.price(), self.kpi()])
-        df = df.drop_duplicates()  # Remove duplicates.
-        df = df.T.reset_index(drop=False)
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
-        df = df.drop(["INFO"], axis=1, errors="ignore")  # Necessary rows.
+        row = merge_rows([self.info(wide=True),
+                          self.price(wide=True),
+                          self.kpi(wide=True)])
 
         tmp = ["COTAÇÃO USD", "COTAÇÃO MÍNIMA USD 1 ANO", "LIQUIDEZ CORRENTE",
                "COTAÇÃO MÁXIMA USD 1 ANO", "COTAÇÃO MÍNIMA USD 1 MÊS",
@@ -1343,18 +1522,25 @@ class StocksReits:
                "DÍVIDA LÍQUIDA/EBIT", "PATRIMÔNIO LÍQUIDO/ATIVOS",
                "PASSIVOS/ATIVOS"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = pd.to_numeric(df[column], errors="coerce")
+            if column in row:
+                row[column] = to_number(row[column])
 
         tmp = ["VALORIZAÇÃO DE COTAÇÃO USD 1 ANO", "CAGR LUCROS 5 ANOS",
                "VALORIZAÇÃO DE COTAÇÃO USD 1 MÊS", "CAGR RECEITAS 5 ANOS",
                "DIVIDEND YIELD", "ROE", "ROA", "ROIC", "MARGEM BRUTA",
                "MARGEM EBITDA", "MARGEM EBIT", "MARGEM LÍQUIDA"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = df[column].str.replace("%", "", regex=False)
-                df[column] = pd.to_numeric(df[column], errors="coerce")
-        return df
+            if column in row:
+                row[column] = to_number(row[column], percent=True)
+        return row
+
+    def table(self):
+        """
+        Summary.
+
+        Function to aggregate the stocks and reits full infos.
+        """
+        return apply_schema(pd.DataFrame([self.record()]))
 
 
 class ETFs:
@@ -1364,26 +1550,69 @@ class ETFs:
     Retrieve the ETFs companies infos.
     """
 
-    def __init__(self, ticket):
+    # Page layout selectors, compiled once (see compile_plan).
+    _XPATHS = compile_plan({
+        "nome": "/html/body/main/header/div[2]/div/div[1]/h1/small"})
+
+    def __init__(self, ticket, session=None):
         self.ticket = ticket
+        self.session = session if session is not None else get_session()
         url = "https://statusinvest.com.br/etf/eua/{}"
         self.url = url.format(ticket.lower())
+        self._snapshot = None  # Page fetched and parsed once.
 
-    def _get_soup(self):
-        url = self.url
-        page = requests.get(url, headers=headers, timeout=None)
-        soup = BeautifulSoup(page.text, "html.parser")  # Getting HTML.
-        dom = etree.HTML(str(soup))
+    @labelled
+    def download(self):
+        """
+        Summary.
+
+        Function to download the page, returning (html, status code).
+        """
+        page = fetch(self.url, "quote", session=self.session)
+        return page.text, page.status_code
+
+    def load(self, html, status_code=200):
+        """
+        Summary.
+
+        Function to use a page downloaded elsewhere (see download), e.g.
+        parsing it in another process.
+        html: String. Page HTML.
+        status_code: Integer. HTTP status of the download.
+        """
+        self._snapshot = self._load_page(html, status_code)
+        return self
+
+    @labelled
+    def _fetch_page(self):
+        return self._load_page(*self.download())
+
+    @labelled
+    def _load_page(self, html, status_code):
+        soup, dom = parse(html)  # Getting HTML (one lxml tree).
         # Checking if asset exist.
-        if page.status_code != 200 or soup.find_all(string="OPS. . ."):
-            raise ValueError("Asset does not exist")
+        if status_code != 200 or soup.find_all(string="OPS. . ."):
+            raise AssetNotFound("Asset does not exist")
         return soup, dom
 
+    def _get_soup(self):
+        if self._snapshot is None:  # Downloading and parsing just once.
+            self._snapshot = self._fetch_page()
+        return self._snapshot
+
+    def refresh(self):
+        """
+        Summary.
+
+        Function to discard the page snapshot, forcing a new download.
+        """
+        self._snapshot = None
+
+    @timed("xpath_common")
     def _parse_common_data(self, dom):
-        nome = dom.xpath("/html/body/main/header/div[2]/div/div[1]/h1/" +
-                         "small")
-        nome = (nome[0].text.upper().strip()
-                if nome and nome[0].text else None).split("-")[0]
+        nome = self._XPATHS["nome"](dom)
+        nome = (nome[0].text.upper().strip().split("-")[0]
+                if nome and nome[0].text else None)
         tmp = []
         tmp.append({"INFO": "TICKET", "VALOR": self.ticket.strip().upper()})
         tmp.append({"INFO": "NOME", "VALOR": nome})
@@ -1392,10 +1621,11 @@ class ETFs:
         df = _clean_cards(df=df)
         return df
 
+    @timed("parse_cards")
     def _parse_price(self, soup):
-        cells = soup.find("div",
-                          {"class": "top-info has-special d-flex " +
-                           "justify-between flex-wrap"})
+        cells = soup.expect("div",
+                            {"class": "top-info has-special d-flex " +
+                             "justify-between flex-wrap"})
         cells = cells.find_all("div", {"class": "info"})
         tmp = []
         tmp2 = []
@@ -1429,10 +1659,9 @@ class ETFs:
         price = _clean_cards(df=price)
         return price
 
+    @timed("adjust_columns")
     def _adjust_columns(self, df):
-        df = df.T  # Transposing.
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
+        df = wide_row(df)  # One row, INFO values as columns.
         column_mapping = {
             "VALOR ATUAL": "COTAÇÃO USD",
             "MÊS ATUAL": "VALORIZAÇÃO DE COTAÇÃO USD 1 MÊS",
@@ -1445,12 +1674,13 @@ class ETFs:
         df = df.rename(columns=column_mapping)
         return df
 
-    def info(self):
+    def info(self, wide=False):
         """
         Summary.
 
         Function to retrieve the ETFs infos.
 
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         dom = self._get_soup()[1]
         df = self._parse_common_data(dom)
@@ -1459,16 +1689,19 @@ class ETFs:
         tmp = ["TICKET", "NOME"]
         df = df.loc[:, [col for col in tmp if col in df.columns]]
 
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def price(self):
+    def price(self, wide=False):
         """
         Summary.
 
         Function to retrieve the ETFs prices infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         soup, dom = self._get_soup()
         df1 = self._parse_common_data(dom)
@@ -1485,40 +1718,45 @@ class ETFs:
 
         tmp = ["TICKET", "MOEDA", "VALORIZAÇÃO DE COTAÇÃO USD 1 ANO",
                "VALORIZAÇÃO DE COTAÇÃO USD 1 MÊS"]
-        df = _string_columns(df=df, columns=tmp)
+        df = string_columns(df=df, columns=tmp)
 
         tmp = ["COTAÇÃO USD", "COTAÇÃO MÍNIMA USD 1 ANO",
                "COTAÇÃO MÁXIMA USD 1 ANO", "COTAÇÃO MÍNIMA USD 1 MÊS",
                "COTAÇÃO MÁXIMA USD 1 MÊS"]
-        df = _numeric_columns(df=df, columns=tmp)
+        df = numeric_columns(df=df, columns=tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def table(self):
+    def record(self):
         """
         Summary.
 
-        Function to aggregate the ETFs full infos.
+        Function to aggregate the ETFs full infos as a dictionary (one table
+        row).
         """
-        df = pd.concat([self.info(), self.price()])
-        df = df.drop_duplicates()  # Remove duplicates.
-        df = df.T.reset_index(drop=False)
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
-        df = df.drop(["INFO"], axis=1, errors="ignore")  # Necessary rows.
+        row = merge_rows([self.info(wide=True), self.price(wide=True)])
 
         tmp = ["COTAÇÃO USD", "COTAÇÃO MÍNIMA USD 1 ANO",
                "COTAÇÃO MÁXIMA USD 1 ANO", "COTAÇÃO MÍNIMA USD 1 MÊS",
                "COTAÇÃO MÁXIMA USD 1 MÊS"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = pd.to_numeric(df[column], errors="coerce")
+            if column in row:
+                row[column] = to_number(row[column])
 
         tmp = ["VALORIZAÇÃO DE COTAÇÃO USD 1 ANO",
                "VALORIZAÇÃO DE COTAÇÃO USD 1 MÊS",]
         for column in tmp:
-            if column in df.columns:
-                df[column] = df[column].str.replace("%", "", regex=False)
-                df[column] = pd.to_numeric(df[column], errors="coerce")
-        return df
+            if column in row:
+                row[column] = to_number(row[column], percent=True)
+        return row
+
+    def table(self):
+        """
+        Summary.
+
+        Function to aggregate the ETFs full infos.
+        """
+        return apply_schema(pd.DataFrame([self.record()]))
@@ -0,0 +1,259 @@
+"""
+Summary.
+
+Timing events of the scraping stages (http_fetch, html_parse, xpath_common,
+parse_cards, adjust_columns, numeric_normalise) sent to pluggable hooks:
+logging, callbacks or Prometheus style counters and histograms.
+Nothing is timed while no hook is registered.
+"""
+# -*- coding: utf-8 -*-
+
+from contextlib import contextmanager
+from functools import wraps
+import logging
+import threading
+import time
+import pandas as pd
+
+_HOOKS = []  # Functions called with each event (dictionary).
+_LOCAL = threading.local()  # Fields shared by the nested stages (ticker).
+
+# Histogram upper bounds (seconds) of StageMetrics.
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, float("inf"))
+
+
+# # Common functions.
+def add_hook(hook):
+    """
+    Summary.
+
+    Register a function called with every timing event.
+    An event is a dictionary with stage, seconds and the stage fields
+    (ticker, source, cls, bytes...).
+    hook: Function. Event receiver.
+    """
+    _HOOKS.append(hook)
+    return hook
+
+
+def remove_hook(hook):
+    """
+    Summary.
+
+    Unregister a timing hook.
+    hook: Function. Event receiver.
+    """
+    if hook in _HOOKS:
+        _HOOKS.remove(hook)
+
+
+def clear_hooks():
+    """
+    Summary.
+
+    Unregister every timing hook (e.g. the ones a parser process inherits
+    from the process that started it).
+    """
+    del _HOOKS[:]
+
+
+def enabled():
+    """
+    Summary.
+
+    Whether any hook is registered.
+    """
+    return bool(_HOOKS)
+
+
+def emit(stage, seconds, **fields):
+    """
+    Summary.
+
+    Send an event to the hooks, with the fields of the enclosing stages.
+    stage: String. Stage name.
+    seconds: Float. Stage duration.
+    fields: Event fields (e.g. bytes=1024).
+    """
+    event = dict(getattr(_LOCAL, "fields", {}))
+    event.update(fields)
+    event["stage"] = stage
+    event["seconds"] = seconds
+    for hook in list(_HOOKS):
+        hook(event)
+
+
+@contextmanager
+def timer(stage, **fields):
+    """
+    Summary.
+
+    Context manager timing a stage. It yields the event fields, so sizes
+    known only at the end can be added (fields["bytes"] = ...).
+    stage: String. Stage name.
+    fields: Event fields.
+    """
+    if not _HOOKS:
+        yield fields
+        return
+    start = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        emit(stage, time.perf_counter() - start, **fields)
+
+
+@contextmanager
+def context(**fields):
+    """
+    Summary.
+
+    Context manager adding fields (ticker, source) to the events of the
+    stages run inside it, in the same thread.
+    fields: Event fields.
+    """
+    old = getattr(_LOCAL, "fields", {})
+    _LOCAL.fields = {**old, **fields}
+    try:
+        yield
+    finally:
+        _LOCAL.fields = old
+
+
+def _scraper_fields(scraper):
+    """
+    Summary.
+
+    Event fields of a scraper: ticker, website (module) and class.
+    scraper: Object. Scraper instance.
+    """
+    cls = type(scraper)
+    return {"ticker": getattr(scraper, "ticket", None),
+            "source": cls.__module__, "cls": cls.__name__}
+
+
+def labelled(method):
+    """
+    Summary.
+
+    Decorator adding the scraper ticker, website and class to the events of
+    the stages run by the method (http_fetch, html_parse...).
+    method: Function. Scraper method.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not _HOOKS:
+            return method(self, *args, **kwargs)
+        with context(**_scraper_fields(self)):
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def timed(stage):
+    """
+    Summary.
+
+    Decorator timing a scraper method as a stage, the scraper ticker,
+    website (module) and class becoming fields of its events and of the
+    nested ones (http_fetch, html_parse...).
+    stage: String. Stage name.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not _HOOKS:
+                return method(self, *args, **kwargs)
+            with context(**_scraper_fields(self)):
+                with timer(stage):
+                    return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def log_hook(logger=None, level=logging.DEBUG):
+    """
+    Summary.
+
+    Hook writing the events to a logger.
+    logger: Logger. Logger ("timing" by default).
+    level: Integer. Logging level.
+    """
+    logger = logger if logger is not None else logging.getLogger("timing")
+
+    def hook(event):
+        fields = " ".join(f"{key}={value}" for key, value in event.items()
+                          if key not in ("stage", "seconds"))
+        logger.log(level, "%s %.6fs %s", event["stage"], event["seconds"],
+                   fields)
+    return hook
+
+
+class StageMetrics:
+    """
+    Summary.
+
+    Prometheus style metrics per stage: events counter, seconds and bytes
+    sums, maximum and a cumulative histogram of the durations (BUCKETS).
+    Register it with add_hook(StageMetrics()).
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = tuple(buckets)
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        seconds = event["seconds"]
+        with self._lock:
+            stage = self._stages.get(event["stage"])
+            if stage is None:
+                stage = self._stages[event["stage"]] = {
+                    "count": 0, "seconds": 0.0, "max": 0.0, "bytes": 0,
+                    "histogram": [0] * len(self.buckets)}
+            stage["count"] += 1
+            stage["seconds"] += seconds
+            stage["max"] = max(stage["max"], seconds)
+            stage["bytes"] += event.get("bytes") or 0
+            for position, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    stage["histogram"][position] += 1
+
+    def histogram(self, stage):
+        """
+        Summary.
+
+        Function to retrieve the cumulative histogram of a stage, as
+        {upper bound: events}.
+        stage: String. Stage name.
+        """
+        with self._lock:
+            counts = self._stages.get(stage, {}).get(
+                "histogram", [0] * len(self.buckets))
+            return dict(zip(self.buckets, counts))
+
+    def summary(self):
+        """
+        Summary.
+
+        Function to retrieve a dataframe with a row per stage (events,
+        total, mean and maximum seconds, bytes).
+        """
+        with self._lock:
+            tmp = []
+            for name, stage in self._stages.items():
+                tmp.append({"STAGE": name, "EVENTS": stage["count"],
+                            "TOTAL": stage["seconds"],
+                            "MEAN": stage["seconds"] / stage["count"],
+                            "MAX": stage["max"], "BYTES": stage["bytes"]})
+        df = pd.DataFrame(tmp, columns=["STAGE", "EVENTS", "TOTAL", "MEAN",
+                                        "MAX", "BYTES"])
+        return df.sort_values("TOTAL", ascending=False, ignore_index=True)
+
+    def reset(self):
+        """
+        Summary.
+
+        Function to discard the collected metrics.
+        """
+        with self._lock:
+            self._stages.clear()
@@ -0,0 +1,733 @@
+"""
+Summary.
+
+Shared HTTP transport used by the scrapers.
+"""
+# -*- coding: utf-8 -*-
+
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlencode, urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from exceptions import TransientFetchError
+from timing import timer
+
+# Header to use to get the web page content in text format.
+# The User-Agent request header contains a characteristic string that allows
+# the network protocol peers to identify the application type, operating
+# system, software vendor or software version of the requesting software user
+# agent.
+# Validating User-Agent header on server side is a common operation so be sure
+# to use valid browser’s User-Agent string to avoid getting blocked.
+# Font: https://go-colly.org/articles/scraping_related_http_headers/
+# Font: https://stackoverflow.com/questions/68259148/getting-404-error-for-
+#       certain-stocks-and-pages-on-yahoo-finance-python
+headers = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)" +
+    "AppleWebKit/537.36 (KHTML, like Gecko)" +
+    "Chrome/71.0.3578.98 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application" +
+    "/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "DNT": "1",  # Do not track request header.
+    "Connection": "keep-alive"  # Reusing the TCP/TLS connection.
+}
+
+POOL_SIZE = 10  # Open connections kept per host.
+POOL_HOSTS = 10  # Hosts with a connection pool kept.
+
+_SESSION = None  # Default session shared by every scraper.
+_SESSION_LOCK = threading.Lock()
+
+# Seconds a cached response stays fresh, per kind of source.
+TTL = {
+    "quote": 5 * 60,  # Asset pages (prices and kpis).
+    "market": 15 * 60,  # Whole market tables.
+    "listing": 60 * 60,  # ETFs listings.
+    "payments": 12 * 60 * 60,  # Dividends history.
+    "rate": 5 * 60,  # Exchange rates and CDI.
+}
+CACHE_FOLDER = ".http_cache"
+CACHE_SIZE = 256 * 1024 * 1024  # Bytes kept on disk before evicting.
+
+# Requests per second and burst allowed per website (see TokenBucket).
+HOST_RATES = {
+    "statusinvest.com.br": (4.0, 8),
+    "investidor10.com.br": (4.0, 8),
+    "fundamentus.com.br": (2.0, 4),
+    "dividendinvestor.com": (2.0, 4),
+}
+DEFAULT_RATE = (8.0, 16)  # Other websites (APIs).
+THROTTLE_STATUS = (429, 503)  # Too Many Requests and Service Unavailable.
+TRANSIENT_STATUS = (429, 500, 502, 503, 504)  # Worth trying again.
+TIMEOUT = (5, 30)  # Seconds to connect and to wait for data.
+RETRIES = 3  # New attempts of a failed request.
+BACKOFF = 0.5  # Seconds before the first new attempt, doubled each time.
+MAX_BACKOFF = 60  # Longest pause (seconds) before a new attempt.
+# Network failures worth trying again.
+_TRANSIENT_ERRORS = (requests.exceptions.ConnectionError,
+                     requests.exceptions.Timeout,
+                     requests.exceptions.ChunkedEncodingError)
+
+
+def new_session(pool_size=POOL_SIZE):
+    """
+    Summary.
+
+    Create a session with a keep-alive connection pool per host.
+    pool_size: Integer. Open connections kept per host.
+    """
+    session = requests.Session()
+    session.headers.update(headers)
+    adapter = HTTPAdapter(pool_connections=POOL_HOSTS,
+                          pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """
+    Summary.
+
+    Retrieve the default session, creating it on the first call.
+    """
+    global _SESSION  # pylint: disable=global-statement
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            _SESSION = new_session()
+        return _SESSION
+
+
+def set_session(session):
+    """
+    Summary.
+
+    Replace the default session used by the scrapers.
+    session: Session. Requests session (e.g. new_session(pool_size=32)).
+    """
+    global _SESSION  # pylint: disable=global-statement
+    with _SESSION_LOCK:
+        _SESSION = session
+
+
+def grow_pool(session, pool_size):
+    """
+    Summary.
+
+    Enlarge the connection pool per host of a requests session to at least
+    pool_size connections, returning the same session. Sessions without
+    connection adapters (e.g. the fixtures replay session) are returned as
+    they are.
+    session: Session. Requests session (e.g. get_session()).
+    pool_size: Integer. Open connections kept per host.
+    """
+    # pylint: disable=protected-access
+    for adapter in set(getattr(session, "adapters", {}).values()):
+        if getattr(adapter, "_pool_maxsize", pool_size) >= pool_size:
+            continue
+        with _SESSION_LOCK:
+            if adapter._pool_maxsize < pool_size:  # Checked again.
+                adapter.init_poolmanager(adapter._pool_connections,
+                                         pool_size, block=adapter._pool_block)
+    return session
+
+
+class TokenBucket:
+    """
+    Summary.
+
+    Token bucket rate limiter of a website: up to burst requests at once,
+    refilled at rate requests per second.
+    The rate is halved when the website throttles (HTTP 429/503) and
+    recovers step by step with the successful requests.
+    """
+
+    def __init__(self, rate, burst):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused = 0  # Monotonic time until which nothing is sent.
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens +
+                           (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """
+        Summary.
+
+        Function to block until a request token is available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1  # Reserving the token (may go negative).
+            delay = max(-self._tokens / self.rate, self._paused - now, 0)
+        if delay:
+            time.sleep(delay)
+
+    def throttled(self, retry_after=None):
+        """
+        Summary.
+
+        Function to slow down after a throttled request, pausing the
+        website for retry_after seconds (or a backoff from the rate).
+        retry_after: Float. Seconds asked by the Retry-After header.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.max_rate / 64, self.rate / 2)
+            if retry_after is None:  # Waiting for the bucket to refill.
+                retry_after = self.burst / self.rate
+            self._paused = max(self._paused, now + min(retry_after,
+                                                     MAX_BACKOFF))
+            self._tokens = min(self._tokens, 0)
+
+    def succeeded(self):
+        """
+        Summary.
+
+        Function to recover the rate after a successful request.
+        """
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate,
+                                self.rate + self.max_rate / 16)
+
+
+_LIMITERS = {}  # Host: TokenBucket, shared by every session.
+_LIMITERS_LOCK = threading.Lock()
+_RATE_LIMITING = True  # Disabled for local pages (see set_rate_limiting).
+_OVERRIDES = {}  # Host: local base URL answering for it (see standin_server).
+
+
+class _Unlimited:
+    """
+    Summary.
+
+    Rate limiter letting every request through.
+    """
+
+    def acquire(self):
+        """
+        Summary.
+
+        Function to let the request through.
+        """
+
+    def throttled(self, retry_after=None):
+        """
+        Summary.
+
+        Function ignoring the throttling.
+        retry_after: Float. Seconds asked by the Retry-After header.
+        """
+
+    def succeeded(self):
+        """
+        Summary.
+
+        Function ignoring the successful request.
+        """
+
+
+def _host(url):
+    """
+    Summary.
+
+    Website of the URL, without the www prefix.
+    url: String. URL.
+    """
+    host = urlsplit(url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+def get_limiter(url):
+    """
+    Summary.
+
+    Retrieve the rate limiter of the URL website, creating it on the first
+    call with the HOST_RATES settings.
+    url: String. URL (or host).
+    """
+    if not _RATE_LIMITING:
+        return _Unlimited()
+    host = _host(url if "//" in url else "//" + url)
+    with _LIMITERS_LOCK:
+        limiter = _LIMITERS.get(host)
+        if limiter is None:
+            rate, burst = HOST_RATES.get(host, DEFAULT_RATE)
+            limiter = _LIMITERS[host] = TokenBucket(rate, burst)
+        return limiter
+
+
+def set_rate_limit(host, rate, burst=None):
+    """
+    Summary.
+
+    Configure the requests per second and burst of a website.
+    host: String. Website (e.g. "statusinvest.com.br").
+    rate: Float. Requests per second.
+    burst: Integer. Requests allowed at once (None keeps the current one).
+    """
+    host = _host("//" + host)
+    with _LIMITERS_LOCK:
+        if burst is None:
+            burst = HOST_RATES.get(host, DEFAULT_RATE)[1]
+        HOST_RATES[host] = (rate, burst)
+        _LIMITERS[host] = TokenBucket(rate, burst)
+
+
+@contextmanager
+def rate_limit(host, rate, burst=None):
+    """
+    Summary.
+
+    Context manager applying a rate limit to a website only inside it. The
+    previous settings and limiter (with its adaptive slowdown) are restored
+    at the end.
+    host: String. Website (e.g. "investidor10.com.br").
+    rate: Float. Requests per second.
+    burst: Integer. Requests allowed at once (None keeps the current one).
+    """
+    host = _host("//" + host)
+    with _LIMITERS_LOCK:
+        old_rate = HOST_RATES.get(host)
+        old_limiter = _LIMITERS.get(host)
+    set_rate_limit(host, rate, burst)
+    try:
+        yield
+    finally:
+        with _LIMITERS_LOCK:
+            for settings, old in ((HOST_RATES, old_rate),
+                                  (_LIMITERS, old_limiter)):
+                if old is None:
+                    settings.pop(host, None)
+                else:
+                    settings[host] = old
+
+
+def set_host_override(host, base=None):
+    """
+    Summary.
+
+    Send the requests to a website to another server (e.g. the local
+    stand-in server), the original host becoming the first path part:
+    https://statusinvest.com.br/acoes/bbas3 goes to
+    http://127.0.0.1:8000/statusinvest.com.br/acoes/bbas3.
+    Cache keys and rate limiters still use the original URL.
+    host: String. Website (e.g. "statusinvest.com.br").
+    base: String. Server base URL, None to remove the override.
+    """
+    host = urlsplit("//" + host).hostname
+    if base is None:
+        _OVERRIDES.pop(host, None)
+    else:
+        _OVERRIDES[host] = base.rstrip("/")
+
+
+def _route(url):
+    """
+    Summary.
+
+    URL actually requested, following the host overrides.
+    url: String. URL.
+    """
+    if not _OVERRIDES:
+        return url
+    parts = urlsplit(url)
+    base = _OVERRIDES.get(parts.hostname)
+    if base is None:
+        return url
+    path = parts.path + ("?" + parts.query if parts.query else "")
+    return f"{base}/{parts.netloc}{path}"
+
+
+def set_rate_limiting(enabled):
+    """
+    Summary.
+
+    Enable or disable the rate limiting (e.g. replaying local fixtures).
+    enabled: Boolean. Whether the requests go through the token buckets.
+    """
+    global _RATE_LIMITING  # pylint: disable=global-statement
+    _RATE_LIMITING = enabled
+
+
+def _retry_after(value):
+    """
+    Summary.
+
+    Seconds asked by a Retry-After header (delay or HTTP date), or None.
+    value: String. Header value.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() -
+                   time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class Response:
+    """
+    Summary.
+
+    Downloaded (or cached) HTTP response.
+    """
+
+    def __init__(self, url, status_code, content, encoding=None,
+                 validators=None, from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding or "utf-8"
+        # ETag and Last-Modified headers, to revalidate the response.
+        self.validators = validators or {}
+        self.from_cache = from_cache
+
+    @property
+    def digest(self):
+        """
+        Summary.
+
+        Function to retrieve the hash of the body.
+        """
+        return hashlib.sha256(self.content).hexdigest()
+
+    @property
+    def text(self):
+        """
+        Summary.
+
+        Function to retrieve the decoded body.
+        """
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        """
+        Summary.
+
+        Function to retrieve the JSON body.
+        """
+        return json.loads(self.text)
+
+
+class ResponseCache:
+    """
+    Summary.
+
+    On-disk cache of response bodies keyed by the URL hash.
+    The least recently used responses are evicted when the folder gets
+    bigger than max_bytes, down to EVICT_TO of it.
+    """
+
+    EVICT_TO = 0.9  # Fraction of max_bytes kept after an eviction.
+
+    def __init__(self, folder=CACHE_FOLDER, max_bytes=CACHE_SIZE):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self._size = None  # Bytes of the bodies, counted on the first set.
+        self._lock = threading.Lock()
+
+    def _paths(self, key):
+        path = os.path.join(self.folder, key)
+        return path + ".body", path + ".json"
+
+    def get(self, key, ttl=None):
+        """
+        Summary.
+
+        Function to retrieve a response younger than ttl seconds, or None.
+        Returns (response, fresh): an expired response is still returned
+        (fresh False) so it can be revalidated.
+        key: String. Request key (see cache_key).
+        ttl: Integer. Seconds the response stays fresh (None for always).
+        """
+        body, meta = self._paths(key)
+        try:
+            with open(meta, encoding="utf-8") as file:
+                info = json.load(file)
+            with open(body, "rb") as file:
+                content = file.read()
+            os.utime(body)  # Recently used.
+        except (OSError, ValueError, KeyError):  # Missing or just evicted.
+            return None, False
+        fresh = ttl is None or time.time() - info["stored"] <= ttl
+        response = Response(info["url"], info["status_code"], content,
+                            info["encoding"], info.get("validators"),
+                            from_cache=True)
+        return response, fresh
+
+    def set(self, key, response):
+        """
+        Summary.
+
+        Function to store a response.
+        key: String. Request key (see cache_key).
+        response: Response. Downloaded response.
+        """
+        body, meta = self._paths(key)
+        info = {"url": response.url, "status_code": response.status_code,
+                "encoding": response.encoding,
+                "validators": response.validators, "stored": time.time()}
+        with self._lock:
+            os.makedirs(self.folder, exist_ok=True)
+            if self._size is None:
+                self._size = self._scan()[1]
+            try:
+                self._size -= os.path.getsize(body)  # Replaced body.
+            except OSError:
+                pass
+            with open(body + ".tmp", "wb") as file:
+                file.write(response.content)
+            os.replace(body + ".tmp", body)
+            with open(meta + ".tmp", "w", encoding="utf-8") as file:
+                json.dump(info, file)
+            os.replace(meta + ".tmp", meta)
+            self._size += len(response.content)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def touch(self, key):
+        """
+        Summary.
+
+        Function to mark a revalidated response as fresh again.
+        key: String. Request key (see cache_key).
+        """
+        _, meta = self._paths(key)
+        with self._lock:
+            try:
+                with open(meta, encoding="utf-8") as file:
+                    info = json.load(file)
+                info["stored"] = time.time()
+                with open(meta + ".tmp", "w", encoding="utf-8") as file:
+                    json.dump(info, file)
+                os.replace(meta + ".tmp", meta)
+            except (OSError, ValueError):
+                pass
+
+    def _scan(self):
+        # Cached bodies as ([(last use, bytes, path)], total bytes).
+        entries = []
+        for entry in os.scandir(self.folder):
+            if entry.name.endswith(".body"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries, sum(size for _, size, _ in entries)
+
+    def _evict(self):
+        # Listing again: other processes may share the folder.
+        entries, total = self._scan()
+        for _, size, path in sorted(entries):  # Oldest first.
+            if total <= self.max_bytes * self.EVICT_TO:
+                break
+            for name in (path, path[:-len(".body")] + ".json"):
+                try:
+                    os.remove(name)
+                except OSError:
+                    pass
+            total -= size
+        self._size = total
+
+    def clear(self):
+        """
+        Summary.
+
+        Function to remove every cached response.
+        """
+        with self._lock:
+            if os.path.isdir(self.folder):
+                for entry in os.scandir(self.folder):
+                    os.remove(entry.path)
+            self._size = 0
+
+
+_CACHE = ResponseCache()  # Default cache, disabled with set_cache(None).
+
+
+def get_cache():
+    """
+    Summary.
+
+    Retrieve the default response cache (None when disabled).
+    """
+    return _CACHE
+
+
+def set_cache(cache):
+    """
+    Summary.
+
+    Replace the default response cache (None disables the cache).
+    cache: ResponseCache. Response cache.
+    """
+    global _CACHE  # pylint: disable=global-statement
+    _CACHE = cache
+
+
+_VALIDATORS = ("ETag", "Last-Modified")
+
+
+def _conditional_headers(validators):
+    """
+    Summary.
+
+    Conditional request headers for the stored validators.
+    validators: Dictionary. ETag and Last-Modified of the cached response.
+    """
+    conditional = {}
+    if "ETag" in validators:
+        conditional["If-None-Match"] = validators["ETag"]
+    if "Last-Modified" in validators:
+        conditional["If-Modified-Since"] = validators["Last-Modified"]
+    return conditional
+
+
+def cache_key(url, params=None):
+    """
+    Summary.
+
+    Hash of the request URL and parameters.
+    url: String. URL.
+    params: Dictionary. Query parameters.
+    """
+    if params:
+        url = url + "?" + urlencode(sorted(params.items()))
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def backoff(attempt):
+    """
+    Summary.
+
+    Jittered exponential pause before a new attempt ("full jitter": random
+    between zero and BACKOFF * 2 ** attempt, up to MAX_BACKOFF), so the
+    workers failing together do not retry together.
+    attempt: Integer. Failed attempts so far (0 for the first one).
+    """
+    return random.uniform(0, min(MAX_BACKOFF, BACKOFF * 2 ** attempt))
+
+
+def _download(session, url, params, conditional, timeout):
+    """
+    Summary.
+
+    Send the request through the website token bucket, trying again the
+    network failures and the HTTP 5xx/429 answers.
+    session: Session. Requests session.
+    url: String. URL.
+    params: Dictionary. Query parameters.
+    conditional: Dictionary. Conditional request headers.
+    timeout: Tuple. Seconds to connect and to wait for data.
+    """
+    limiter = get_limiter(url)
+    error, failure = None, None
+    for attempt in range(RETRIES + 1):
+        limiter.acquire()
+        try:
+            page = session.get(_route(url), params=params,
+                               headers=conditional or None, timeout=timeout)
+        except _TRANSIENT_ERRORS as exc:
+            error, failure = exc, f"{type(exc).__name__}: {exc}"
+        else:
+            if page.status_code not in TRANSIENT_STATUS:
+                limiter.succeeded()
+                return page
+            error, failure = None, f"HTTP {page.status_code}"
+            if page.status_code in THROTTLE_STATUS:
+                # Throttled: slowing down the website (Retry-After pause).
+                limiter.throttled(
+                    _retry_after(page.headers.get("Retry-After")))
+                continue
+        if attempt < RETRIES:
+            time.sleep(backoff(attempt))
+    raise TransientFetchError(f"{url}: {failure} after {RETRIES + 1} "
+                              "attempts") from error
+
+
+def fetch(url, source, session=None, params=None, timeout=None):
+    """
+    Summary.
+
+    Download a page, serving it from the response cache while still fresh.
+    An expired response with ETag or Last-Modified is revalidated with a
+    conditional request: when the server answers 304 Not Modified the
+    cached body is reused without a new transfer.
+    The requests to each website go through its token bucket (see
+    HOST_RATES); throttled requests (HTTP 429/503) are retried after the
+    Retry-After pause and network failures or HTTP 5xx after a jittered
+    exponential backoff. TransientFetchError is raised once the RETRIES
+    are exhausted.
+    url: String. URL.
+    source: String. Kind of source, sets the cache TTL (see TTL).
+    session: Session. Requests session, the shared one by default.
+    params: Dictionary. Query parameters.
+    timeout: Tuple. Seconds to connect and to wait for data (TIMEOUT).
+    """
+    with timer("http_fetch", url=url, kind=source) as fields:
+        response = _fetch(url, source, session, params, timeout)
+        fields["bytes"] = len(response.content)
+        fields["status_code"] = response.status_code
+        fields["from_cache"] = response.from_cache
+    return response
+
+
+def _fetch(url, source, session, params, timeout):
+    """
+    Summary.
+
+    Download a page or serve it from the cache (see fetch).
+    url: String. URL.
+    source: String. Kind of source, sets the cache TTL (see TTL).
+    session: Session. Requests session, the shared one by default.
+    params: Dictionary. Query parameters.
+    timeout: Tuple. Seconds to connect and to wait for data (TIMEOUT).
+    """
+    session = session if session is not None else get_session()
+    cache = _CACHE
+    ttl = TTL.get(source, 0)
+    key = cache_key(url, params)
+    cached, conditional = None, {}
+    if cache is not None and ttl:
+        cached, fresh = cache.get(key, ttl)
+        if fresh:
+            return cached
+        if cached is not None:  # Expired: asking if it has changed.
+            conditional = _conditional_headers(cached.validators)
+
+    page = _download(session, url, params, conditional,
+                     timeout if timeout is not None else TIMEOUT)
+    if page.status_code == 304 and cached is not None:
+        cache.touch(key)  # Not modified: the cached body is still valid.
+        return cached
+    validators = {name: page.headers[name] for name in _VALIDATORS
+                  if name in page.headers}
+    response = Response(url, page.status_code, page.content, page.encoding,
+                        validators)
+    if cache is not None and ttl and response.status_code == 200:
+        cache.set(key, response)
+    return response
@@ -9,49 +9,11 @@ Retrieve the companies infos from Yahoo Finance website.
 import yfinance as yf
 import pandas as pd
 import numpy as np
-
-
-# # Common functions.
-def _string_columns(df, columns):
-    """
-    Summary.
-
-    Format string columns.
-    df: Dataframe.
-    columns: Dataframe columns.
-    """
-    for column in columns:
-        if column in df.columns:
-            df[column] = (df[column].str.replace(" %", "%", regex=False)
-                          .str.replace(",", ".", regex=False)
-                          .str.replace(" / ", "/", regex=False)
-                          .replace({"-%": None, "-% A.A": None, "-": None,
-                                    "--": None, "": None, "0.00%": None}))
-            df[column] = df[column].str.upper()
-    return df
-
-
-def _numeric_columns(df, columns):
-    """
-    Summary.
-
-    Format numeric columns.
-    df: Dataframe.
-    columns: Dataframe columns.
-    """
-    for column in columns:
-        if column in df.columns:
-            df[column] = (df[column].str.replace("R$ ", "", regex=False)
-                          .str.replace("R$\n", "", regex=False)
-                          .str.replace("US$", "", regex=False)
-                          .str.replace("US$\n", "", regex=False)
-                          .str.replace("$ ", "", regex=False)
-                          .str.replace(".", "", regex=False)
-                          .str.replace(",", ".", regex=False)
-                          .replace({"0": None, "0.00": None, "-": None,
-                                    "--": None, "": None, np.nan: None}))
-            df[column] = pd.to_numeric(df[column], errors="coerce")
-    return df
+from exceptions import AssetNotFound
+from normalize import string_columns
+from records import merge_rows, to_number
+from schema import apply_schema
+from timing import labelled
 
 
 class AllTypeAssets():
@@ -71,10 +33,11 @@ class AllTypeAssets():
 
         self.base = yf.Ticker(self.ticket2)
 
+    @labelled
     def _parse_data(self):
         dados = self.base.info
         if len(dados) <= 15:
-            raise ValueError("Asset does not exist.")
+            raise AssetNotFound("Asset does not exist.")
 
         if "companyOfficers" in dados:  # Removing unnecessary items.
             del dados["companyOfficers"]
@@ -132,16 +95,17 @@ class AllTypeAssets():
         cols = [coluna for coluna in dados.columns if coluna.isupper()]
         dados = dados[cols]
         if len(dados.columns) == 1:
-            raise ValueError("Asset does not exist.")
+            raise AssetNotFound("Asset does not exist.")
 
         dados["TICKET"] = self.ticket
         return dados
 
-    def info(self):
+    def info(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian stocks infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         df = self._parse_data()  # Dados.
         tmp = ["TICKET", "TIPO ATIVO", "EMPRESA", "PAÍS", "FAMÍLIA",
@@ -154,17 +118,20 @@ class AllTypeAssets():
                 df["DATA DE CRIAÇÃO"], unit="s").dt.date
             df["DATA DE CRIAÇÃO"] = df["DATA DE CRIAÇÃO"].astype(str)
 
-        df = _string_columns(df, tmp)
+        df = string_columns(df, tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         df = df.rename(columns={"index": "INFO", 0: "VALOR"})
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def price(self):
+    def price(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian stocks prices infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         df = self._parse_data()  # Dados.
 
@@ -173,17 +140,20 @@ class AllTypeAssets():
         df = df.loc[:, [col for col in tmp if col in df.columns]]
 
         tmp = ["TICKET", "MOEDA"]
-        df = _string_columns(df, tmp)
+        df = string_columns(df, tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         df = df.rename(columns={"index": "INFO", 0: "VALOR"})
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def kpi(self):
+    def kpi(self, wide=False):
         """
         Summary.
 
         Function to retrieve the brazilian stocks kpi's infos.
+        wide: Boolean. One-row frame instead of INFO/VALOR rows.
         """
         df = self._parse_data()  # Dados.
 
@@ -236,24 +206,24 @@ class AllTypeAssets():
                                               if pd.notna(x) else x)
 
         tmp = ["TICKET", "MOEDA"]
-        df = _string_columns(df, tmp)
+        df = string_columns(df, tmp)
+        if wide:  # One row per ticket (see record).
+            return df
         df = df.T.reset_index(drop=False)
         df = df.rename(columns={"index": "INFO", 0: "VALOR"})
         # df["VALOR"] = df["VALOR"].fillna("SEM INFORMAÇÃO")
         return df
 
-    def table(self):
+    def record(self):
         """
         Summary.
 
-        Function to aggregate the brazilian stocks full infos.
+        Function to aggregate the brazilian stocks full infos as a dictionary
+        (one table row).
         """
-        df = pd.concat([self.info(), self.price(), self.kpi()])
-        df = df.drop_duplicates()  # Remove duplicates.
-        df = df.T.reset_index(drop=False)
-        df.columns = df.iloc[0]  # First row as column name.
-        df = df.iloc[1:]  # Removing first row.
-        df = df.drop(["INFO"], axis=1)
+        row = merge_rows([self.info(wide=True),
+                          self.price(wide=True),
+                          self.kpi(wide=True)])
 
         tmp = ["P/L", "P/L FUTURO", "P/VP", "EV/EBITDA", "COTAÇÃO ALVO",
                "EV/RECEITA", "PEG RATIO", "DÍVIDA BRUTA", "LIQUIDEZ CORRENTE",
@@ -267,8 +237,8 @@ class AllTypeAssets():
                "COTAÇÃO MÍNIMA 1 ANO", "CAIXA OPERACIONAL",
                "LIQUIDEZ ESTIMADA"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = pd.to_numeric(df[column], errors="coerce")
+            if column in row:
+                row[column] = to_number(row[column])
 
         tmp = ["PAYOUT", "DIVIDEND YIELD", "MARGEM LÍQUIDA", "MARGEM EBITDA",
                "MARGEM OPERACIONAL", "MARGEM BRUTA", "RETORNO SOBRE ATIVOS",
@@ -279,10 +249,17 @@ class AllTypeAssets():
                "RETORNO MÉDIO 5 ANOS", "DIVIDEND YIELD 5 ANOS",
                "DÍVIDA BRUTA/PATRIMÔNIO"]
         for column in tmp:
-            if column in df.columns:
-                df[column] = df[column].str.replace("%", "", regex=False)
-                df[column] = pd.to_numeric(df[column], errors="coerce")
-        return df
+            if column in row:
+                row[column] = to_number(row[column], percent=True)
+        return row
+
+    def table(self):
+        """
+        Summary.
+
+        Function to aggregate the brazilian stocks full infos.
+        """
+        return apply_schema(pd.DataFrame([self.record()]))
 
     def payments(self, start):
         """
@@ -292,7 +269,7 @@ class AllTypeAssets():
         """
         df = self.base.history(start=start, end=None)
         if "Dividends" not in df.columns:
-            raise ValueError("Asset does not exist.")
+            raise AssetNotFound("Asset does not exist.")
 
         df.reset_index(drop=False, inplace=True)  # Reseting index.
         column_mapping = {
@@ -303,7 +280,7 @@ class AllTypeAssets():
         df["TICKET"] = self.ticket
         df = df[df["PROVENTO PAGO"] > 0]
         if len(df) == 0:
-            raise ValueError("No payments.")
+            raise AssetNotFound("No payments.")
 
         df = df.reset_index(drop=True)
         df = df[["TICKET", "DATA", "PROVENTO PAGO"]]